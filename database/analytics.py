@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Análise de Métricas
+Descrição: Agregações colunares (NumPy/pandas) de snapshots de métricas por plataforma, dia e estilo
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Iterable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import String, cast, select
+
+from database.models import (
+    DatabaseManager, GeneratedContent, Metrics, Publication, ROLLUP_FIELDS, _latest_metrics_subquery
+)
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Chaves de agrupamento aceitas por aggregate_metrics
+GROUP_KEYS = ('platform', 'day', 'style')
+DEFAULT_PERCENTILES = (0.5, 0.9, 0.99)
+
+# Colunas de um frame de métricas
+FRAME_COLUMNS = ('publication_id', 'platform', 'style', 'collected_at') + ROLLUP_FIELDS
+
+# Colunas lidas da tabela de snapshots; platform e style vêm das publicações (poucas linhas)
+# e são expandidas por publication_id já em NumPy, sem repetir o JOIN em cada snapshot.
+# collected_at sai como texto: o parser vetorizado do pandas é bem mais rápido que
+# converter cada valor em datetime no driver.
+SNAPSHOT_COLUMNS = (
+    Metrics.publication_id, cast(Metrics.collected_at, String),
+) + tuple(getattr(Metrics, field) for field in ROLLUP_FIELDS)
+
+
+def _column(columns: Mapping[str, Sequence[Any]], name: str, dtype) -> np.ndarray:
+    """Converter uma coluna para um array tipado de uma vez (sem inferência célula a célula)"""
+    return np.asarray(columns[name], dtype=dtype)
+
+
+def _categorical(values: Sequence[Any]) -> pd.Categorical:
+    """Converter uma coluna de texto em categoria, com nulos como string vazia"""
+    if not isinstance(values, pd.Categorical):
+        values = pd.Categorical(np.asarray(values, dtype=object))
+    if values.isna().any():
+        if "" not in values.categories:
+            values = values.add_categories("")
+        values = values.fillna("")
+    return values
+
+
+def metrics_frame(columns: Mapping[str, Sequence[Any]]) -> pd.DataFrame:
+    """Montar um frame de métricas a partir de colunas (listas, tuplas, arrays NumPy ou colunas do SQL)
+
+    Valores nulos das métricas viram 0, platform e style viram categorias e
+    collected_at vira datetime64 (aceita datetime ou texto ISO, como o SQLite grava);
+    a coluna day (meia-noite de collected_at) é derivada.
+    """
+    missing = [name for name in FRAME_COLUMNS if name not in columns and name != "style"]
+    if missing:
+        raise ValueError(f"Colunas ausentes no frame de métricas: {', '.join(missing)}")
+
+    size = len(columns["publication_id"])
+    frame = pd.DataFrame({
+        "publication_id": _column(columns, "publication_id", np.int64),
+        "platform": _categorical(columns["platform"]),
+        "style": _categorical(columns["style"] if "style" in columns else np.full(size, None)),
+    })
+
+    collected_at = columns["collected_at"]
+    if np.issubdtype(getattr(collected_at, "dtype", np.dtype(object)), np.datetime64):
+        frame["collected_at"] = pd.to_datetime(collected_at)
+    else:
+        frame["collected_at"] = pd.to_datetime(_column(columns, "collected_at", object), format="ISO8601")
+
+    for field in ROLLUP_FIELDS:
+        # float64 aceita None (vira NaN) na mesma conversão
+        values = _column(columns, field, np.float64)
+        frame[field] = np.nan_to_num(values, nan=0.0).astype(np.int64)
+
+    frame["day"] = frame["collected_at"].dt.floor("D")
+    return frame
+
+
+def load_metrics_frame(db: DatabaseManager, platform: str = None, start: datetime = None,
+                       end: datetime = None, latest_only: bool = False) -> pd.DataFrame:
+    """Carregar snapshots do banco direto para colunas, sem criar objetos ORM
+
+    Com latest_only, só o snapshot mais recente de cada publicação é lido.
+    """
+    publications_query = select(Publication.id, Publication.platform, GeneratedContent.style).outerjoin(
+        GeneratedContent, GeneratedContent.id == Publication.content_id
+    )
+    query = select(*SNAPSHOT_COLUMNS)
+
+    if latest_only:
+        latest = _latest_metrics_subquery()
+        query = query.where(Metrics.id.in_(select(latest.c.metrics_id)))
+    if platform:
+        publications_query = publications_query.where(Publication.platform == platform)
+        query = query.where(Metrics.publication_id.in_(
+            select(Publication.id).where(Publication.platform == platform)
+        ))
+    if start:
+        query = query.where(Metrics.collected_at >= start)
+    if end:
+        query = query.where(Metrics.collected_at <= end)
+
+    session = db.get_session()
+    try:
+        publications = session.execute(publications_query).all()
+        # Tuplas cruas do driver: sem processamento de tipos por célula
+        rows = session.connection().execute(query).cursor.fetchall()
+    finally:
+        session.close()
+    logger.info(f"{len(rows)} snapshots carregados para análise")
+
+    snapshots = np.array(rows, dtype=object) if rows else np.empty((0, len(SNAPSHOT_COLUMNS)), dtype=object)
+    publication_ids = snapshots[:, 0].astype(np.int64)
+
+    # Expandir platform e style das publicações para cada snapshot pelos códigos das categorias
+    positions = pd.Index([row[0] for row in publications]).get_indexer(publication_ids)
+    columns = {"publication_id": publication_ids, "collected_at": snapshots[:, 1]}
+    for offset, name in enumerate(("platform", "style"), 1):
+        dimension = _categorical([row[offset] for row in publications])
+        columns[name] = pd.Categorical.from_codes(
+            np.where(positions >= 0, dimension.codes[positions], -1), dtype=dimension.dtype
+        )
+    for offset, field in enumerate(ROLLUP_FIELDS, 2):
+        columns[field] = snapshots[:, offset]
+
+    return metrics_frame(columns)
+
+
+def engagement_rates(frame: pd.DataFrame) -> np.ndarray:
+    """Taxa de engajamento por linha: (likes + comentários + compartilhamentos) / views
+
+    Linhas sem visualizações ficam NaN (e são ignoradas nos percentis).
+    """
+    engagement = (frame["likes"] + frame["comments"] + frame["shares"]).to_numpy(dtype=np.float64)
+    views = frame["views"].to_numpy(dtype=np.float64)
+    rates = np.full(len(frame), np.nan)
+    np.divide(engagement, views, out=rates, where=views > 0)
+    return rates
+
+
+def _last_snapshots(frame: pd.DataFrame, per_day: bool) -> pd.DataFrame:
+    """Manter o último snapshot de cada publicação (ou de cada publicação por dia)
+
+    As métricas são acumuladas, então somar vários snapshots do mesmo post contaria
+    o mesmo engajamento mais de uma vez.
+    """
+    keys = ["publication_id", "day"] if per_day else ["publication_id"]
+    ordered = frame.sort_values(["publication_id", "collected_at"], kind="stable")
+    return ordered.drop_duplicates(subset=keys, keep="last")
+
+
+def aggregate_metrics(frame: pd.DataFrame, by: Iterable[str] = ("platform",),
+                      percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> pd.DataFrame:
+    """Agregar métricas por plataforma, dia e/ou estilo do conteúdo
+
+    Retorna uma linha por grupo com posts, somas de likes/comments/shares/views,
+    engagement_rate (engajamento total / views totais) e os percentis da taxa de
+    engajamento por post (colunas engagement_rate_p50, engagement_rate_p90, ...).
+    """
+    by = list(by)
+    invalid = [key for key in by if key not in GROUP_KEYS]
+    if invalid:
+        raise ValueError(f"Agrupamento inválido: {', '.join(invalid)}. Use: {', '.join(GROUP_KEYS)}")
+
+    snapshots = _last_snapshots(frame, per_day="day" in by).copy()
+    snapshots["engagement_rate"] = engagement_rates(snapshots)
+
+    if not by:
+        snapshots["_all"] = 0
+        by = ["_all"]
+
+    grouped = snapshots.groupby(by, observed=True, sort=True)
+    result = grouped[list(ROLLUP_FIELDS)].sum()
+    result.insert(0, "posts", grouped.size())
+
+    result["engagement_rate"] = engagement_rates(result)
+
+    if percentiles:
+        quantiles = grouped["engagement_rate"].quantile(list(percentiles)).unstack().reindex(
+            columns=list(percentiles)
+        )
+        for q in percentiles:
+            result[f"engagement_rate_p{q * 100:g}"] = quantiles[q]
+
+    result = result.reset_index()
+    return result.drop(columns="_all") if "_all" in result else result
+
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Arquivamento de Métricas
+Descrição: Move snapshots antigos de métricas para arquivos Parquet particionados
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import select, delete
+
+from database.models import (
+    DatabaseManager, Metrics, Publication, ROLLUP_FIELDS, _chunked, _latest_metrics_subquery
+)
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Colunas gravadas nos arquivos (platform e month viram partições de diretório)
+ARCHIVE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("publication_id", pa.int64()),
+    ("likes", pa.int64()),
+    ("comments", pa.int64()),
+    ("shares", pa.int64()),
+    ("views", pa.int64()),
+    ("collected_at", pa.timestamp("us")),
+    ("last_checked_at", pa.timestamp("us")),
+    ("raw_payload_hash", pa.string()),
+])
+
+ARCHIVE_PARTITION_SCHEMA = pa.schema([("platform", pa.string()), ("month", pa.string())])
+ARCHIVE_PARTITIONING = ds.partitioning(ARCHIVE_PARTITION_SCHEMA, flavor="hive")
+
+# Schema explícito da leitura: um diretório sem arquivos ainda aceita filtros por coluna
+ARCHIVE_DATASET_SCHEMA = pa.unify_schemas([ARCHIVE_SCHEMA, ARCHIVE_PARTITION_SCHEMA])
+
+
+class MetricsArchiver:
+    """Arquivador de métricas frias em Parquet
+
+    Snapshots mais antigos que o corte são gravados em
+    <archive_dir>/platform=<plataforma>/month=<AAAA-MM>/part-<id inicial>-<id final>.parquet
+    e removidos do SQLite em lotes. O snapshot mais recente de cada publicação nunca é
+    arquivado, para que as consultas de "últimas métricas" continuem só no banco.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, archive_dir: str = "archive/metrics",
+                 compression: str = "zstd"):
+        self.db = db_manager
+        self.archive_dir = archive_dir
+        self.compression = compression
+
+    def archive(self, older_than_days: int = 90, batch_size: int = 10000, now: datetime = None) -> Dict[str, Any]:
+        """Arquivar snapshots mais antigos que older_than_days e removê-los do banco"""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+        logger.info(f"Arquivando métricas coletadas antes de {cutoff.isoformat()}...")
+
+        archived = 0
+        files = []
+        last_id = 0
+        # Os snapshots mais recentes são calculados uma vez: repetir a janela sobre toda a
+        # tabela a cada lote deixaria o arquivamento quadrático. Snapshots coletados durante
+        # o arquivamento são posteriores ao corte, então o conjunto só fica conservador.
+        session = self.db.get_session()
+        try:
+            latest = _latest_metrics_subquery()
+            latest_ids = set(session.execute(select(latest.c.metrics_id)).scalars())
+        finally:
+            session.close()
+
+        while True:
+            session = self.db.get_session()
+            try:
+                batch = session.execute(
+                    select(
+                        Metrics.id, Metrics.publication_id, Publication.platform,
+                        Metrics.likes, Metrics.comments, Metrics.shares, Metrics.views,
+                        Metrics.collected_at, Metrics.last_checked_at, Metrics.raw_payload_hash
+                    ).join(Publication, Publication.id == Metrics.publication_id).where(
+                        Metrics.collected_at < cutoff,
+                        Metrics.id > last_id
+                    ).order_by(Metrics.id).limit(batch_size)
+                ).all()
+
+                if not batch:
+                    break
+
+                last_id = batch[-1].id
+                rows = [row for row in batch if row.id not in latest_ids]
+                if not rows:
+                    continue
+
+                # Gravar os arquivos antes de apagar: uma falha no meio só repete o lote
+                for (platform, month), group in self._partition(rows).items():
+                    files.append(self._write_partition(platform, month, group))
+
+                ids = [row.id for row in rows]
+                for chunk in _chunked(ids):
+                    session.execute(delete(Metrics).where(Metrics.id.in_(chunk)))
+                self.db._bump_counters(session, **{
+                    f"total_{field}": -sum(getattr(row, field) or 0 for row in rows)
+                    for field in ROLLUP_FIELDS
+                })
+                session.commit()
+
+                archived += len(rows)
+                logger.info(f"{archived} snapshots arquivados")
+            except Exception as e:
+                session.rollback()
+                raise e
+            finally:
+                session.close()
+
+        return {"archived": archived, "files": files, "cutoff": cutoff.isoformat()}
+
+    def _partition(self, rows) -> Dict[tuple, list]:
+        """Agrupar linhas por plataforma e mês"""
+        groups = {}
+        for row in rows:
+            key = (row.platform, row.collected_at.strftime("%Y-%m"))
+            groups.setdefault(key, []).append(row)
+        return groups
+
+    def _write_partition(self, platform: str, month: str, rows: list) -> str:
+        """Gravar um grupo de linhas em um arquivo Parquet da partição"""
+        directory = os.path.join(self.archive_dir, f"platform={platform}", f"month={month}")
+        os.makedirs(directory, exist_ok=True)
+
+        filepath = os.path.join(directory, f"part-{rows[0].id}-{rows[-1].id}.parquet")
+        table = pa.Table.from_pydict(
+            {name: [getattr(row, name) for row in rows] for name in ARCHIVE_SCHEMA.names},
+            schema=ARCHIVE_SCHEMA
+        )
+        pq.write_table(table, filepath, compression=self.compression)
+        return filepath
+
+    def query_metrics(self, start: datetime = None, end: datetime = None,
+                      publication_ids: Iterable[int] = None, platform: str = None) -> List[Dict[str, Any]]:
+        """Consultar snapshots unindo o arquivo Parquet com os dados vivos do banco"""
+        ids = list(publication_ids) if publication_ids is not None else None
+        results = self._query_archive(start, end, ids, platform) + self._query_live(start, end, ids, platform)
+        results.sort(key=lambda r: (r["publication_id"], r["collected_at"], r["id"]))
+        return results
+
+    def _query_archive(self, start, end, ids, platform) -> List[Dict[str, Any]]:
+        """Ler snapshots arquivados, podando partições por plataforma e mês"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+
+        dataset = ds.dataset(self.archive_dir, format="parquet", schema=ARCHIVE_DATASET_SCHEMA,
+                             partitioning=ARCHIVE_PARTITIONING)
+
+        conditions = []
+        if platform:
+            conditions.append(ds.field("platform") == platform)
+        if start:
+            conditions.append(ds.field("month") >= start.strftime("%Y-%m"))
+            conditions.append(ds.field("collected_at") >= pa.scalar(start, pa.timestamp("us")))
+        if end:
+            conditions.append(ds.field("month") <= end.strftime("%Y-%m"))
+            conditions.append(ds.field("collected_at") <= pa.scalar(end, pa.timestamp("us")))
+        if ids is not None:
+            conditions.append(ds.field("publication_id").isin(ids))
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        return dataset.to_table(filter=expression).to_pylist()
+
+    def _query_live(self, start, end, ids, platform) -> List[Dict[str, Any]]:
+        """Ler snapshots ainda presentes no banco"""
+        query = select(
+            Metrics.id, Metrics.publication_id, Metrics.likes, Metrics.comments, Metrics.shares,
+            Metrics.views, Metrics.collected_at, Metrics.last_checked_at, Metrics.raw_payload_hash,
+            Publication.platform
+        ).join(Publication, Publication.id == Metrics.publication_id)
+
+        if platform:
+            query = query.where(Publication.platform == platform)
+        if start:
+            query = query.where(Metrics.collected_at >= start)
+        if end:
+            query = query.where(Metrics.collected_at <= end)
+        if ids is not None:
+            query = query.where(Metrics.publication_id.in_(ids))
+
+        session = self.db.get_session()
+        try:
+            results = []
+            for row in session.execute(query):
+                record = dict(row._mapping)
+                record["month"] = record["collected_at"].strftime("%Y-%m")
+                results.append(record)
+            return results
+        finally:
+            session.close()
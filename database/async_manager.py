@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Gerenciador Assíncrono de Banco de Dados
+Descrição: Contraparte asyncio do DatabaseManager (SQLAlchemy asyncio + aiosqlite)
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+import time
+
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from database.models import (
+    DatabaseManager, GeneratedContent, Publication, Metrics, MetricsRollup, RawPayload,
+    APIConfig, CacheVersion, API_CONFIG_CACHE_NAME, CONTENT_STATUS_TRANSITIONS, IN_CLAUSE_CHUNK_SIZE,
+    _bucket_start, _chunked, _decompress_payload, _keyset_page, _latest_metrics_subquery
+)
+from database.rows import ContentRow, PublicationRow, HashtagStatsRow
+
+# Driver assíncrono usado para cada banco suportado
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+class AsyncDatabaseManager:
+    """Gerenciador assíncrono do banco de dados
+
+    Expõe as mesmas operações do DatabaseManager como corrotinas. As escritas reutilizam
+    os helpers de sessão do gerenciador síncrono via AsyncSession.run_sync (no próprio
+    event loop, sem threads), então rollups, payloads brutos e caches continuam iguais.
+    Jobs de manutenção (rebuild_metrics_rollups, compact_raw_data) ficam em self.sync.
+    """
+
+    def __init__(self, database_url: str = None, **manager_options):
+        if database_url is None:
+            # Usar SQLite por padrão
+            database_url = "sqlite:///content_automation.db"
+
+        url = make_url(database_url)
+        backend = url.get_backend_name()
+        if backend not in ASYNC_DRIVERS:
+            raise ValueError(f"Banco sem driver assíncrono configurado: {backend}")
+
+        # O gerenciador síncrono cria/atualiza o schema e guarda os caches em memória
+        self.sync = DatabaseManager(
+            url.set(drivername=backend).render_as_string(hide_password=False), **manager_options
+        )
+
+        self.engine = create_async_engine(
+            url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+        )
+        self.SessionLocal = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+
+    def get_session(self):
+        """Obter sessão assíncrona do banco"""
+        return self.SessionLocal()
+
+    async def dispose(self):
+        """Fechar as conexões do pool"""
+        await self.engine.dispose()
+        self.sync.engine.dispose()
+
+    async def _write(self, operation, *args):
+        """Executar um helper de escrita síncrono em uma transação assíncrona"""
+        async with self.get_session() as session:
+            try:
+                result = await session.run_sync(operation, *args)
+                await session.commit()
+                return result
+            except Exception as e:
+                await session.rollback()
+                raise e
+
+    async def _read(self, operation, *args):
+        """Executar um helper de leitura síncrono em uma sessão assíncrona"""
+        async with self.get_session() as session:
+            return await session.run_sync(operation, *args)
+
+    async def create_content(self, content_data: dict):
+        """Criar novo conteúdo"""
+        return await self._write(self.sync._insert_content, content_data)
+
+    async def get_content(self, content_id: str = None, status: str = None, load_publications: bool = False):
+        """Obter conteúdo"""
+        query = select(GeneratedContent)
+
+        if content_id:
+            query = query.where(GeneratedContent.id == content_id)
+
+        if status:
+            query = query.where(GeneratedContent.status == status)
+
+        if load_publications:
+            query = query.options(selectinload(GeneratedContent.publications))
+
+        async with self.get_session() as session:
+            return list((await session.execute(query)).scalars())
+
+    async def get_content_rows(self, status: str = None, limit: int = None) -> List[ContentRow]:
+        """Obter listagem somente leitura de conteúdo como tuplas leves"""
+        query = select(*(getattr(GeneratedContent, f) for f in ContentRow._fields)).order_by(
+            GeneratedContent.created_at, GeneratedContent.id
+        )
+
+        if status:
+            query = query.where(GeneratedContent.status == status)
+
+        if limit:
+            query = query.limit(limit)
+
+        async with self.get_session() as session:
+            return [ContentRow._make(row) for row in await session.execute(query)]
+
+    async def get_content_page(self, status: str = None, limit: int = 20, cursor: str = None,
+                               descending: bool = False) -> Dict[str, Any]:
+        """Obter página de conteúdo ordenada por (created_at, id) com cursor keyset"""
+        def page(session):
+            query = session.query(GeneratedContent)
+            if status:
+                query = query.filter(GeneratedContent.status == status)
+            return _keyset_page(
+                query, GeneratedContent.created_at, GeneratedContent.id, limit, cursor, descending
+            )
+
+        return await self._read(page)
+
+    async def iter_content(self, status: str = None, chunk_size: int = 1000) -> AsyncIterator[GeneratedContent]:
+        """Iterar sobre todo o conteúdo buscando do servidor em blocos (para exportações)"""
+        query = select(GeneratedContent).order_by(GeneratedContent.created_at, GeneratedContent.id)
+
+        if status:
+            query = query.where(GeneratedContent.status == status)
+
+        async with self.get_session() as session:
+            result = await session.stream(query.execution_options(yield_per=chunk_size))
+            async for content in result.scalars():
+                yield content
+
+    async def search_content(self, query: str, limit: int = 20, cursor: str = None) -> Dict[str, Any]:
+        """Buscar conteúdo por palavras do prompt ou do prompt revisado, por relevância"""
+        return await self._read(self.sync._search_content, query, limit, cursor)
+
+    async def update_content_status(self, content_id: str, status: str, **kwargs) -> bool:
+        """Atualizar status do conteúdo"""
+        def set_status(session):
+            return self.sync._set_content_status(session, content_id, status, **kwargs)
+
+        return await self._write(set_status)
+
+    async def update_content_status_bulk(self, content_ids: Iterable[str], status: str,
+                                         chunk_size: int = IN_CLAUSE_CHUNK_SIZE, **fields) -> List[str]:
+        """Atualizar o status de vários conteúdos com um UPDATE por bloco de ids"""
+        if status not in CONTENT_STATUS_TRANSITIONS:
+            raise ValueError(f"Status de conteúdo inválido: {status}")
+
+        return await self._write(
+            self.sync._update_content_status_bulk, list(content_ids), status, chunk_size, fields
+        )
+
+    async def create_publication(self, publication_data: dict):
+        """Criar nova publicação"""
+        return await self._write(self.sync._insert_publication, publication_data)
+
+    async def get_publications(self, content_id: str = None, platform: str = None, load_content: bool = False):
+        """Obter publicações"""
+        query = select(Publication)
+
+        if content_id:
+            query = query.where(Publication.content_id == content_id)
+
+        if platform:
+            query = query.where(Publication.platform == platform)
+
+        if load_content:
+            query = query.options(selectinload(Publication.content))
+
+        async with self.get_session() as session:
+            return list((await session.execute(query)).scalars())
+
+    async def get_publication_rows(self, content_id: str = None, platform: str = None,
+                                   with_latest_metrics: bool = False) -> List[PublicationRow]:
+        """Obter listagem somente leitura de publicações como tuplas leves"""
+        columns = [
+            Publication.id, Publication.content_id, Publication.platform,
+            Publication.platform_post_id, Publication.status, Publication.published_at
+        ]
+
+        if with_latest_metrics:
+            latest = _latest_metrics_subquery()
+            query = select(
+                *columns, Metrics.likes, Metrics.comments, Metrics.shares, Metrics.views,
+                Metrics.collected_at
+            ).select_from(Publication).outerjoin(
+                latest, latest.c.publication_id == Publication.id
+            ).outerjoin(Metrics, Metrics.id == latest.c.metrics_id)
+        else:
+            query = select(*columns)
+
+        if content_id:
+            query = query.where(Publication.content_id == content_id)
+
+        if platform:
+            query = query.where(Publication.platform == platform)
+
+        query = query.order_by(Publication.published_at, Publication.id)
+
+        async with self.get_session() as session:
+            return [PublicationRow(*row) for row in await session.execute(query)]
+
+    async def get_publications_by_hashtag(self, tag: str, platform: str = None) -> List[Publication]:
+        """Obter publicações que usam uma hashtag"""
+        return await self._read(self.sync._publications_by_hashtag, tag, platform)
+
+    async def get_hashtag_performance(self, limit: int = 20, platform: str = None,
+                                      order_by: str = 'likes') -> List[HashtagStatsRow]:
+        """Ranking de hashtags pelas métricas mais recentes das publicações que as usam"""
+        return await self._read(self.sync._hashtag_performance, limit, platform, order_by)
+
+    async def get_publications_page(self, content_id: str = None, platform: str = None, limit: int = 20,
+                                    cursor: str = None, descending: bool = True) -> Dict[str, Any]:
+        """Obter página de publicações ordenada por (published_at, id) com cursor keyset"""
+        def page(session):
+            query = session.query(Publication)
+            if content_id:
+                query = query.filter(Publication.content_id == content_id)
+            if platform:
+                query = query.filter(Publication.platform == platform)
+            return _keyset_page(
+                query, Publication.published_at, Publication.id, limit, cursor, descending, cast_id=int
+            )
+
+        return await self._read(page)
+
+    async def iter_publications(self, platform: str = None, chunk_size: int = 1000) -> AsyncIterator[Publication]:
+        """Iterar sobre todas as publicações buscando do servidor em blocos (para exportações)"""
+        query = select(Publication).order_by(Publication.published_at, Publication.id)
+
+        if platform:
+            query = query.where(Publication.platform == platform)
+
+        async with self.get_session() as session:
+            result = await session.stream(query.execution_options(yield_per=chunk_size))
+            async for publication in result.scalars():
+                yield publication
+
+    async def create_metrics(self, metrics_data: dict):
+        """Criar métricas"""
+        try:
+            return await self._write(self.sync._insert_metrics, metrics_data)
+        finally:
+            # Escrita fora da ingestão: o cache desta publicação deixa de valer
+            with self.sync._latest_metrics_lock:
+                self.sync._latest_metrics_cache.pop(metrics_data.get('publication_id'), None)
+
+    async def ingest_metrics(self, metrics_data: dict) -> Dict[str, Any]:
+        """Ingerir uma leitura de métricas gravando apenas se algo mudou"""
+        return await self.ingest_metrics_batch([metrics_data])
+
+    async def ingest_metrics_batch(self, readings: List[dict]) -> Dict[str, Any]:
+        """Ingerir leituras de métricas gravando snapshot novo apenas quando os valores mudam"""
+        result, updates = await self._write(self.sync._ingest_metrics_batch, readings)
+        self.sync._publish_latest_metrics(updates)
+        return result
+
+    async def get_metrics_raw_data(self, metrics_id: int) -> Optional[Any]:
+        """Carregar sob demanda os dados brutos da API de um snapshot"""
+        async with self.get_session() as session:
+            row = (await session.execute(
+                select(Metrics.raw_payload_hash, Metrics.raw_data).where(Metrics.id == metrics_id)
+            )).first()
+
+            if row is None:
+                return None
+
+            if row.raw_payload_hash is None:
+                return row.raw_data
+
+            payload = await session.get(RawPayload, row.raw_payload_hash)
+            return _decompress_payload(payload.codec, payload.data) if payload else None
+
+    async def get_metrics_rollups(self, granularity: str = 'hour', start: datetime = None, end: datetime = None,
+                                  publication_ids: Iterable[int] = None, platform: str = None) -> List[MetricsRollup]:
+        """Obter rollups de métricas em um intervalo de tempo para gráficos"""
+        query = select(MetricsRollup).where(MetricsRollup.granularity == granularity)
+
+        if start:
+            query = query.where(MetricsRollup.bucket_start >= _bucket_start(start, granularity))
+
+        if end:
+            query = query.where(MetricsRollup.bucket_start <= end)
+
+        if platform:
+            query = query.where(MetricsRollup.platform == platform)
+
+        if publication_ids is not None:
+            query = query.where(MetricsRollup.publication_id.in_(list(publication_ids)))
+
+        query = query.order_by(MetricsRollup.bucket_start, MetricsRollup.publication_id)
+
+        async with self.get_session() as session:
+            return list((await session.execute(query)).scalars())
+
+    async def get_latest_metrics(self, publication_id: int):
+        """Obter métricas mais recentes de uma publicação"""
+        async with self.get_session() as session:
+            return (await session.execute(
+                select(Metrics).where(Metrics.publication_id == publication_id).order_by(
+                    Metrics.collected_at.desc()
+                ).limit(1)
+            )).scalars().first()
+
+    async def get_latest_metrics_bulk(self, publication_ids: Iterable[int] = None,
+                                      platform: str = None) -> Dict[int, Metrics]:
+        """Obter o snapshot de métricas mais recente de várias publicações em uma consulta"""
+        ids = list(publication_ids) if publication_ids is not None else None
+        if ids is not None and not ids:
+            return {}
+
+        latest = {}
+        async with self.get_session() as session:
+            for chunk in (_chunked(ids) if ids is not None else [None]):
+                subquery = _latest_metrics_subquery(chunk)
+                query = select(Metrics).join(subquery, Metrics.id == subquery.c.metrics_id)
+                if platform:
+                    query = query.join(Publication, Publication.id == Metrics.publication_id).where(
+                        Publication.platform == platform
+                    )
+                for metrics in (await session.execute(query)).scalars():
+                    latest[metrics.publication_id] = metrics
+        return latest
+
+    async def save_api_config(self, platform: str, **config_data):
+        """Salvar configuração de API"""
+        try:
+            return await self._write(self.sync._upsert_api_config, platform, config_data)
+        finally:
+            self.sync.invalidate_api_config_cache()
+
+    async def get_api_config(self, platform: str):
+        """Obter configuração de API (compartilha o cache com TTL do gerenciador síncrono)"""
+        cache = self.sync
+        await self._check_api_config_version()
+
+        now = time.monotonic()
+        with cache._api_config_lock:
+            entry = cache._api_config_cache.get(platform)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        async with self.get_session() as session:
+            config = (await session.execute(
+                select(APIConfig).where(APIConfig.platform == platform)
+            )).scalars().first()
+
+        with cache._api_config_lock:
+            cache._api_config_cache[platform] = (now + cache.api_config_ttl, config)
+        return config
+
+    async def _check_api_config_version(self):
+        """Limpar o cache se outro processo alterou as configurações de API"""
+        cache = self.sync
+        if cache.api_config_version_interval is None:
+            return
+
+        now = time.monotonic()
+        with cache._api_config_lock:
+            if now < cache._api_config_next_version_check:
+                return
+            cache._api_config_next_version_check = now + cache.api_config_version_interval
+
+        async with self.get_session() as session:
+            version = (await session.execute(
+                select(CacheVersion.version).where(CacheVersion.name == API_CONFIG_CACHE_NAME)
+            )).scalar()
+
+        with cache._api_config_lock:
+            if version != cache._api_config_version:
+                cache._api_config_cache.clear()
+                cache._api_config_version = version
+
+    async def get_dashboard_stats(self) -> Dict[str, int]:
+        """Obter estatísticas para dashboard"""
+        return await self._read(self.sync._dashboard_stats)
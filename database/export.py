@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Exportação de Dados
+Descrição: Exporta conteúdos, publicações e métricas em streaming para CSV ou Parquet
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import csv
+import time
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import select
+
+from database.models import DatabaseManager, GeneratedContent, Publication, Metrics, _latest_metrics_subquery
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('csv', 'parquet')
+EXPORT_METRICS_MODES = ('latest', 'all')
+
+# Colunas exportadas, na ordem do arquivo
+EXPORT_COLUMNS = (
+    ("content_id", GeneratedContent.id),
+    ("prompt", GeneratedContent.prompt),
+    ("style", GeneratedContent.style),
+    ("content_status", GeneratedContent.status),
+    ("content_created_at", GeneratedContent.created_at),
+    ("publication_id", Publication.id),
+    ("platform", Publication.platform),
+    ("platform_post_id", Publication.platform_post_id),
+    ("publication_status", Publication.status),
+    ("hashtags", Publication.hashtags),
+    ("published_at", Publication.published_at),
+    ("likes", Metrics.likes),
+    ("comments", Metrics.comments),
+    ("shares", Metrics.shares),
+    ("views", Metrics.views),
+    ("metrics_collected_at", Metrics.collected_at),
+)
+EXPORT_FIELD_NAMES = [name for name, _ in EXPORT_COLUMNS]
+
+
+def _export_query(metrics: str, platform: Optional[str]):
+    """Montar a consulta que une conteúdo, publicação e métricas"""
+    if metrics not in EXPORT_METRICS_MODES:
+        raise ValueError(f"Modo de métricas não suportado: {metrics}")
+
+    query = select(*(column.label(name) for name, column in EXPORT_COLUMNS)).select_from(
+        Publication
+    ).join(GeneratedContent, GeneratedContent.id == Publication.content_id)
+
+    if metrics == 'latest':
+        # Uma linha por publicação, com o snapshot mais recente (ou vazio)
+        latest = _latest_metrics_subquery()
+        query = query.outerjoin(latest, latest.c.publication_id == Publication.id).outerjoin(
+            Metrics, Metrics.id == latest.c.metrics_id
+        ).order_by(Publication.id)
+    else:
+        # Uma linha por snapshot (publicações sem métricas aparecem uma vez, sem valores)
+        query = query.outerjoin(Metrics, Metrics.publication_id == Publication.id).order_by(
+            Publication.id, Metrics.collected_at, Metrics.id
+        )
+
+    if platform:
+        query = query.where(Publication.platform == platform)
+
+    return query
+
+
+def iter_export_chunks(db_manager: DatabaseManager, metrics: str = 'latest', platform: str = None,
+                       chunk_size: int = 10000) -> Iterator[List[Any]]:
+    """Iterar as linhas da exportação em blocos, buscando do servidor sob demanda"""
+    query = _export_query(metrics, platform)
+
+    session = db_manager.get_session()
+    try:
+        result = session.execute(query.execution_options(yield_per=chunk_size))
+        for partition in result.partitions():
+            yield partition
+    finally:
+        session.close()
+
+
+def _write_csv(chunks: Iterator[List[Any]], output_path: str) -> int:
+    """Gravar os blocos em CSV, um bloco por vez"""
+    rows = 0
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_FIELD_NAMES)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            rows += len(chunk)
+    return rows
+
+
+def _write_parquet(chunks: Iterator[List[Any]], output_path: str, compression: str) -> int:
+    """Gravar os blocos em Parquet, um row group por bloco"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("content_id", pa.string()),
+        ("prompt", pa.string()),
+        ("style", pa.string()),
+        ("content_status", pa.string()),
+        ("content_created_at", pa.timestamp("us")),
+        ("publication_id", pa.int64()),
+        ("platform", pa.string()),
+        ("platform_post_id", pa.string()),
+        ("publication_status", pa.string()),
+        ("hashtags", pa.string()),
+        ("published_at", pa.timestamp("us")),
+        ("likes", pa.int64()),
+        ("comments", pa.int64()),
+        ("shares", pa.int64()),
+        ("views", pa.int64()),
+        ("metrics_collected_at", pa.timestamp("us")),
+    ])
+
+    rows = 0
+    with pq.ParquetWriter(output_path, schema, compression=compression) as writer:
+        for chunk in chunks:
+            columns = list(zip(*chunk))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            rows += len(chunk)
+    return rows
+
+
+def export_data(db_manager: DatabaseManager, output_path: str, fmt: str = 'csv', metrics: str = 'latest',
+                platform: str = None, chunk_size: int = 10000, compression: str = "zstd") -> Dict[str, Any]:
+    """Exportar conteúdos, publicações e métricas com memória limitada ao tamanho do bloco
+
+    Retorna a quantidade de linhas, o tempo gasto e a vazão em linhas por segundo.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação não suportado: {fmt}")
+
+    start = time.perf_counter()
+    chunks = iter_export_chunks(db_manager, metrics, platform, chunk_size)
+    if fmt == 'csv':
+        rows = _write_csv(chunks, output_path)
+    else:
+        rows = _write_parquet(chunks, output_path, compression)
+    elapsed = time.perf_counter() - start
+
+    logger.info(f"{rows} linhas exportadas para {output_path} em {elapsed:.2f}s")
+    return {
+        "rows": rows,
+        "path": output_path,
+        "elapsed": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+    }
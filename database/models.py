@@ -6,11 +6,31 @@ Autor: Gerador de Conteúdo
 Data: 2024
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey, Index
+from sqlalchemy import LargeBinary, and_, or_, inspect, func, insert, delete, update, text, null, bindparam
+from sqlalchemy import select
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
-from datetime import datetime
+from sqlalchemy.orm import sessionmaker, relationship, deferred, selectinload
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import base64
+import hashlib
+import json
+import logging
 import os
+import re
+import threading
+import time
+import zlib
+
+from database.rows import ContentRow, PublicationRow, HashtagStatsRow
+
+try:
+    import zstandard
+except ImportError:  # zstd é opcional; zlib é usado como alternativa
+    zstandard = None
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
@@ -34,6 +54,12 @@ class GeneratedContent(Base):
     
     # Relacionamentos
     publications = relationship("Publication", back_populates="content")
+    
+    # Índice para paginação keyset da fila de aprovação
+    __table_args__ = (
+        Index('ix_generated_content_status_created', 'status', 'created_at', 'id'),
+        Index('ix_generated_content_created', 'created_at', 'id'),
+    )
 
 class Publication(Base):
     """Modelo para publicações em redes sociais"""
@@ -51,6 +77,11 @@ class Publication(Base):
     # Relacionamentos
     content = relationship("GeneratedContent", back_populates="publications")
     metrics = relationship("Metrics", back_populates="publication")
+    
+    # Índice para paginação keyset por data de publicação
+    __table_args__ = (
+        Index('ix_publications_published', 'published_at', 'id'),
+    )
 
 class Metrics(Base):
     """Modelo para métricas de posts"""
@@ -63,10 +94,72 @@ class Metrics(Base):
     shares = Column(Integer, default=0)
     views = Column(Integer, default=0)
     collected_at = Column(DateTime, default=datetime.utcnow)
-    raw_data = Column(JSON)  # Dados brutos da API
+    # Coluna legada: payloads novos ficam comprimidos em raw_payloads
+    raw_data = deferred(Column(JSON))
+    raw_payload_hash = Column(String(64), ForeignKey('raw_payloads.content_hash'))
+    last_checked_at = Column(DateTime)  # Última coleta que confirmou estes valores
     
     # Relacionamentos
     publication = relationship("Publication", back_populates="metrics")
+    
+    # Índice composto para buscar o snapshot mais recente por publicação
+    __table_args__ = (
+        Index('ix_metrics_publication_collected', 'publication_id', 'collected_at', 'id'),
+    )
+
+class RawPayload(Base):
+    """Modelo para respostas brutas das APIs, comprimidas e deduplicadas por hash"""
+    __tablename__ = 'raw_payloads'
+    
+    content_hash = Column(String(64), primary_key=True)  # sha256 do JSON canônico
+    codec = Column(String(10), nullable=False)  # zstd, zlib
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer)  # Tamanho original em bytes
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class MetricsRollup(Base):
+    """Modelo para agregados de métricas por publicação e janela de tempo"""
+    __tablename__ = 'metrics_rollups'
+    
+    publication_id = Column(Integer, ForeignKey('publications.id'), primary_key=True)
+    granularity = Column(String(10), primary_key=True)  # hour, day
+    bucket_start = Column(DateTime, primary_key=True)
+    platform = Column(String(50), nullable=False)
+    likes_max = Column(Integer, default=0)
+    comments_max = Column(Integer, default=0)
+    shares_max = Column(Integer, default=0)
+    views_max = Column(Integer, default=0)
+    likes_delta = Column(Integer, default=0)
+    comments_delta = Column(Integer, default=0)
+    shares_delta = Column(Integer, default=0)
+    views_delta = Column(Integer, default=0)
+    snapshot_count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Índice para consultas de intervalo dos gráficos
+    __table_args__ = (
+        Index('ix_metrics_rollups_range', 'granularity', 'bucket_start', 'platform'),
+    )
+
+class Hashtag(Base):
+    """Modelo para hashtags normalizadas"""
+    __tablename__ = 'hashtags'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tag = Column(String(100), nullable=False, unique=True)  # minúsculas, sem '#'
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class PublicationHashtag(Base):
+    """Modelo de ligação entre publicações e hashtags"""
+    __tablename__ = 'publication_hashtags'
+    
+    publication_id = Column(Integer, ForeignKey('publications.id'), primary_key=True)
+    hashtag_id = Column(Integer, ForeignKey('hashtags.id'), primary_key=True)
+    
+    # Índice para buscar publicações a partir da hashtag
+    __table_args__ = (
+        Index('ix_publication_hashtags_hashtag', 'hashtag_id', 'publication_id'),
+    )
 
 class APIConfig(Base):
     """Modelo para configurações de API"""
@@ -82,10 +175,274 @@ class APIConfig(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+HASHTAG_PATTERN = re.compile(r'#(\w+)')
+WORD_PATTERN = re.compile(r'\w+')
+HASHTAG_MAX_LENGTH = 100
+
+
+def parse_hashtags(text_value: Optional[str]) -> List[str]:
+    """Extrair hashtags normalizadas (minúsculas, sem '#', sem repetição) de um texto
+    
+    Sem nenhum '#' no texto, cada palavra é tratada como hashtag ("ai, arte" -> ai, arte).
+    """
+    if not text_value:
+        return []
+    
+    tags = HASHTAG_PATTERN.findall(text_value) or WORD_PATTERN.findall(text_value)
+    normalized = (tag.casefold()[:HASHTAG_MAX_LENGTH] for tag in tags)
+    return list(dict.fromkeys(normalized))
+
+
+# Limite de parâmetros por cláusula IN (SQLite antigo aceita no máximo 999)
+IN_CLAUSE_CHUNK_SIZE = 500
+
+
+def _chunked(values: List[Any], size: int = IN_CLAUSE_CHUNK_SIZE) -> Iterator[List[Any]]:
+    """Dividir lista em blocos de tamanho fixo"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+# Transições de status permitidas para conteúdo (origem -> destinos)
+CONTENT_STATUS_TRANSITIONS = {
+    'pending_approval': ('approved', 'rejected'),
+    'approved': ('published', 'rejected'),
+    'rejected': ('pending_approval',),
+    'published': (),
+}
+
+# Métricas agregadas nos rollups e granularidades mantidas
+ROLLUP_FIELDS = ('likes', 'comments', 'shares', 'views')
+ROLLUP_GRANULARITIES = ('hour', 'day')
+
+
+def _bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Calcular o início da janela de tempo de um snapshot"""
+    if granularity == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == 'day':
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Granularidade não suportada: {granularity}")
+
+
+def _compress_payload(payload: Any) -> Dict[str, Any]:
+    """Serializar payload em JSON canônico, calcular hash e comprimir"""
+    raw = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    raw = raw.encode('utf-8')
+    
+    if zstandard is not None:
+        codec, data = 'zstd', zstandard.ZstdCompressor(level=9).compress(raw)
+    else:
+        codec, data = 'zlib', zlib.compress(raw, 9)
+    
+    return {
+        "content_hash": hashlib.sha256(raw).hexdigest(),
+        "codec": codec,
+        "data": data,
+        "size": len(raw)
+    }
+
+
+def _decompress_payload(codec: str, data: bytes) -> Any:
+    """Descomprimir payload bruto armazenado"""
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Pacote zstandard necessário para ler payloads zstd")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == 'zlib':
+        raw = zlib.decompress(data)
+    else:
+        raise ValueError(f"Codec de payload não suportado: {codec}")
+    return json.loads(raw.decode('utf-8'))
+
+
+def _latest_metrics_subquery(publication_ids: Optional[List[int]] = None):
+    """Subconsulta com o id do snapshot mais recente de cada publicação"""
+    # A janela percorre o índice (publication_id, collected_at, id)
+    ranked = select(
+        Metrics.id.label('metrics_id'),
+        Metrics.publication_id.label('publication_id'),
+        func.row_number().over(
+            partition_by=Metrics.publication_id,
+            order_by=(Metrics.collected_at.desc(), Metrics.id.desc())
+        ).label('position')
+    )
+    
+    if publication_ids is not None:
+        ranked = ranked.where(Metrics.publication_id.in_(publication_ids))
+    
+    ranked = ranked.subquery()
+    return select(ranked.c.metrics_id, ranked.c.publication_id).where(
+        ranked.c.position == 1
+    ).subquery('latest_metrics')
+
+
+def _encode_cursor(timestamp: Optional[datetime], row_id: Any) -> str:
+    """Codificar cursor de paginação keyset (timestamp, id); timestamp nulo vira vazio"""
+    raw = f"{timestamp.isoformat() if timestamp is not None else ''}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    """Decodificar cursor de paginação keyset"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        timestamp, row_id = raw.split('|', 1)
+        return (datetime.fromisoformat(timestamp) if timestamp else None), row_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Cursor de paginação inválido: {cursor}") from e
+
+
+def _keyset_page(query, time_column, id_column, limit: int, cursor: Optional[str],
+                 descending: bool, cast_id=str) -> Dict[str, Any]:
+    """Aplicar paginação keyset em (time_column, id_column) e montar a página
+    
+    Timestamps nulos ordenam antes de qualquer data (NULLS FIRST na ordem crescente,
+    NULLS LAST na decrescente), então também são alcançados pelo cursor.
+    """
+    if cursor:
+        last_time, last_id = _decode_cursor(cursor)
+        last_id = cast_id(last_id)
+        if last_time is None:
+            # Cursor ainda entre os nulos: segue neles e, na ordem crescente, passa às datas
+            after_id = id_column < last_id if descending else id_column > last_id
+            same_time = and_(time_column.is_(None), after_id)
+            query = query.filter(same_time if descending else or_(same_time, time_column.isnot(None)))
+        elif descending:
+            query = query.filter(or_(
+                time_column < last_time,
+                and_(time_column == last_time, id_column < last_id),
+                time_column.is_(None)
+            ))
+        else:
+            query = query.filter(or_(
+                time_column > last_time,
+                and_(time_column == last_time, id_column > last_id)
+            ))
+    
+    if descending:
+        query = query.order_by(time_column.desc().nulls_last(), id_column.desc())
+    else:
+        query = query.order_by(time_column.asc().nulls_first(), id_column.asc())
+    
+    # Buscar um item a mais para saber se existe próxima página
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        next_cursor = _encode_cursor(
+            getattr(last, time_column.key), getattr(last, id_column.key)
+        )
+    
+    return {"items": items, "next_cursor": next_cursor}
+
+
+class CacheVersion(Base):
+    """Modelo para contadores de versão usados na invalidação de caches entre processos"""
+    __tablename__ = 'cache_versions'
+    
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+API_CONFIG_CACHE_NAME = 'api_config'
+
+
+class DashboardCounters(Base):
+    """Modelo para os contadores materializados do dashboard (linha única)"""
+    __tablename__ = 'dashboard_counters'
+    
+    id = Column(Integer, primary_key=True)
+    total_content = Column(Integer, nullable=False, default=0)
+    pending_content = Column(Integer, nullable=False, default=0)
+    approved_content = Column(Integer, nullable=False, default=0)
+    rejected_content = Column(Integer, nullable=False, default=0)
+    published_content = Column(Integer, nullable=False, default=0)
+    total_publications = Column(Integer, nullable=False, default=0)
+    total_likes = Column(Integer, nullable=False, default=0)
+    total_comments = Column(Integer, nullable=False, default=0)
+    total_shares = Column(Integer, nullable=False, default=0)
+    total_views = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+DASHBOARD_COUNTERS_ID = 1
+DASHBOARD_COUNTER_FIELDS = (
+    'total_content', 'pending_content', 'approved_content', 'rejected_content', 'published_content',
+    'total_publications', 'total_likes', 'total_comments', 'total_shares', 'total_views'
+)
+# Contador de cada status de conteúdo (status fora do mapa só entram em total_content)
+STATUS_COUNTERS = {
+    'pending_approval': 'pending_content',
+    'approved': 'approved_content',
+    'rejected': 'rejected_content',
+    'published': 'published_content',
+}
+
+# Índice full-text (SQLite FTS5) dos prompts de conteúdo.
+# O conteúdo é guardado na própria tabela FTS: generated_content não tem INTEGER PRIMARY KEY
+# e o VACUUM pode renumerar seus rowids, o que dessincronizaria uma tabela external-content.
+# A tabela de ids mapeia cada conteúdo ao rowid da sua linha FTS, para que os triggers
+# apaguem por rowid em vez de varrer a coluna content_id (UNINDEXED).
+CONTENT_FTS_TABLE = 'generated_content_fts'
+CONTENT_FTS_IDS_TABLE = 'generated_content_fts_ids'
+CONTENT_FTS_DDL = (
+    f"DROP TRIGGER IF EXISTS {CONTENT_FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {CONTENT_FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {CONTENT_FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {CONTENT_FTS_TABLE}",
+    f"CREATE VIRTUAL TABLE {CONTENT_FTS_TABLE} USING fts5("
+    "content_id UNINDEXED, prompt, revised_prompt, tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TABLE {CONTENT_FTS_IDS_TABLE} ("
+    "content_id VARCHAR PRIMARY KEY, fts_rowid INTEGER NOT NULL)",
+    f"""CREATE TRIGGER {CONTENT_FTS_TABLE}_ai AFTER INSERT ON generated_content BEGIN
+        INSERT INTO {CONTENT_FTS_TABLE}(content_id, prompt, revised_prompt)
+        VALUES (new.id, new.prompt, new.revised_prompt);
+        INSERT INTO {CONTENT_FTS_IDS_TABLE}(content_id, fts_rowid) VALUES (new.id, last_insert_rowid());
+    END""",
+    f"""CREATE TRIGGER {CONTENT_FTS_TABLE}_ad AFTER DELETE ON generated_content BEGIN
+        DELETE FROM {CONTENT_FTS_TABLE} WHERE rowid = (
+            SELECT fts_rowid FROM {CONTENT_FTS_IDS_TABLE} WHERE content_id = old.id
+        );
+        DELETE FROM {CONTENT_FTS_IDS_TABLE} WHERE content_id = old.id;
+    END""",
+    f"""CREATE TRIGGER {CONTENT_FTS_TABLE}_au AFTER UPDATE OF id, prompt, revised_prompt
+    ON generated_content BEGIN
+        DELETE FROM {CONTENT_FTS_TABLE} WHERE rowid = (
+            SELECT fts_rowid FROM {CONTENT_FTS_IDS_TABLE} WHERE content_id = old.id
+        );
+        DELETE FROM {CONTENT_FTS_IDS_TABLE} WHERE content_id = old.id;
+        INSERT INTO {CONTENT_FTS_TABLE}(content_id, prompt, revised_prompt)
+        VALUES (new.id, new.prompt, new.revised_prompt);
+        INSERT INTO {CONTENT_FTS_IDS_TABLE}(content_id, fts_rowid) VALUES (new.id, last_insert_rowid());
+    END""",
+    f"""INSERT INTO {CONTENT_FTS_TABLE}(content_id, prompt, revised_prompt)
+    SELECT id, prompt, revised_prompt FROM generated_content""",
+    f"""INSERT INTO {CONTENT_FTS_IDS_TABLE}(content_id, fts_rowid)
+    SELECT content_id, rowid FROM {CONTENT_FTS_TABLE}""",
+)
+
+
+def _fts_match_expression(query: str) -> str:
+    """Converter texto livre em expressão FTS5 segura (todas as palavras, como frases)"""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return ' '.join(f'"{term}"' for term in terms if term)
+
+
 class DatabaseManager:
     """Gerenciador do banco de dados"""
     
-    def __init__(self, database_url: str = None):
+    def __init__(self, database_url: str = None, api_config_ttl: float = 300.0,
+                 api_config_version_interval: Optional[float] = 2.0):
+        """
+        Args:
+            database_url: URL do banco (SQLite local por padrão)
+            api_config_ttl: Segundos que uma configuração de API fica em cache
+            api_config_version_interval: Intervalo em segundos para checar a versão
+                compartilhada das configurações (None desativa a checagem entre processos)
+        """
         if database_url is None:
             # Usar SQLite por padrão
             database_url = "sqlite:///content_automation.db"
@@ -93,8 +450,130 @@ class DatabaseManager:
         self.engine = create_engine(database_url)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         
+        # Cache dos últimos valores por publicação para a ingestão por mudança
+        self._latest_metrics_cache = {}
+        self._latest_metrics_lock = threading.Lock()
+        
+        # Cache read-through das configurações de API
+        self.api_config_ttl = api_config_ttl
+        self.api_config_version_interval = api_config_version_interval
+        self._api_config_cache = {}
+        self._api_config_version = None
+        self._api_config_next_version_check = 0.0
+        self._api_config_lock = threading.Lock()
+        
         # Criar tabelas
         Base.metadata.create_all(bind=self.engine)
+        self._ensure_schema()
+    
+    def _ensure_schema(self):
+        """Aplicar ajustes de schema em bancos criados por versões anteriores"""
+        inspector = inspect(self.engine)
+        existing_tables = set(inspector.get_table_names())
+        
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            
+            # create_all não adiciona colunas novas (opcionais) em tabelas existentes
+            existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+            with self.engine.begin() as connection:
+                for column in table.columns:
+                    if column.name in existing_columns or not column.nullable:
+                        continue
+                    column_type = column.type.compile(dialect=self.engine.dialect)
+                    connection.execute(text(
+                        f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                    ))
+            
+            # create_all também não cria índices novos em tabelas já existentes
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
+        
+        self.fts_enabled = self._ensure_content_fts()
+        
+        # Bancos anteriores aos contadores materializados: calcular uma vez a partir dos dados
+        with self.engine.connect() as connection:
+            has_counters = connection.execute(
+                select(DashboardCounters.id).where(DashboardCounters.id == DASHBOARD_COUNTERS_ID)
+            ).first()
+        if not has_counters:
+            self.reconcile_dashboard_counters()
+    
+    def _ensure_content_fts(self) -> bool:
+        """Criar (uma vez) o índice FTS5 de prompts e seus triggers de sincronização
+        
+        Bancos com o índice anterior à tabela de ids têm o índice recriado.
+        """
+        if self.engine.dialect.name != 'sqlite':
+            return False
+        
+        with self.engine.connect() as connection:
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": CONTENT_FTS_IDS_TABLE}
+            ).first()
+        if exists:
+            return True
+        
+        try:
+            with self.engine.begin() as connection:
+                for statement in CONTENT_FTS_DDL:
+                    connection.execute(text(statement))
+            return True
+        except Exception as e:
+            logger.warning(f"FTS5 indisponível, busca de prompts usará LIKE: {e}")
+            return False
+    
+    def _insert_ignore(self, session, model, values: dict):
+        """Inserir linha ignorando conflito de chave primária"""
+        dialect = self.engine.dialect.name
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            primary_key = tuple(values[c.name] for c in model.__table__.primary_key.columns)
+            if session.get(model, primary_key) is None:
+                session.add(model(**values))
+                session.flush()
+            return
+        
+        session.execute(dialect_insert(model).values(**values).on_conflict_do_nothing())
+    
+    def _bump_counters(self, session, **deltas: int):
+        """Somar deltas aos contadores do dashboard na transação da escrita"""
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        
+        table = DashboardCounters.__table__
+        session.execute(
+            update(table).where(table.c.id == DASHBOARD_COUNTERS_ID).values(
+                updated_at=datetime.utcnow(),
+                **{field: table.c[field] + delta for field, delta in deltas.items()}
+            )
+        )
+    
+    def _bump_status_counters(self, session, origin: Optional[str], target: Optional[str], count: int = 1):
+        """Mover count conteúdos do contador de um status para o de outro"""
+        deltas = {}
+        if origin in STATUS_COUNTERS:
+            deltas[STATUS_COUNTERS[origin]] = -count
+        if target in STATUS_COUNTERS:
+            field = STATUS_COUNTERS[target]
+            deltas[field] = deltas.get(field, 0) + count
+        self._bump_counters(session, **deltas)
+    
+    def _store_raw_payload(self, session, payload: Any) -> Optional[str]:
+        """Gravar payload bruto comprimido (uma vez por conteúdo) e retornar seu hash"""
+        if payload is None:
+            return None
+        
+        values = _compress_payload(payload)
+        values['created_at'] = datetime.utcnow()
+        self._insert_ignore(session, RawPayload, values)
+        return values['content_hash']
     
     def get_session(self):
         """Obter sessão do banco"""
@@ -104,8 +583,7 @@ class DatabaseManager:
         """Criar novo conteúdo"""
         session = self.get_session()
         try:
-            content = GeneratedContent(**content_data)
-            session.add(content)
+            content = self._insert_content(session, content_data)
             session.commit()
             session.refresh(content)
             return content
@@ -115,7 +593,17 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def get_content(self, content_id: str = None, status: str = None):
+    def _insert_content(self, session, content_data: dict) -> GeneratedContent:
+        """Inserir conteúdo na sessão informada"""
+        content = GeneratedContent(**content_data)
+        session.add(content)
+        session.flush()
+        
+        self._bump_counters(session, total_content=1)
+        self._bump_status_counters(session, None, content.status)
+        return content
+    
+    def get_content(self, content_id: str = None, status: str = None, load_publications: bool = False):
         """Obter conteúdo"""
         session = self.get_session()
         try:
@@ -127,35 +615,211 @@ class DatabaseManager:
             if status:
                 query = query.filter(GeneratedContent.status == status)
             
+            # Carregar o relacionamento antes de fechar a sessão (evita DetachedInstanceError)
+            if load_publications:
+                query = query.options(selectinload(GeneratedContent.publications))
+            
             return query.all()
         finally:
             session.close()
     
+    def get_content_rows(self, status: str = None, limit: int = None) -> List[ContentRow]:
+        """Obter listagem somente leitura de conteúdo como tuplas leves"""
+        session = self.get_session()
+        try:
+            query = select(*(getattr(GeneratedContent, f) for f in ContentRow._fields)).order_by(
+                GeneratedContent.created_at, GeneratedContent.id
+            )
+            
+            if status:
+                query = query.where(GeneratedContent.status == status)
+            
+            if limit:
+                query = query.limit(limit)
+            
+            return [ContentRow._make(row) for row in session.execute(query)]
+        finally:
+            session.close()
+    
+    def get_content_page(self, status: str = None, limit: int = 20, cursor: str = None,
+                         descending: bool = False) -> Dict[str, Any]:
+        """Obter página de conteúdo ordenada por (created_at, id) com cursor keyset"""
+        session = self.get_session()
+        try:
+            query = session.query(GeneratedContent)
+            
+            if status:
+                query = query.filter(GeneratedContent.status == status)
+            
+            return _keyset_page(
+                query, GeneratedContent.created_at, GeneratedContent.id,
+                limit, cursor, descending
+            )
+        finally:
+            session.close()
+    
+    def iter_content(self, status: str = None, chunk_size: int = 1000) -> Iterator[GeneratedContent]:
+        """Iterar sobre todo o conteúdo buscando do servidor em blocos (para exportações)"""
+        session = self.get_session()
+        try:
+            query = session.query(GeneratedContent).order_by(
+                GeneratedContent.created_at, GeneratedContent.id
+            )
+            
+            if status:
+                query = query.filter(GeneratedContent.status == status)
+            
+            query = query.execution_options(stream_results=True).yield_per(chunk_size)
+            for content in query:
+                yield content
+        finally:
+            session.close()
+    
+    def search_content(self, query: str, limit: int = 20, cursor: str = None) -> Dict[str, Any]:
+        """Buscar conteúdo por palavras do prompt ou do prompt revisado, por relevância
+        
+        O cursor é a posição na lista ranqueada (a ordem por bm25 não tem chave estável).
+        """
+        session = self.get_session()
+        try:
+            return self._search_content(session, query, limit, cursor)
+        finally:
+            session.close()
+    
+    def _search_content(self, session, query: str, limit: int, cursor: Optional[str]) -> Dict[str, Any]:
+        """Executar a busca de conteúdo na sessão informada"""
+        match = _fts_match_expression(query)
+        if not match:
+            return {"items": [], "next_cursor": None}
+        
+        offset = int(cursor) if cursor else 0
+        if self.fts_enabled:
+            ranked_ids = [row[0] for row in session.execute(
+                text(
+                    f"SELECT content_id FROM {CONTENT_FTS_TABLE} "
+                    f"WHERE {CONTENT_FTS_TABLE} MATCH :match "
+                    f"ORDER BY bm25({CONTENT_FTS_TABLE}) LIMIT :limit OFFSET :offset"
+                ),
+                {"match": match, "limit": limit + 1, "offset": offset}
+            )]
+        else:
+            conditions = [
+                or_(GeneratedContent.prompt.ilike(f"%{term}%"),
+                    GeneratedContent.revised_prompt.ilike(f"%{term}%"))
+                for term in query.split()
+            ]
+            ranked_ids = [row[0] for row in session.query(GeneratedContent.id).filter(
+                and_(*conditions)
+            ).order_by(GeneratedContent.created_at.desc()).limit(limit + 1).offset(offset)]
+        
+        has_more = len(ranked_ids) > limit
+        ranked_ids = ranked_ids[:limit]
+        
+        contents = {
+            content.id: content
+            for content in session.query(GeneratedContent).filter(
+                GeneratedContent.id.in_(ranked_ids)
+            )
+        } if ranked_ids else {}
+        
+        return {
+            "items": [contents[cid] for cid in ranked_ids if cid in contents],
+            "next_cursor": str(offset + limit) if has_more else None
+        }
+    
     def update_content_status(self, content_id: str, status: str, **kwargs):
         """Atualizar status do conteúdo"""
         session = self.get_session()
         try:
-            content = session.query(GeneratedContent).filter(GeneratedContent.id == content_id).first()
-            if content:
-                content.status = status
-                for key, value in kwargs.items():
-                    if hasattr(content, key):
-                        setattr(content, key, value)
+            updated = self._set_content_status(session, content_id, status, **kwargs)
+            if updated:
                 session.commit()
-                return True
+            return updated
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def _set_content_status(self, session, content_id: str, status: str, **kwargs) -> bool:
+        """Alterar status de um conteúdo na sessão informada"""
+        content = session.query(GeneratedContent).filter(GeneratedContent.id == content_id).first()
+        if not content:
             return False
+        
+        self._bump_status_counters(session, content.status, status)
+        content.status = status
+        for key, value in kwargs.items():
+            if hasattr(content, key):
+                setattr(content, key, value)
+        session.flush()
+        return True
+    
+    def update_content_status_bulk(self, content_ids: Iterable[str], status: str,
+                                   chunk_size: int = IN_CLAUSE_CHUNK_SIZE, **fields) -> List[str]:
+        """Atualizar o status de vários conteúdos com um UPDATE por bloco de ids
+        
+        Só são alterados os conteúdos cujo status atual permite a transição
+        (CONTENT_STATUS_TRANSITIONS); a checagem acontece no WHERE do próprio UPDATE.
+        Retorna os ids efetivamente atualizados.
+        """
+        if status not in CONTENT_STATUS_TRANSITIONS:
+            raise ValueError(f"Status de conteúdo inválido: {status}")
+        
+        session = self.get_session()
+        try:
+            updated = self._update_content_status_bulk(session, content_ids, status, chunk_size, fields)
+            session.commit()
+            return updated
         except Exception as e:
             session.rollback()
             raise e
         finally:
             session.close()
     
+    def _update_content_status_bulk(self, session, content_ids: Iterable[str], status: str,
+                                    chunk_size: int, fields: dict) -> List[str]:
+        """Aplicar as transições de status em lote na sessão informada"""
+        sources = [origin for origin, targets in CONTENT_STATUS_TRANSITIONS.items() if status in targets]
+        ids = list(dict.fromkeys(content_ids))
+        if not sources or not ids:
+            return []
+        
+        columns = GeneratedContent.__table__.c
+        values = {key: value for key, value in fields.items() if key in columns and key not in ('id', 'status')}
+        values['status'] = status
+        
+        updated = []
+        for chunk in _chunked(ids, chunk_size):
+            for origin in sources:
+                changed = self._update_status_chunk(session, chunk, origin, values)
+                self._bump_status_counters(session, origin, status, len(changed))
+                updated.extend(changed)
+        return updated
+    
+    def _update_status_chunk(self, session, content_ids: List[str], origin: str, values: dict) -> List[str]:
+        """Executar o UPDATE de um bloco de ids a partir de um status de origem"""
+        table = GeneratedContent.__table__
+        statement = update(table).where(
+            table.c.id.in_(content_ids), table.c.status == origin
+        ).values(**values)
+        
+        if self.engine.dialect.update_returning:
+            return [row[0] for row in session.execute(statement.returning(table.c.id))]
+        
+        # Bancos sem RETURNING: ler os ids afetados na mesma transação
+        matched = [row[0] for row in session.execute(
+            select(table.c.id).where(table.c.id.in_(content_ids), table.c.status == origin)
+        )]
+        if matched:
+            session.execute(statement)
+        return matched
+    
     def create_publication(self, publication_data: dict):
         """Criar nova publicação"""
         session = self.get_session()
         try:
-            publication = Publication(**publication_data)
-            session.add(publication)
+            publication = self._insert_publication(session, publication_data)
             session.commit()
             session.refresh(publication)
             return publication
@@ -165,7 +829,126 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def get_publications(self, content_id: str = None, platform: str = None):
+    def _insert_publication(self, session, publication_data: dict) -> Publication:
+        """Inserir publicação na sessão informada"""
+        publication = Publication(**publication_data)
+        session.add(publication)
+        session.flush()
+        self._link_hashtags(session, publication.id, publication.hashtags)
+        self._bump_counters(session, total_publications=1)
+        return publication
+    
+    def _link_hashtags(self, session, publication_id: int, hashtags: Optional[str]):
+        """Indexar as hashtags de uma publicação nas tabelas normalizadas"""
+        tags = parse_hashtags(hashtags)
+        if not tags:
+            return
+        
+        for tag in tags:
+            self._insert_ignore(session, Hashtag, {"tag": tag, "created_at": datetime.utcnow()})
+        
+        hashtag_ids = session.execute(select(Hashtag.id).where(Hashtag.tag.in_(tags))).scalars().all()
+        for hashtag_id in hashtag_ids:
+            self._insert_ignore(session, PublicationHashtag, {
+                "publication_id": publication_id, "hashtag_id": hashtag_id
+            })
+    
+    def rebuild_hashtag_index(self, chunk_size: int = 1000) -> int:
+        """Reindexar as hashtags de todas as publicações (backfill)"""
+        session = self.get_session()
+        try:
+            session.execute(delete(PublicationHashtag))
+            
+            indexed = 0
+            last_id = 0
+            while True:
+                rows = session.execute(
+                    select(Publication.id, Publication.hashtags).where(
+                        Publication.id > last_id
+                    ).order_by(Publication.id).limit(chunk_size)
+                ).all()
+                if not rows:
+                    break
+                
+                for row in rows:
+                    self._link_hashtags(session, row.id, row.hashtags)
+                indexed += len(rows)
+                last_id = rows[-1].id
+            
+            session.commit()
+            return indexed
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def get_publications_by_hashtag(self, tag: str, platform: str = None) -> List[Publication]:
+        """Obter publicações que usam uma hashtag"""
+        session = self.get_session()
+        try:
+            return self._publications_by_hashtag(session, tag, platform)
+        finally:
+            session.close()
+    
+    def _publications_by_hashtag(self, session, tag: str, platform: str = None) -> List[Publication]:
+        """Consultar publicações de uma hashtag na sessão informada"""
+        normalized = parse_hashtags(tag if tag.startswith('#') else f"#{tag}")
+        if not normalized:
+            return []
+        
+        query = session.query(Publication).join(
+            PublicationHashtag, PublicationHashtag.publication_id == Publication.id
+        ).join(Hashtag, Hashtag.id == PublicationHashtag.hashtag_id).filter(
+            Hashtag.tag == normalized[0]
+        )
+        
+        if platform:
+            query = query.filter(Publication.platform == platform)
+        
+        return query.order_by(Publication.published_at.desc(), Publication.id.desc()).all()
+    
+    def get_hashtag_performance(self, limit: int = 20, platform: str = None,
+                                order_by: str = 'likes') -> List[HashtagStatsRow]:
+        """Ranking de hashtags pelas métricas mais recentes das publicações que as usam"""
+        session = self.get_session()
+        try:
+            return self._hashtag_performance(session, limit, platform, order_by)
+        finally:
+            session.close()
+    
+    def _hashtag_performance(self, session, limit: int, platform: Optional[str],
+                             order_by: str) -> List[HashtagStatsRow]:
+        """Agregar métricas por hashtag na sessão informada"""
+        if order_by not in ROLLUP_FIELDS + ('publications',):
+            raise ValueError(f"Ordenação não suportada: {order_by}")
+        
+        latest = _latest_metrics_subquery()
+        totals = {
+            field: func.coalesce(func.sum(getattr(Metrics, field)), 0).label(field)
+            for field in ROLLUP_FIELDS
+        }
+        publications = func.count(PublicationHashtag.publication_id).label('publications')
+        
+        query = select(
+            Hashtag.tag, publications, *totals.values()
+        ).select_from(PublicationHashtag).join(
+            Hashtag, Hashtag.id == PublicationHashtag.hashtag_id
+        ).outerjoin(
+            latest, latest.c.publication_id == PublicationHashtag.publication_id
+        ).outerjoin(Metrics, Metrics.id == latest.c.metrics_id).group_by(Hashtag.tag)
+        
+        if platform:
+            query = query.join(
+                Publication, Publication.id == PublicationHashtag.publication_id
+            ).where(Publication.platform == platform)
+        
+        sort_column = publications if order_by == 'publications' else totals[order_by]
+        query = query.order_by(sort_column.desc(), Hashtag.tag).limit(limit)
+        
+        return [HashtagStatsRow(*row) for row in session.execute(query)]
+    
+    def get_publications(self, content_id: str = None, platform: str = None, load_content: bool = False):
         """Obter publicações"""
         session = self.get_session()
         try:
@@ -177,16 +960,91 @@ class DatabaseManager:
             if platform:
                 query = query.filter(Publication.platform == platform)
             
+            # Carregar o relacionamento antes de fechar a sessão (evita DetachedInstanceError)
+            if load_content:
+                query = query.options(selectinload(Publication.content))
+            
             return query.all()
         finally:
             session.close()
     
+    def get_publication_rows(self, content_id: str = None, platform: str = None,
+                             with_latest_metrics: bool = False) -> List[PublicationRow]:
+        """Obter listagem somente leitura de publicações como tuplas leves
+        
+        Com with_latest_metrics, likes/comments/shares/views vêm do snapshot mais recente
+        na mesma consulta; sem ele (ou sem snapshot) esses campos ficam None.
+        """
+        session = self.get_session()
+        try:
+            columns = [
+                Publication.id, Publication.content_id, Publication.platform,
+                Publication.platform_post_id, Publication.status, Publication.published_at
+            ]
+            
+            if with_latest_metrics:
+                latest = _latest_metrics_subquery()
+                query = select(
+                    *columns, Metrics.likes, Metrics.comments, Metrics.shares, Metrics.views,
+                    Metrics.collected_at
+                ).select_from(Publication).outerjoin(
+                    latest, latest.c.publication_id == Publication.id
+                ).outerjoin(Metrics, Metrics.id == latest.c.metrics_id)
+            else:
+                query = select(*columns)
+            
+            if content_id:
+                query = query.where(Publication.content_id == content_id)
+            
+            if platform:
+                query = query.where(Publication.platform == platform)
+            
+            query = query.order_by(Publication.published_at, Publication.id)
+            
+            return [PublicationRow(*row) for row in session.execute(query)]
+        finally:
+            session.close()
+    
+    def get_publications_page(self, content_id: str = None, platform: str = None, limit: int = 20,
+                              cursor: str = None, descending: bool = True) -> Dict[str, Any]:
+        """Obter página de publicações ordenada por (published_at, id) com cursor keyset"""
+        session = self.get_session()
+        try:
+            query = session.query(Publication)
+            
+            if content_id:
+                query = query.filter(Publication.content_id == content_id)
+            
+            if platform:
+                query = query.filter(Publication.platform == platform)
+            
+            return _keyset_page(
+                query, Publication.published_at, Publication.id,
+                limit, cursor, descending, cast_id=int
+            )
+        finally:
+            session.close()
+    
+    def iter_publications(self, platform: str = None, chunk_size: int = 1000) -> Iterator[Publication]:
+        """Iterar sobre todas as publicações buscando do servidor em blocos (para exportações)"""
+        session = self.get_session()
+        try:
+            query = session.query(Publication).order_by(Publication.published_at, Publication.id)
+            
+            if platform:
+                query = query.filter(Publication.platform == platform)
+            
+            query = query.execution_options(stream_results=True).yield_per(chunk_size)
+            for publication in query:
+                yield publication
+        finally:
+            session.close()
+    
     def create_metrics(self, metrics_data: dict):
         """Criar métricas"""
         session = self.get_session()
         try:
-            metrics = Metrics(**metrics_data)
-            session.add(metrics)
+            metrics = self._insert_metrics(session, metrics_data)
             session.commit()
             session.refresh(metrics)
             return metrics
@@ -195,6 +1053,420 @@ class DatabaseManager:
             raise e
         finally:
             session.close()
+            # Escrita fora da ingestão: o cache desta publicação deixa de valer
+            with self._latest_metrics_lock:
+                self._latest_metrics_cache.pop(metrics_data.get('publication_id'), None)
+    
+    def ingest_metrics(self, metrics_data: dict) -> Dict[str, Any]:
+        """Ingerir uma leitura de métricas gravando apenas se algo mudou"""
+        return self.ingest_metrics_batch([metrics_data])
+    
+    def ingest_metrics_batch(self, readings: List[dict]) -> Dict[str, Any]:
+        """Ingerir leituras de métricas gravando snapshot novo apenas quando os valores mudam
+        
+        Leituras iguais à última gravada só atualizam last_checked_at daquele snapshot,
+        então o intervalo [collected_at, last_checked_at] preserva a resolução do histórico.
+        O cache é por processo; a primeira leitura de cada publicação consulta o banco.
+        """
+        session = self.get_session()
+        try:
+            result, updates = self._ingest_metrics_batch(session, readings)
+            session.commit()
+            self._publish_latest_metrics(updates)
+            return result
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def _publish_latest_metrics(self, updates: Dict[int, Tuple[int, tuple]]):
+        """Atualizar o cache de últimos valores após o commit da ingestão"""
+        with self._latest_metrics_lock:
+            self._latest_metrics_cache.update(updates)
+    
+    def _ingest_metrics_batch(self, session, readings: List[dict]):
+        """Comparar leituras com o cache e gravar na sessão informada
+        
+        Retorna o resultado da ingestão e as entradas de cache a publicar após o commit.
+        """
+        publication_ids = {r['publication_id'] for r in readings}
+        with self._latest_metrics_lock:
+            cache = {
+                pid: self._latest_metrics_cache[pid]
+                for pid in publication_ids if pid in self._latest_metrics_cache
+            }
+        updates = {}
+        
+        # Aquecer o cache com o snapshot mais recente das publicações desconhecidas
+        missing = list(publication_ids - set(cache))
+        for chunk in _chunked(missing):
+            for metrics in self._query_latest_metrics(session, chunk):
+                updates[metrics.publication_id] = cache[metrics.publication_id] = (
+                    metrics.id, tuple(getattr(metrics, f) or 0 for f in ROLLUP_FIELDS)
+                )
+        
+        written = []
+        touched = []
+        touched_readings = []
+        for reading in readings:
+            reading = dict(reading)
+            publication_id = reading['publication_id']
+            values = tuple(reading.get(f) or 0 for f in ROLLUP_FIELDS)
+            checked_at = reading.setdefault('collected_at', datetime.utcnow())
+            
+            cached = cache.get(publication_id)
+            if cached is not None and cached[1] == values:
+                touched.append({"b_id": cached[0], "b_checked": checked_at})
+                touched_readings.append(reading)
+                continue
+            
+            reading['last_checked_at'] = checked_at
+            metrics = self._insert_metrics(session, reading)
+            updates[publication_id] = cache[publication_id] = (metrics.id, values)
+            written.append(metrics.id)
+        
+        unchanged = len(touched)
+        if touched:
+            # Só estende o snapshot se ele ainda for o mais recente da publicação
+            metrics_table = Metrics.__table__
+            newer = metrics_table.alias('newer')
+            has_newer = select(newer.c.id).where(
+                newer.c.publication_id == metrics_table.c.publication_id,
+                or_(
+                    newer.c.collected_at > metrics_table.c.collected_at,
+                    and_(newer.c.collected_at == metrics_table.c.collected_at, newer.c.id > metrics_table.c.id)
+                )
+            ).exists()
+            result = session.execute(
+                update(metrics_table).where(metrics_table.c.id == bindparam('b_id'), ~has_newer).values(
+                    last_checked_at=bindparam('b_checked')
+                ),
+                touched
+            )
+            if result.rowcount != len(touched):
+                stale = self._ingest_stale_readings(session, touched, touched_readings, updates)
+                written.extend(stale)
+                unchanged -= len(stale)
+        
+        return {"written": written, "unchanged": unchanged}, updates
+    
+    def _ingest_stale_readings(self, session, touched: List[dict], readings: List[dict],
+                               updates: Dict[int, Tuple[int, tuple]]) -> List[int]:
+        """Gravar como snapshot novo as leituras cujo cache apontava para um snapshot antigo
+        
+        Acontece quando outro processo gravou snapshots mais novos: o cache deste
+        processo não vê a mudança, então a leitura não pode ser descartada.
+        """
+        publication_ids = list({reading['publication_id'] for reading in readings})
+        latest_ids = {}
+        for chunk in _chunked(publication_ids):
+            for metrics in self._query_latest_metrics(session, chunk):
+                latest_ids[metrics.publication_id] = metrics.id
+        
+        written = []
+        inserted = {}
+        for entry, reading in zip(touched, readings):
+            publication_id = reading['publication_id']
+            if latest_ids.get(publication_id) == entry['b_id']:
+                continue
+            
+            if publication_id in inserted:
+                # Leituras repetidas no mesmo lote estendem o snapshot recém-gravado
+                metrics = inserted[publication_id]
+                metrics.last_checked_at = max(metrics.last_checked_at, entry['b_checked'])
+                continue
+            
+            reading['last_checked_at'] = entry['b_checked']
+            metrics = inserted[publication_id] = self._insert_metrics(session, reading)
+            written.append(metrics.id)
+        
+        # Recarregar o cache dessas publicações a partir do banco, já com os snapshots novos
+        for chunk in _chunked(list(inserted)):
+            for metrics in self._query_latest_metrics(session, chunk):
+                updates[metrics.publication_id] = (
+                    metrics.id, tuple(getattr(metrics, f) or 0 for f in ROLLUP_FIELDS)
+                )
+        return written
+    
+    def _insert_metrics(self, session, metrics_data: dict, platform: str = None) -> Metrics:
+        """Inserir snapshot de métricas e atualizar os rollups na mesma transação"""
+        metrics_data = dict(metrics_data)
+        raw_data = metrics_data.pop('raw_data', None)
+        if raw_data is not None:
+            metrics_data['raw_payload_hash'] = self._store_raw_payload(session, raw_data)
+        
+        metrics = Metrics(**metrics_data)
+        session.add(metrics)
+        session.flush()
+        self._bump_counters(session, **{
+            f'total_{field}': getattr(metrics, field) or 0 for field in ROLLUP_FIELDS
+        })
+        
+        if platform is None:
+            platform = session.query(Publication.platform).filter(
+                Publication.id == metrics.publication_id
+            ).scalar()
+        
+        if platform is not None:
+            self._apply_rollups(session, metrics, platform)
+        return metrics
+    
+    def get_metrics_raw_data(self, metrics_id: int) -> Optional[Any]:
+        """Carregar sob demanda os dados brutos da API de um snapshot"""
+        session = self.get_session()
+        try:
+            row = session.query(Metrics.raw_payload_hash, Metrics.raw_data).filter(
+                Metrics.id == metrics_id
+            ).first()
+            
+            if row is None:
+                return None
+            
+            if row.raw_payload_hash is None:
+                return row.raw_data
+            
+            payload = session.get(RawPayload, row.raw_payload_hash)
+            return _decompress_payload(payload.codec, payload.data) if payload else None
+        finally:
+            session.close()
+    
+    def compact_raw_data(self, batch_size: int = 1000) -> int:
+        """Mover raw_data legado da tabela metrics para raw_payloads comprimidos"""
+        moved = 0
+        while True:
+            session = self.get_session()
+            try:
+                rows = session.query(Metrics.id, Metrics.raw_data).filter(
+                    Metrics.raw_data.isnot(None),
+                    Metrics.raw_payload_hash.is_(None)
+                ).limit(batch_size).all()
+                
+                if not rows:
+                    return moved
+                
+                for row in rows:
+                    content_hash = self._store_raw_payload(session, row.raw_data)
+                    session.execute(
+                        update(Metrics).where(Metrics.id == row.id).values(
+                            raw_payload_hash=content_hash, raw_data=null()
+                        )
+                    )
+                
+                session.commit()
+                moved += len(rows)
+            except Exception as e:
+                session.rollback()
+                raise e
+            finally:
+                session.close()
+    
+    def _apply_rollups(self, session, metrics: Metrics, platform: str):
+        """Atualizar incrementalmente os rollups horário e diário com um novo snapshot
+        
+        O delta de cada janela é o máximo da janela menos o máximo da janela anterior.
+        Snapshots que chegam fora de ordem só ficam corretos após rebuild_metrics_rollups.
+        """
+        for granularity in ROLLUP_GRANULARITIES:
+            bucket = _bucket_start(metrics.collected_at, granularity)
+            rollup = session.get(MetricsRollup, (metrics.publication_id, granularity, bucket))
+            
+            if rollup is None:
+                previous = session.query(MetricsRollup).filter(
+                    MetricsRollup.publication_id == metrics.publication_id,
+                    MetricsRollup.granularity == granularity,
+                    MetricsRollup.bucket_start < bucket
+                ).order_by(MetricsRollup.bucket_start.desc()).first()
+                
+                rollup = MetricsRollup(
+                    publication_id=metrics.publication_id,
+                    granularity=granularity,
+                    bucket_start=bucket,
+                    platform=platform,
+                    snapshot_count=0
+                )
+                for field in ROLLUP_FIELDS:
+                    value = getattr(metrics, field) or 0
+                    baseline = getattr(previous, f"{field}_max") if previous else 0
+                    setattr(rollup, f"{field}_max", value)
+                    setattr(rollup, f"{field}_delta", value - baseline)
+                session.add(rollup)
+            else:
+                for field in ROLLUP_FIELDS:
+                    value = getattr(metrics, field) or 0
+                    current_max = getattr(rollup, f"{field}_max")
+                    if value > current_max:
+                        setattr(rollup, f"{field}_max", value)
+                        setattr(rollup, f"{field}_delta",
+                                getattr(rollup, f"{field}_delta") + value - current_max)
+            
+            rollup.snapshot_count += 1
+    
+    def rebuild_metrics_rollups(self, publication_ids: Iterable[int] = None,
+                                chunk_size: int = 5000, start: datetime = None,
+                                end: datetime = None) -> int:
+        """Recalcular rollups a partir do histórico completo de snapshots (backfill)
+        
+        Com start/end, só as janelas que cobrem esse intervalo são recalculadas; as
+        demais (inclusive as de snapshots já arquivados) são mantidas, e a janela
+        seguinte ao intervalo tem o delta ajustado ao novo máximo.
+        """
+        session = self.get_session()
+        try:
+            ids = list(publication_ids) if publication_ids is not None else None
+            bounds = {
+                granularity: (
+                    _bucket_start(start, granularity) if start is not None else None,
+                    _bucket_start(end, granularity) if end is not None else None
+                )
+                for granularity in ROLLUP_GRANULARITIES
+            }
+            
+            # Remover rollups existentes das publicações afetadas (dentro do intervalo)
+            deletes = []
+            for granularity, (first, last) in bounds.items():
+                statement = delete(MetricsRollup).where(MetricsRollup.granularity == granularity)
+                if first is not None:
+                    statement = statement.where(MetricsRollup.bucket_start >= first)
+                if last is not None:
+                    statement = statement.where(MetricsRollup.bucket_start <= last)
+                deletes.append(statement)
+            
+            for statement in deletes:
+                if ids is None:
+                    session.execute(statement)
+                else:
+                    for chunk in _chunked(ids):
+                        session.execute(statement.where(MetricsRollup.publication_id.in_(chunk)))
+            
+            query = session.query(
+                Metrics.publication_id, Publication.platform, Metrics.collected_at,
+                Metrics.likes, Metrics.comments, Metrics.shares, Metrics.views
+            ).join(Publication, Publication.id == Metrics.publication_id).order_by(
+                Metrics.publication_id, Metrics.collected_at, Metrics.id
+            )
+            if ids is not None:
+                query = query.filter(Metrics.publication_id.in_(ids))
+            # A janela diária é a mais larga e contém as horárias do intervalo
+            first_day, last_day = bounds['day']
+            if first_day is not None:
+                query = query.filter(Metrics.collected_at >= first_day)
+            if last_day is not None:
+                query = query.filter(Metrics.collected_at < last_day + timedelta(days=1))
+            
+            buckets = {}
+            previous_max = {}
+            pending = []
+            written = 0
+            stream = session.execute(
+                query.statement.execution_options(stream_results=True)
+            ).yield_per(chunk_size)
+            
+            for row in stream:
+                for granularity in ROLLUP_GRANULARITIES:
+                    bucket = _bucket_start(row.collected_at, granularity)
+                    first, last = bounds[granularity]
+                    if (first is not None and bucket < first) or (last is not None and bucket > last):
+                        continue
+                    key = (row.publication_id, granularity)
+                    current = buckets.get(key)
+                    
+                    if current is None and first is not None:
+                        # A primeira janela recalculada parte do máximo da janela mantida anterior
+                        previous_max[key] = self._rollup_maxima(session, key, MetricsRollup.bucket_start < first)
+                    
+                    if current is None or current['bucket_start'] != bucket:
+                        if current is not None:
+                            pending.append(current)
+                            previous_max[key] = {f: current[f"{f}_max"] for f in ROLLUP_FIELDS}
+                        baseline = previous_max.get(key, {})
+                        current = {
+                            'publication_id': row.publication_id,
+                            'granularity': granularity,
+                            'bucket_start': bucket,
+                            'platform': row.platform,
+                            'snapshot_count': 0,
+                            'updated_at': datetime.utcnow()
+                        }
+                        for field in ROLLUP_FIELDS:
+                            value = getattr(row, field) or 0
+                            current[f"{field}_max"] = value
+                            current[f"{field}_delta"] = value - baseline.get(field, 0)
+                        buckets[key] = current
+                    else:
+                        for field in ROLLUP_FIELDS:
+                            value = getattr(row, field) or 0
+                            if value > current[f"{field}_max"]:
+                                current[f"{field}_delta"] += value - current[f"{field}_max"]
+                                current[f"{field}_max"] = value
+                    
+                    current['snapshot_count'] += 1
+                
+                if len(pending) >= chunk_size:
+                    session.execute(insert(MetricsRollup), pending)
+                    written += len(pending)
+                    pending = []
+            
+            pending.extend(buckets.values())
+            if pending:
+                session.execute(insert(MetricsRollup), pending)
+                written += len(pending)
+            
+            # O delta da janela mantida logo após o intervalo depende do máximo recalculado
+            for (publication_id, granularity), current in buckets.items():
+                last = bounds[granularity][1]
+                if last is None:
+                    continue
+                following = session.query(MetricsRollup).filter(
+                    MetricsRollup.publication_id == publication_id,
+                    MetricsRollup.granularity == granularity,
+                    MetricsRollup.bucket_start > last
+                ).order_by(MetricsRollup.bucket_start).first()
+                if following is not None:
+                    for field in ROLLUP_FIELDS:
+                        setattr(following, f"{field}_delta",
+                                getattr(following, f"{field}_max") - current[f"{field}_max"])
+            
+            session.commit()
+            return written
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def _rollup_maxima(self, session, key: Tuple[int, str], *criteria) -> Dict[str, int]:
+        """Máximos da última janela de rollup de uma publicação que satisfaz os critérios"""
+        publication_id, granularity = key
+        rollup = session.query(MetricsRollup).filter(
+            MetricsRollup.publication_id == publication_id,
+            MetricsRollup.granularity == granularity,
+            *criteria
+        ).order_by(MetricsRollup.bucket_start.desc()).first()
+        return {f: getattr(rollup, f"{f}_max") for f in ROLLUP_FIELDS} if rollup else {}
+    
+    def get_metrics_rollups(self, granularity: str = 'hour', start: datetime = None, end: datetime = None,
+                            publication_ids: Iterable[int] = None, platform: str = None) -> List[MetricsRollup]:
+        """Obter rollups de métricas em um intervalo de tempo para gráficos"""
+        session = self.get_session()
+        try:
+            query = session.query(MetricsRollup).filter(MetricsRollup.granularity == granularity)
+            
+            if start:
+                query = query.filter(MetricsRollup.bucket_start >= _bucket_start(start, granularity))
+            
+            if end:
+                query = query.filter(MetricsRollup.bucket_start <= end)
+            
+            if platform:
+                query = query.filter(MetricsRollup.platform == platform)
+            
+            if publication_ids is not None:
+                query = query.filter(MetricsRollup.publication_id.in_(list(publication_ids)))
+            
+            return query.order_by(MetricsRollup.bucket_start, MetricsRollup.publication_id).all()
+        finally:
+            session.close()
     
     def get_latest_metrics(self, publication_id: int):
         """Obter métricas mais recentes de uma publicação"""
@@ -206,24 +1478,40 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def get_latest_metrics_bulk(self, publication_ids: Iterable[int] = None,
+                                platform: str = None) -> Dict[int, Metrics]:
+        """Obter o snapshot de métricas mais recente de várias publicações em uma consulta"""
+        session = self.get_session()
+        try:
+            ids = list(publication_ids) if publication_ids is not None else None
+            if ids is not None and not ids:
+                return {}
+            
+            latest = {}
+            for chunk in (_chunked(ids) if ids is not None else [None]):
+                for metrics in self._query_latest_metrics(session, chunk, platform):
+                    latest[metrics.publication_id] = metrics
+            return latest
+        finally:
+            session.close()
+    
+    def _query_latest_metrics(self, session, publication_ids: Optional[List[int]], platform: str = None):
+        """Consultar o snapshot mais recente por publicação usando row_number()"""
+        latest = _latest_metrics_subquery(publication_ids)
+        query = session.query(Metrics).join(latest, Metrics.id == latest.c.metrics_id)
+        
+        if platform:
+            query = query.join(Publication, Publication.id == Metrics.publication_id).filter(
+                Publication.platform == platform
+            )
+        
+        return query.all()
+    
     def save_api_config(self, platform: str, **config_data):
         """Salvar configuração de API"""
         session = self.get_session()
         try:
-            config = session.query(APIConfig).filter(APIConfig.platform == platform).first()
-            
-            if config:
-                # Atualizar configuração existente
-                for key, value in config_data.items():
-                    if hasattr(config, key):
-                        setattr(config, key, value)
-                config.updated_at = datetime.utcnow()
-            else:
-                # Criar nova configuração
-                config_data['platform'] = platform
-                config = APIConfig(**config_data)
-                session.add(config)
-            
+            config = self._upsert_api_config(session, platform, config_data)
             session.commit()
             return config
         except Exception as e:
@@ -231,44 +1519,145 @@ class DatabaseManager:
             raise e
         finally:
             session.close()
+            self.invalidate_api_config_cache()
+    
+    def _upsert_api_config(self, session, platform: str, config_data: dict) -> APIConfig:
+        """Criar ou atualizar configuração de API e sinalizar a nova versão"""
+        config = session.query(APIConfig).filter(APIConfig.platform == platform).first()
+        
+        if config:
+            # Atualizar configuração existente
+            for key, value in config_data.items():
+                if hasattr(config, key):
+                    setattr(config, key, value)
+            config.updated_at = datetime.utcnow()
+        else:
+            # Criar nova configuração
+            config_data['platform'] = platform
+            config = APIConfig(**config_data)
+            session.add(config)
+        
+        # Sinalizar aos outros processos que as configurações mudaram
+        result = session.execute(
+            update(CacheVersion).where(CacheVersion.name == API_CONFIG_CACHE_NAME).values(
+                version=CacheVersion.version + 1, updated_at=datetime.utcnow()
+            )
+        )
+        if result.rowcount == 0:
+            self._insert_ignore(session, CacheVersion, {
+                "name": API_CONFIG_CACHE_NAME, "version": 1, "updated_at": datetime.utcnow()
+            })
+        return config
     
     def get_api_config(self, platform: str):
-        """Obter configuração de API"""
+        """Obter configuração de API (com cache em memória e TTL)"""
+        self._check_api_config_version()
+        
+        now = time.monotonic()
+        with self._api_config_lock:
+            entry = self._api_config_cache.get(platform)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        
         session = self.get_session()
         try:
-            return session.query(APIConfig).filter(APIConfig.platform == platform).first()
+            config = session.query(APIConfig).filter(APIConfig.platform == platform).first()
         finally:
             session.close()
+        
+        with self._api_config_lock:
+            self._api_config_cache[platform] = (now + self.api_config_ttl, config)
+        return config
+    
+    def invalidate_api_config_cache(self, platform: str = None):
+        """Descartar configurações de API em cache"""
+        with self._api_config_lock:
+            if platform is None:
+                self._api_config_cache.clear()
+            else:
+                self._api_config_cache.pop(platform, None)
+    
+    def _check_api_config_version(self):
+        """Limpar o cache se outro processo alterou as configurações de API"""
+        if self.api_config_version_interval is None:
+            return
+        
+        now = time.monotonic()
+        with self._api_config_lock:
+            if now < self._api_config_next_version_check:
+                return
+            self._api_config_next_version_check = now + self.api_config_version_interval
+        
+        session = self.get_session()
+        try:
+            version = session.query(CacheVersion.version).filter(
+                CacheVersion.name == API_CONFIG_CACHE_NAME
+            ).scalar()
+        finally:
+            session.close()
+        
+        with self._api_config_lock:
+            if version != self._api_config_version:
+                self._api_config_cache.clear()
+                self._api_config_version = version
     
     def get_dashboard_stats(self):
         """Obter estatísticas para dashboard"""
         session = self.get_session()
         try:
-            stats = {}
-            
-            # Contar conteúdo por status
-            stats['total_content'] = session.query(GeneratedContent).count()
-            stats['pending_content'] = session.query(GeneratedContent).filter(
-                GeneratedContent.status == 'pending_approval'
-            ).count()
-            stats['approved_content'] = session.query(GeneratedContent).filter(
-                GeneratedContent.status == 'approved'
-            ).count()
-            stats['published_content'] = session.query(GeneratedContent).filter(
-                GeneratedContent.status == 'published'
-            ).count()
-            
-            # Contar publicações
-            stats['total_publications'] = session.query(Publication).count()
-            
-            # Métricas totais
-            total_metrics = session.query(Metrics).all()
-            stats['total_likes'] = sum(m.likes for m in total_metrics)
-            stats['total_comments'] = sum(m.comments for m in total_metrics)
-            stats['total_shares'] = sum(m.shares for m in total_metrics)
-            stats['total_views'] = sum(m.views for m in total_metrics)
-            
+            return self._dashboard_stats(session)
+        finally:
+            session.close()
+    
+    def _dashboard_stats(self, session) -> Dict[str, int]:
+        """Ler os contadores materializados do dashboard na sessão informada"""
+        counters = session.get(DashboardCounters, DASHBOARD_COUNTERS_ID)
+        if counters is None:
+            return self._count_dashboard_stats(session)
+        return {field: getattr(counters, field) for field in DASHBOARD_COUNTER_FIELDS}
+    
+    def _count_dashboard_stats(self, session) -> Dict[str, int]:
+        """Calcular as estatísticas do dashboard a partir das tabelas"""
+        stats = dict.fromkeys(DASHBOARD_COUNTER_FIELDS, 0)
+        
+        # Contar conteúdo por status
+        for status, count in session.execute(
+            select(GeneratedContent.status, func.count()).group_by(GeneratedContent.status)
+        ):
+            stats['total_content'] += count
+            if status in STATUS_COUNTERS:
+                stats[STATUS_COUNTERS[status]] = count
+        
+        # Contar publicações
+        stats['total_publications'] = session.execute(select(func.count(Publication.id))).scalar()
+        
+        # Métricas totais
+        totals = session.execute(select(*(
+            func.coalesce(func.sum(getattr(Metrics, field)), 0) for field in ROLLUP_FIELDS
+        ))).one()
+        for field, total in zip(ROLLUP_FIELDS, totals):
+            stats[f'total_{field}'] = total
+        
+        return stats
+    
+    def reconcile_dashboard_counters(self) -> Dict[str, int]:
+        """Recalcular os contadores do dashboard do zero e retornar os valores gravados"""
+        session = self.get_session()
+        try:
+            stats = self._count_dashboard_stats(session)
+            counters = session.get(DashboardCounters, DASHBOARD_COUNTERS_ID)
+            if counters is None:
+                self._insert_ignore(session, DashboardCounters, {
+                    "id": DASHBOARD_COUNTERS_ID, "updated_at": datetime.utcnow(), **stats
+                })
+            else:
+                for field, value in stats.items():
+                    setattr(counters, field, value)
+            session.commit()
             return stats
+        except Exception as e:
+            session.rollback()
+            raise e
         finally:
             session.close()
 
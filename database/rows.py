@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Linhas de Leitura do Banco
+Descrição: Tuplas leves para listagens somente leitura do DatabaseManager
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+
+class ContentRow(NamedTuple):
+    """Linha de conteúdo gerado (sem o estado de ORM)"""
+    id: str
+    prompt: str
+    status: Optional[str]
+    style: Optional[str]
+    filepath: Optional[str]
+    public_url: Optional[str]
+    created_at: Optional[datetime]
+
+
+class PublicationRow(NamedTuple):
+    """Linha de publicação, opcionalmente com as métricas mais recentes"""
+    id: int
+    content_id: str
+    platform: str
+    platform_post_id: Optional[str]
+    status: Optional[str]
+    published_at: Optional[datetime]
+    likes: Optional[int] = None
+    comments: Optional[int] = None
+    shares: Optional[int] = None
+    views: Optional[int] = None
+    metrics_collected_at: Optional[datetime] = None
+
+
+class HashtagStatsRow(NamedTuple):
+    """Desempenho agregado de uma hashtag (soma das métricas mais recentes)"""
+    tag: str
+    publications: int
+    likes: int
+    comments: int
+    shares: int
+    views: int
+
+    @property
+    def avg_likes(self) -> float:
+        """Média de likes por publicação"""
+        return self.likes / self.publications if self.publications else 0.0
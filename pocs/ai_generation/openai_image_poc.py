@@ -25,7 +25,7 @@ class OpenAIImagePOC(POCTemplate):
         super().__init__()
         self.name = "OpenAI Image Generation POC"
         self.api_key = None
-        self.base_url = "https://api.openai.com/v1/images/generations"
+        self.base_url = f"{os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1').rstrip('/')}/images/generations"
         
         # Configurações padrão
         self.default_size = "1024x1024"
@@ -7,12 +7,12 @@ Data: 2024
 """
 
 import os
-import requests
 import json
 import time
 import logging
 from typing import Any, Dict
 from pocs.template_poc import POCTemplate
+from pocs.resilience.circuit_breaker import UPLOAD_TIMEOUT, CircuitOpenError, circuit_breakers, resilient_request
 
 # Configurar logging
 logging.basicConfig(
@@ -31,7 +31,10 @@ class InstagramUploadPOC(POCTemplate):
         self.name = "Instagram Upload POC"
         self.access_token = None
         self.instagram_account_id = None
-        self.base_url = "https://graph.facebook.com/v18.0"
+        self.base_url = os.getenv("INSTAGRAM_API_BASE_URL", "https://graph.facebook.com/v18.0")
+        
+        # Circuit breakers compartilhados com as demais POCs das plataformas
+        self.breakers = circuit_breakers
         
         # Configurações do vídeo de teste
         self.video_path = None
@@ -81,7 +84,9 @@ class InstagramUploadPOC(POCTemplate):
                 "access_token": self.access_token
             }
             
-            response = requests.get(url, params=params)
+            response = resilient_request(
+                "get", url, "instagram", "account", registry=self.breakers, params=params
+            )
             
             if response.status_code == 200:
                 return response.json()
@@ -107,7 +112,9 @@ class InstagramUploadPOC(POCTemplate):
                 "access_token": self.access_token
             }
             
-            response = requests.post(url, data=data)
+            response = resilient_request(
+                "post", url, "instagram", "media_container", registry=self.breakers, data=data
+            )
             
             if response.status_code == 200:
                 result = response.json()
@@ -131,7 +138,9 @@ class InstagramUploadPOC(POCTemplate):
                 "access_token": self.access_token
             }
             
-            response = requests.get(url, params=params)
+            response = resilient_request(
+                "get", url, "instagram", "container_status", registry=self.breakers, params=params
+            )
             
             if response.status_code == 200:
                 return response.json()
@@ -139,6 +148,9 @@ class InstagramUploadPOC(POCTemplate):
                 logger.error(f"Erro ao verificar status: {response.status_code} - {response.text}")
                 return {}
                 
+        except CircuitOpenError:
+            # Circuito aberto: interromper a espera em vez de repetir a consulta
+            raise
         except Exception as e:
             logger.error(f"Erro ao verificar status do container: {e}")
             return {}
@@ -155,7 +167,10 @@ class InstagramUploadPOC(POCTemplate):
                 "access_token": self.access_token
             }
             
-            response = requests.post(url, data=data)
+            response = resilient_request(
+                "post", url, "instagram", "media_publish", registry=self.breakers,
+                timeout=UPLOAD_TIMEOUT, data=data
+            )
             
             if response.status_code == 200:
                 result = response.json()
@@ -179,7 +194,9 @@ class InstagramUploadPOC(POCTemplate):
                 "access_token": self.access_token
             }
             
-            response = requests.get(url, params=params)
+            response = resilient_request(
+                "get", url, "instagram", "media", registry=self.breakers, params=params
+            )
             
             if response.status_code == 200:
                 return response.json()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Agendador Adaptativo de Coleta de Métricas
+Descrição: Daemon que coleta métricas por prioridade de vencimento, com intervalo adaptativo
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+
+from database.models import DatabaseManager, Publication
+from pocs.metrics.social_metrics_poc import SocialMetricsPOC
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Intervalos de coleta em segundos
+DEFAULT_MIN_INTERVAL = 5 * 60          # posts recentes ou engajando rápido
+DEFAULT_MAX_INTERVAL = 24 * 60 * 60    # posts parados
+FRESH_WINDOW = 2 * 60 * 60             # posts mais novos que isso ficam no intervalo mínimo
+MAX_INTERVAL_GROWTH = 2.0              # o intervalo no máximo dobra a cada coleta
+DEFAULT_IDLE_WAIT = 60.0               # espera do daemon quando nada está agendado
+
+# Interações esperadas entre duas coletas; o intervalo é o tempo para atingi-las
+DEFAULT_TARGET_CHANGE = 10.0
+# Peso das visualizações no engajamento (são muito mais numerosas que likes)
+VIEWS_WEIGHT = 0.01
+
+
+def _epoch(value: datetime) -> float:
+    """Converter datetime UTC ingênuo (como gravado no banco) em timestamp"""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def engagement_score(metrics: Dict[str, Any]) -> float:
+    """Engajamento de uma leitura: likes + comentários + compartilhamentos + views ponderadas"""
+    return (
+        (metrics.get("likes") or 0) + (metrics.get("comments") or 0) + (metrics.get("shares") or 0)
+        + (metrics.get("views") or 0) * VIEWS_WEIGHT
+    )
+
+
+def next_poll_interval(age: float, velocity: Optional[float], previous: float,
+                       min_interval: float = DEFAULT_MIN_INTERVAL,
+                       max_interval: float = DEFAULT_MAX_INTERVAL,
+                       target_change: float = DEFAULT_TARGET_CHANGE) -> float:
+    """Calcular o próximo intervalo de coleta de um post
+
+    Args:
+        age: Idade do post em segundos
+        velocity: Engajamento por hora desde a última coleta (None se desconhecido)
+        previous: Intervalo usado na última coleta
+    """
+    if age < FRESH_WINDOW or velocity is None:
+        return min_interval
+
+    if velocity <= 0:
+        interval = max_interval
+    else:
+        interval = target_change / velocity * 3600
+
+    # Decaimento gradual: um post que parou não salta direto para o intervalo máximo
+    interval = min(interval, previous * MAX_INTERVAL_GROWTH)
+    return max(min_interval, min(interval, max_interval))
+
+
+def metrics_reading(publication_id: int, data: Dict[str, Any], collected_at: datetime) -> Dict[str, Any]:
+    """Montar a leitura para ingest_metrics_batch a partir dos dados coletados de um post"""
+    return {
+        "publication_id": publication_id,
+        "likes": data.get("likes", 0),
+        "comments": data.get("comments", 0),
+        "shares": data.get("shares", 0),
+        "views": data.get("views", 0),
+        "raw_data": data,
+        "collected_at": collected_at,
+    }
+
+
+def collect_publication_metrics(db_manager: DatabaseManager, collector: SocialMetricsPOC,
+                                platform: str = None, write_batch_size: int = 100,
+                                progress: Callable[[int, int], None] = None) -> Dict[str, Any]:
+    """Coletar agora as métricas de todas as publicações publicadas e gravá-las no banco
+
+    Os posts vêm de Publication.platform_post_id e as leituras são gravadas em micro-lotes
+    com ingest_metrics_batch conforme chegam. progress(concluídos, total) é chamado a cada post.
+    """
+    session = db_manager.get_session()
+    try:
+        query = select(Publication.id, Publication.platform, Publication.platform_post_id).where(
+            Publication.platform_post_id.isnot(None), Publication.status == 'published'
+        )
+        if platform:
+            query = query.where(Publication.platform == platform)
+        rows = session.execute(query.order_by(Publication.id)).all()
+    finally:
+        session.close()
+
+    result = {"polled": len(rows), "written": 0, "unchanged": 0, "failed": 0, "deferred": 0}
+    if not rows:
+        return result
+
+    posts = [{"platform": row.platform, "post_id": row.platform_post_id} for row in rows]
+    collected_at = datetime.utcnow()
+    readings = []
+
+    def flush():
+        ingested = db_manager.ingest_metrics_batch(readings)
+        result["written"] += len(ingested["written"])
+        result["unchanged"] += ingested["unchanged"]
+        readings.clear()
+
+    for item in collector.iter_metrics(posts):
+        metrics = item["result"]
+        if metrics["status"] == "success":
+            readings.append(metrics_reading(rows[item["index"]].id, metrics["data"], collected_at))
+        elif metrics["status"] == "deferred":
+            result["deferred"] += 1
+        else:
+            result["failed"] += 1
+
+        if len(readings) >= write_batch_size:
+            flush()
+        if progress:
+            progress(item["completed"], item["total"])
+
+    if readings:
+        flush()
+    logger.info(f"{result['polled']} posts coletados ({result['written']} com mudança, "
+                f"{result['failed']} falhas, {result['deferred']} adiados)")
+    return result
+
+
+class PollState:
+    """Estado de coleta de uma publicação"""
+
+    __slots__ = ("publication_id", "platform", "post_id", "published_at",
+                 "interval", "next_due", "last_polled_at", "last_engagement")
+
+    def __init__(self, publication_id: int, platform: str, post_id: str, published_at: Optional[float],
+                 interval: float, next_due: float):
+        self.publication_id = publication_id
+        self.platform = platform
+        self.post_id = post_id
+        self.published_at = published_at
+        self.interval = interval
+        self.next_due = next_due
+        self.last_polled_at = None
+        self.last_engagement = None
+
+
+class MetricsScheduler:
+    """Agendador de coleta de métricas com fila de prioridade por vencimento
+
+    Cada publicação com platform_post_id entra em um heap (next_due, publication_id).
+    A cada rodada os posts vencidos são coletados juntos (em lotes e em paralelo pelo
+    SocialMetricsPOC.iter_metrics), gravados em micro-lotes com ingest_metrics_batch
+    conforme chegam e reagendados com o intervalo
+    de next_poll_interval: mínimo para posts novos, crescendo conforme a velocidade de
+    engajamento cai.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, collector: SocialMetricsPOC,
+                 min_interval: float = DEFAULT_MIN_INTERVAL, max_interval: float = DEFAULT_MAX_INTERVAL,
+                 target_change: float = DEFAULT_TARGET_CHANGE, max_batch: int = 500,
+                 write_batch_size: int = 100, refresh_interval: float = 300.0,
+                 idle_wait: float = DEFAULT_IDLE_WAIT, clock: Callable[[], float] = time.time):
+        self.db = db_manager
+        self.collector = collector
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_change = target_change
+        self.max_batch = max_batch
+        self.write_batch_size = write_batch_size
+        self.refresh_interval = refresh_interval
+        self.idle_wait = idle_wait
+        self.clock = clock
+
+        self._heap = []
+        self._states: Dict[int, PollState] = {}
+        self._next_refresh = 0.0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def load_publications(self) -> int:
+        """Adicionar à fila as publicações publicadas que ainda não estão agendadas"""
+        session = self.db.get_session()
+        try:
+            rows = session.execute(
+                select(Publication.id, Publication.platform, Publication.platform_post_id,
+                       Publication.published_at).where(
+                    Publication.platform_post_id.isnot(None), Publication.status == 'published'
+                )
+            ).all()
+        finally:
+            session.close()
+
+        new_rows = [row for row in rows if row.id not in self._states]
+        if not new_rows:
+            return 0
+
+        # Retomar do último snapshot gravado, se houver
+        latest = self.db.get_latest_metrics_bulk([row.id for row in new_rows])
+        now = self.clock()
+        for row in new_rows:
+            published_at = _epoch(row.published_at) if row.published_at else None
+            state = PollState(row.id, row.platform, row.platform_post_id, published_at, self.min_interval, now)
+
+            metrics = latest.get(row.id)
+            if metrics is not None:
+                state.last_engagement = engagement_score(
+                    {"likes": metrics.likes, "comments": metrics.comments,
+                     "shares": metrics.shares, "views": metrics.views}
+                )
+                state.last_polled_at = _epoch(metrics.last_checked_at or metrics.collected_at)
+                state.next_due = state.last_polled_at + self.min_interval
+
+            self._push(state)
+        return len(new_rows)
+
+    def _push(self, state: PollState):
+        """Agendar (ou reagendar) uma publicação"""
+        self._states[state.publication_id] = state
+        heapq.heappush(self._heap, (state.next_due, state.publication_id))
+
+    def _pop_due(self, now: float) -> List[PollState]:
+        """Retirar da fila as publicações vencidas (até max_batch)"""
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.max_batch:
+            next_due, publication_id = heapq.heappop(self._heap)
+            state = self._states.get(publication_id)
+            # Entradas antigas de publicações já reagendadas são descartadas
+            if state is not None and state.next_due == next_due:
+                due.append(state)
+        return due
+
+    def next_due(self) -> Optional[float]:
+        """Instante da próxima coleta agendada"""
+        return self._heap[0][0] if self._heap else None
+
+    def run_once(self) -> Dict[str, Any]:
+        """Coletar os posts vencidos agora e reagendá-los"""
+        now = self.clock()
+        if now >= self._next_refresh:
+            self.load_publications()
+            self._next_refresh = now + self.refresh_interval
+
+        due = self._pop_due(now)
+        if not due:
+            return {"polled": 0, "written": 0, "failed": 0, "deferred": 0, "next_due": self.next_due()}
+
+        posts = [{"platform": state.platform, "post_id": state.post_id} for state in due]
+
+        collected_at = datetime.utcfromtimestamp(now)
+        readings = []
+        written = 0
+        failed = 0
+        deferred = 0
+        pushed = set()
+        try:
+            # Resultados chegam conforme cada lote termina; gravados em micro-lotes
+            for item in self.collector.iter_metrics(posts):
+                state = due[item["index"]]
+                metrics = item["result"]
+                if metrics["status"] == "success":
+                    data = metrics["data"]
+                    readings.append(metrics_reading(state.publication_id, data, collected_at))
+                    self._update_interval(state, engagement_score(data), now)
+                elif metrics["status"] == "deferred":
+                    # Sem cota: volta quando a API liberar, sem contar como falha
+                    deferred += 1
+                    state.next_due = now + max(1.0, metrics.get("retry_after") or 0)
+                    self._push(state)
+                    pushed.add(state.publication_id)
+                    continue
+                else:
+                    # Falha: tenta de novo no mesmo intervalo, sem mexer na velocidade
+                    failed += 1
+                    logger.warning(f"Falha ao coletar {state.platform}/{state.post_id}: {metrics.get('message')}")
+
+                state.next_due = now + state.interval
+                self._push(state)
+                pushed.add(state.publication_id)
+
+                if len(readings) >= self.write_batch_size:
+                    written += len(self.db.ingest_metrics_batch(readings)["written"])
+                    readings = []
+
+            if readings:
+                written += len(self.db.ingest_metrics_batch(readings)["written"])
+        finally:
+            # Se o coletor ou a gravação falharem no meio da rodada, os posts
+            # retirados da fila e ainda não reagendados voltam no intervalo atual
+            for state in due:
+                if state.publication_id not in pushed:
+                    state.next_due = now + state.interval
+                    self._push(state)
+
+        logger.info(f"{len(due)} posts coletados ({written} com mudança, {failed} falhas, {deferred} adiados)")
+        return {
+            "polled": len(due), "written": written, "failed": failed, "deferred": deferred,
+            "next_due": self.next_due()
+        }
+
+    def _update_interval(self, state: PollState, engagement: float, now: float):
+        """Atualizar velocidade de engajamento e intervalo de uma publicação coletada"""
+        velocity = None
+        if state.last_engagement is not None and state.last_polled_at is not None and now > state.last_polled_at:
+            velocity = max(0.0, engagement - state.last_engagement) / ((now - state.last_polled_at) / 3600)
+
+        age = now - state.published_at if state.published_at else float("inf")
+        state.interval = next_poll_interval(
+            age, velocity, state.interval, self.min_interval, self.max_interval, self.target_change
+        )
+        state.last_engagement = engagement
+        state.last_polled_at = now
+
+    def _wait_time(self, now: float) -> float:
+        """Segundos até o próximo vencimento (ou a próxima busca de publicações novas)
+
+        Se a busca ainda não rodou com sucesso (_next_refresh zerado) e nada está
+        agendado, o daemon tenta de novo depois de idle_wait.
+        """
+        wake_times = [t for t in (self.next_due(), self._next_refresh or None) if t is not None]
+        if not wake_times:
+            return self.idle_wait
+        return max(1.0, min(wake_times) - now)
+
+    def run(self, stop_event: threading.Event = None):
+        """Executar o daemon até stop_event ser acionado"""
+        stop_event = stop_event or threading.Event()
+        logger.info("Agendador de métricas iniciado")
+
+        while not stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Erro na rodada de coleta: {e}")
+
+            stop_event.wait(self._wait_time(self.clock()))
+
+        logger.info("Agendador de métricas finalizado")
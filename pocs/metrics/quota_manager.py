@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Gerenciador de Cotas de API
+Descrição: Acompanha o consumo de cota das APIs sociais e espaça requisições para não estourar limites
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Limites fixos conhecidos por endpoint: (requisições, janela em segundos)
+DEFAULT_ENDPOINT_LIMITS = {
+    ("tiktok", "video_query"): (600, 60),
+    ("tiktok", "video_list"): (600, 60),
+}
+
+# A partir deste uso (%) as requisições passam a ser espaçadas
+DEFAULT_PACE_THRESHOLD = 75.0
+# Espaçamento máximo entre requisições logo antes de 100% de uso (segundos)
+DEFAULT_MAX_PACING_INTERVAL = 10.0
+# Bloqueio quando a API não informa quando a cota volta (segundos)
+DEFAULT_BLOCK_SECONDS = 60.0
+# Por quanto tempo um percentual de uso informado pela API continua valendo (segundos)
+USAGE_TTL = 300.0
+
+
+def _token_fingerprint(token: Optional[str]) -> str:
+    """Identificar o token sem guardá-lo em memória"""
+    if not token:
+        return "-"
+    return hashlib.sha256(token.encode()).hexdigest()[:12]
+
+
+def _usage_percent(usage: Mapping[str, Any]) -> float:
+    """Maior percentual entre call_count, total_cputime e total_time"""
+    return max(float(usage.get(key) or 0) for key in ("call_count", "total_cputime", "total_time"))
+
+
+class QuotaManager:
+    """Orçamento de cota por plataforma, app, token e endpoint
+
+    - X-App-Usage (Graph API): uso do app em %, vale para todos os endpoints
+    - X-Business-Use-Case-Usage (Graph API): uso por conta/tipo, com
+      estimated_time_to_regain_access (minutos) quando a cota acaba
+    - X-RateLimit-Remaining/Reset e Retry-After: limites genéricos (TikTok, LinkedIn)
+    - DEFAULT_ENDPOINT_LIMITS: janelas fixas documentadas pela plataforma, contadas localmente
+
+    delay() diz quantos segundos faltam para a próxima requisição ser permitida; acima de
+    pace_threshold as requisições são espaçadas proporcionalmente ao uso, e em 100% (ou
+    após um 429) o escopo fica bloqueado até a cota voltar. Quem chama decide se espera
+    ou adia o trabalho.
+    """
+
+    def __init__(self, pace_threshold: float = DEFAULT_PACE_THRESHOLD,
+                 max_pacing_interval: float = DEFAULT_MAX_PACING_INTERVAL,
+                 default_block: float = DEFAULT_BLOCK_SECONDS,
+                 endpoint_limits: Optional[Dict[Tuple[str, str], Tuple[int, float]]] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.pace_threshold = pace_threshold
+        self.max_pacing_interval = max_pacing_interval
+        self.default_block = default_block
+        self.endpoint_limits = {**DEFAULT_ENDPOINT_LIMITS, **(endpoint_limits or {})}
+        self.clock = clock
+        self.sleep = sleep
+
+        self._lock = threading.Lock()
+        # (plataforma, token, escopo) -> (uso %, observado em, cota volta em)
+        self._usage: Dict[Tuple[str, str, str], Tuple[float, float, Optional[float]]] = {}
+        # (plataforma, token, escopo) -> bloqueado até
+        self._blocked_until: Dict[Tuple[str, str, str], float] = {}
+        # (plataforma, token) -> instante da última requisição liberada
+        self._last_request: Dict[Tuple[str, str], float] = {}
+        # (plataforma, token, endpoint) -> instantes das requisições na janela
+        self._windows: Dict[Tuple[str, str, str], deque] = {}
+
+    def delay(self, platform: str, endpoint: str, token: str = None) -> float:
+        """Segundos até a próxima requisição ao endpoint ser permitida (0 = agora)"""
+        with self._lock:
+            return self._delay(platform, endpoint, _token_fingerprint(token), self.clock())
+
+    def acquire(self, platform: str, endpoint: str, token: str = None, max_wait: float = 0.0) -> float:
+        """Reservar uma requisição, esperando até max_wait segundos pela cota
+
+        Retorna 0 quando a requisição foi liberada, ou os segundos que ainda faltariam
+        (a requisição não é registrada e deve ser adiada).
+        """
+        fingerprint = _token_fingerprint(token)
+        while True:
+            with self._lock:
+                now = self.clock()
+                delay = self._delay(platform, endpoint, fingerprint, now)
+                if delay <= 0:
+                    self._last_request[(platform, fingerprint)] = now
+                    window = self._windows.get((platform, fingerprint, endpoint))
+                    if window is not None:
+                        window.append(now)
+                    return 0.0
+            if delay > max_wait:
+                return delay
+            max_wait -= delay
+            self.sleep(delay)
+
+    def _delay(self, platform: str, endpoint: str, fingerprint: str, now: float) -> float:
+        """Calcular a espera necessária (com o lock adquirido)"""
+        delay = 0.0
+        scopes = [key for key in set(self._usage) | set(self._blocked_until)
+                  if key[0] == platform and key[1] == fingerprint
+                  and (not key[2].startswith("endpoint:") or key[2] == f"endpoint:{endpoint}")]
+
+        highest_usage = 0.0
+        for key in scopes:
+            delay = max(delay, self._blocked_until.get(key, 0.0) - now)
+
+            usage = self._usage.get(key)
+            if usage is None or now - usage[1] > USAGE_TTL:
+                continue
+            percent, _, regain_at = usage
+            if percent >= 100:
+                delay = max(delay, (regain_at if regain_at is not None else usage[1] + self.default_block) - now)
+            highest_usage = max(highest_usage, percent)
+
+        # Espaçar as requisições proporcionalmente ao uso acima do limiar
+        if self.pace_threshold <= highest_usage < 100:
+            spacing = self.max_pacing_interval * (highest_usage - self.pace_threshold) / (100 - self.pace_threshold)
+            last = self._last_request.get((platform, fingerprint))
+            if last is not None:
+                delay = max(delay, last + spacing - now)
+
+        # Janelas fixas conhecidas do endpoint
+        limit = self.endpoint_limits.get((platform, endpoint))
+        if limit is not None:
+            max_requests, period = limit
+            window = self._windows.setdefault((platform, fingerprint, endpoint), deque())
+            while window and window[0] <= now - period:
+                window.popleft()
+            if len(window) >= max_requests:
+                delay = max(delay, window[0] + period - now)
+
+        return max(0.0, delay)
+
+    def record_response(self, platform: str, endpoint: str, headers: Mapping[str, str],
+                        status_code: int, token: str = None):
+        """Atualizar o orçamento com os cabeçalhos de uma resposta"""
+        fingerprint = _token_fingerprint(token)
+        lowered = {str(key).lower(): value for key, value in (headers or {}).items()}
+
+        with self._lock:
+            now = self.clock()
+
+            app_usage = self._parse_json(lowered.get("x-app-usage"))
+            if app_usage:
+                self._usage[(platform, fingerprint, "app")] = (_usage_percent(app_usage), now, None)
+
+            business_usage = self._parse_json(lowered.get("x-business-use-case-usage"))
+            for business_id, entries in (business_usage or {}).items():
+                for entry in entries or []:
+                    regain_minutes = float(entry.get("estimated_time_to_regain_access") or 0)
+                    regain_at = now + regain_minutes * 60 if regain_minutes else None
+                    scope = f"business:{business_id}:{entry.get('type', '')}"
+                    self._usage[(platform, fingerprint, scope)] = (_usage_percent(entry), now, regain_at)
+
+            endpoint_key = (platform, fingerprint, f"endpoint:{endpoint}")
+            remaining = lowered.get("x-ratelimit-remaining")
+            if remaining is not None and self._to_float(remaining) == 0:
+                self._blocked_until[endpoint_key] = now + self._reset_seconds(lowered.get("x-ratelimit-reset"))
+
+            if status_code == 429:
+                retry_after = self._to_float(lowered.get("retry-after"))
+                block = retry_after if retry_after else self._reset_seconds(lowered.get("x-ratelimit-reset"))
+                self._blocked_until[endpoint_key] = max(self._blocked_until.get(endpoint_key, 0.0), now + block)
+                logger.warning(f"Limite de requisições em {platform}/{endpoint}; pausando por {block:.0f}s")
+
+    def _reset_seconds(self, value: Optional[str]) -> float:
+        """Interpretar X-RateLimit-Reset (segundos restantes ou epoch)"""
+        reset = self._to_float(value)
+        if not reset:
+            return self.default_block
+        if reset > 1_000_000_000:
+            return max(0.0, reset - time.time())
+        return reset
+
+    @staticmethod
+    def _to_float(value: Any) -> Optional[float]:
+        """Converter cabeçalho numérico, ignorando valores inválidos"""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _parse_json(value: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Decodificar cabeçalho JSON, ignorando valores inválidos"""
+        if not value:
+            return None
+        try:
+            return json.loads(value)
+        except ValueError:
+            logger.warning(f"Cabeçalho de uso inválido: {value}")
+            return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado atual dos orçamentos (para logs e dashboard)"""
+        with self._lock:
+            now = self.clock()
+            return {
+                "usage": {
+                    "/".join(key): percent for key, (percent, observed_at, _) in self._usage.items()
+                    if now - observed_at <= USAGE_TTL
+                },
+                "blocked": {
+                    "/".join(key): round(until - now, 1) for key, until in self._blocked_until.items() if until > now
+                },
+            }
+
+
+# Orçamento compartilhado do processo: coletores recriados (ex.: a cada rerun do
+# Streamlit) continuam vendo o uso informado pelas APIs e os bloqueios por 429
+quota_manager = QuotaManager()
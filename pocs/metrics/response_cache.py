@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Cache de Respostas de Métricas
+Descrição: Cache por post com TTL por plataforma, ETags e coleta única para pedidos simultâneos
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Por quanto tempo uma métrica coletada é servida sem consultar a API (segundos)
+DEFAULT_CACHE_TTLS = {
+    "tiktok": 60.0,
+    "instagram": 60.0,
+    "linkedin": 120.0,
+}
+DEFAULT_CACHE_TTL = 60.0
+
+# Entradas mantidas (as vencidas continuam guardando a ETag até serem descartadas)
+DEFAULT_MAX_ENTRIES = 50000
+
+# Espera máxima por uma coleta do mesmo post feita por outra thread (segundos)
+DEFAULT_WAIT_TIMEOUT = 30.0
+
+
+class _Flight:
+    """Coleta em andamento de um post, aguardada pelos pedidos simultâneos"""
+
+    __slots__ = ("event", "result")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class MetricsResponseCache:
+    """Cache de métricas por (plataforma, post_id, campos)
+
+    - Resultados com sucesso ficam frescos por um TTL por plataforma
+    - Pedidos simultâneos do mesmo post viram uma única requisição: quem chega
+      primeiro coleta (claim) e os demais esperam o resultado dele
+    - A ETag de cada requisição em lote é guardada; ao revalidar o mesmo lote,
+      quem chama envia If-None-Match e, com 304, reaproveita as entradas vencidas
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, default_ttl: float = DEFAULT_CACHE_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, wait_timeout: float = DEFAULT_WAIT_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttls = {**DEFAULT_CACHE_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self.clock = clock
+
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._etags: "OrderedDict[Tuple[str, Tuple[str, ...], str], str]" = OrderedDict()
+        self._flights: Dict[Tuple[str, str, str], _Flight] = {}
+        self._lock = threading.Lock()
+
+    def ttl(self, platform: str) -> float:
+        """TTL das métricas de uma plataforma"""
+        return self.ttls.get(platform, self.default_ttl)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def claim(self, platform: str, post_ids: Sequence[str], fields: str = ""):
+        """Separar os posts de um lote entre cache, coleta própria e espera
+
+        Retorna (resultados em cache, ids a coletar, {id: coleta de outra thread}).
+        Os ids a coletar ficam reservados até release().
+        """
+        now = self.clock()
+        hits, owned, waiting = {}, [], {}
+        with self._lock:
+            for post_id in post_ids:
+                key = (platform, post_id, fields)
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    hits[post_id] = entry[0]
+                elif key in self._flights:
+                    waiting[post_id] = self._flights[key]
+                else:
+                    self._flights[key] = _Flight()
+                    owned.append(post_id)
+        return hits, owned, waiting
+
+    def release(self, platform: str, results: Dict[str, Dict[str, Any]], post_ids: Sequence[str],
+                fields: str = ""):
+        """Gravar os resultados coletados e liberar quem esperava por eles
+
+        Só resultados com sucesso entram no cache; erros e adiamentos são entregues
+        apenas a quem esperava esta coleta.
+        """
+        expires_at = self.clock() + self.ttl(platform)
+        with self._lock:
+            for post_id in post_ids:
+                key = (platform, post_id, fields)
+                result = results.get(post_id)
+                if result is not None and result.get("status") == "success":
+                    self._entries[key] = (result, expires_at)
+                    self._entries.move_to_end(key)
+
+                flight = self._flights.pop(key, None)
+                if flight is not None:
+                    flight.result = result
+                    flight.event.set()
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def wait(self, flight: _Flight) -> Optional[Dict[str, Any]]:
+        """Esperar a coleta de outra thread (None se ela não terminar a tempo)"""
+        flight.event.wait(self.wait_timeout)
+        return flight.result
+
+    def etag(self, platform: str, post_ids: Sequence[str], fields: str = "") -> Optional[str]:
+        """ETag da última resposta deste lote, se todos os posts dele ainda estão no cache"""
+        with self._lock:
+            etag = self._etags.get((platform, tuple(post_ids), fields))
+            if etag is None:
+                return None
+            if any((platform, post_id, fields) not in self._entries for post_id in post_ids):
+                return None
+            return etag
+
+    def remember_etag(self, platform: str, post_ids: Sequence[str], etag: str, fields: str = ""):
+        """Guardar a ETag da resposta de um lote"""
+        key = (platform, tuple(post_ids), fields)
+        with self._lock:
+            self._etags[key] = etag
+            self._etags.move_to_end(key)
+            while len(self._etags) > self.max_entries:
+                self._etags.popitem(last=False)
+
+    def revalidated(self, platform: str, post_ids: Sequence[str], fields: str = "") -> Optional[Dict[str, Any]]:
+        """Entradas (mesmo vencidas) de um lote confirmado por 304; None se alguma sumiu"""
+        with self._lock:
+            entries = {post_id: self._entries.get((platform, post_id, fields)) for post_id in post_ids}
+        if any(entry is None for entry in entries.values()):
+            return None
+        return {post_id: entry[0] for post_id, entry in entries.items()}
+
+    def clear(self, platform: str = None):
+        """Descartar as entradas de uma plataforma (ou todas)"""
+        with self._lock:
+            if platform is None:
+                self._entries.clear()
+                self._etags.clear()
+                return
+            for cache in (self._entries, self._etags):
+                for key in [key for key in cache if key[0] == platform]:
+                    del cache[key]
+
+
+# Cache compartilhado do processo: várias instâncias do coletor (ex.: uma por
+# sessão do Streamlit) dividem os mesmos resultados e coletas em andamento
+metrics_cache = MetricsResponseCache()
@@ -7,33 +7,99 @@ Data: 2024
 """
 
 import os
+import threading
 import requests
 import logging
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 from pocs.template_poc import POCTemplate
+from pocs.metrics.quota_manager import QuotaManager, quota_manager
+from pocs.metrics.response_cache import MetricsResponseCache, metrics_cache
+from pocs.resilience.circuit_breaker import (
+    CircuitBreakerRegistry, CircuitOpenError, circuit_breakers, resilient_request
+)
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+# Requisições simultâneas no total e por plataforma (limites conservadores das APIs)
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_PLATFORM_CONCURRENCY = {
+    "tiktok": 6,
+    "instagram": 8,
+    "linkedin": 4,
+}
+
+# Espera máxima pela cota antes de adiar um lote (segundos)
+DEFAULT_MAX_QUOTA_WAIT = 5.0
+
+# Máximo de posts por requisição em lote de cada API
+METRICS_BATCH_SIZES = {
+    "tiktok": 20,      # POST /v2/video/query/ (filters.video_ids)
+    "instagram": 50,   # GET /?ids=a,b,c
+    "linkedin": 20,    # GET /socialActions?ids=...&ids=...
+}
+
+# Campos pedidos a cada API (fazem parte da chave do cache de respostas)
+METRICS_FIELDS = {
+    "tiktok": "id,title,cover_image_url,embed_link,like_count,comment_count,share_count,view_count,create_time",
+    "instagram": "id,media_type,media_url,permalink,caption,timestamp,like_count,comments_count",
+    "linkedin": "",
+}
+
 
 class SocialMetricsPOC(POCTemplate):
     """POC para coleta de métricas de redes sociais"""
     
-    def __init__(self):
-        """Inicializar coletor de métricas"""
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 platform_concurrency: Optional[Dict[str, int]] = None,
+                 quota: Optional[QuotaManager] = None, max_quota_wait: float = DEFAULT_MAX_QUOTA_WAIT,
+                 breakers: Optional[CircuitBreakerRegistry] = None,
+                 cache: Optional[MetricsResponseCache] = metrics_cache):
+        """Inicializar coletor de métricas
+        
+        Args:
+            max_concurrency: Máximo de requisições simultâneas somando todas as plataformas
+            platform_concurrency: Máximo por plataforma (sobrepõe DEFAULT_PLATFORM_CONCURRENCY)
+            quota: Gerenciador de cotas (padrão: orçamento compartilhado do processo)
+            max_quota_wait: Espera máxima pela cota; acima disso o lote é adiado
+            breakers: Circuit breakers por endpoint (padrão: registro compartilhado com as POCs de upload)
+            cache: Cache de respostas (padrão: cache compartilhado do processo; None desativa)
+        """
         super().__init__()
         self.name = "Social Metrics Collection POC"
         
+        # Limites de concorrência da coleta
+        self.max_concurrency = max_concurrency
+        self.platform_concurrency = {**DEFAULT_PLATFORM_CONCURRENCY, **(platform_concurrency or {})}
+        
+        # Orçamento de cota das APIs: lotes sem cota são adiados em vez de falhar
+        self.quota = quota or quota_manager
+        self.max_quota_wait = max_quota_wait
+        
+        # Endpoints degradados falham rápido em vez de esperar o timeout
+        self.breakers = breakers or circuit_breakers
+        
+        # Atualizações repetidas dentro do TTL não chegam à API
+        self.cache = cache
+        
+        # Sessão HTTP compartilhada: reaproveita conexões entre as threads da coleta
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.platform_concurrency), pool_maxsize=max_concurrency)
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+        
         # Tokens de acesso
         self.tiktok_token = None
         self.instagram_token = None
         self.linkedin_token = None
         
-        # URLs base das APIs
-        self.tiktok_base = "https://open.tiktokapis.com"
-        self.instagram_base = "https://graph.facebook.com/v18.0"
-        self.linkedin_base = "https://api.linkedin.com/v2"
+        # URLs base das APIs (sobrescrevíveis por ambiente, ex.: simulador local)
+        self.tiktok_base = os.getenv("TIKTOK_API_BASE_URL", "https://open.tiktokapis.com")
+        self.instagram_base = os.getenv("INSTAGRAM_API_BASE_URL", "https://graph.facebook.com/v18.0")
+        self.linkedin_base = os.getenv("LINKEDIN_API_BASE_URL", "https://api.linkedin.com/v2")
     
     def setup(self) -> bool:
         """Configurar tokens de acesso"""
@@ -58,68 +124,90 @@ class SocialMetricsPOC(POCTemplate):
     
     def get_tiktok_metrics(self, video_id: str) -> Dict[str, Any]:
         """Obter métricas de vídeo do TikTok"""
+        return self.get_tiktok_metrics_batch([video_id])[video_id]
+    
+    def get_tiktok_metrics_batch(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Obter métricas de até METRICS_BATCH_SIZES['tiktok'] vídeos em uma requisição
+        
+        Usa o endpoint de consulta de vídeos, que recebe a lista de ids no corpo.
+        """
         try:
             if not self.tiktok_token:
-                return {"status": "error", "message": "Token TikTok não configurado"}
+                return self._batch_error(video_ids, "Token TikTok não configurado")
             
-            logger.info(f"Coletando métricas do TikTok para vídeo: {video_id}")
+            logger.info(f"Coletando métricas do TikTok para {len(video_ids)} vídeos")
             
-            url = f"{self.tiktok_base}/v2/video/info/"
+            url = f"{self.tiktok_base}/v2/video/query/"
             headers = {
                 "Authorization": f"Bearer {self.tiktok_token}",
                 "Content-Type": "application/json"
             }
-            params = {
-                "fields": "id,title,cover_image_url,embed_url,like_count,comment_count,share_count,view_count,create_time"
-            }
+            params = {"fields": METRICS_FIELDS["tiktok"]}
+            body = {"filters": {"video_ids": list(video_ids)}}
             
-            response = requests.get(url, headers=headers, params=params)
+            response, results = self._request(
+                "tiktok", "video_query", self.tiktok_token, video_ids,
+                "post", url, headers=headers, params=params, json=body
+            )
+            if results is not None:
+                return results
             
             if response.status_code == 200:
-                data = response.json()
-                return {
+                videos = response.json().get("data", {}).get("videos", [])
+                found = {str(video.get("id")): video for video in videos}
+                return self._split_batch(video_ids, found, lambda video_id, video: {
                     "status": "success",
                     "platform": "tiktok",
                     "data": {
                         "video_id": video_id,
-                        "likes": data.get("data", {}).get("like_count", 0),
-                        "comments": data.get("data", {}).get("comment_count", 0),
-                        "shares": data.get("data", {}).get("share_count", 0),
-                        "views": data.get("data", {}).get("view_count", 0),
-                        "created_time": data.get("data", {}).get("create_time", ""),
-                        "title": data.get("data", {}).get("title", ""),
-                        "embed_url": data.get("data", {}).get("embed_url", "")
+                        "likes": video.get("like_count", 0),
+                        "comments": video.get("comment_count", 0),
+                        "shares": video.get("share_count", 0),
+                        "views": video.get("view_count", 0),
+                        "created_time": video.get("create_time", ""),
+                        "title": video.get("title", ""),
+                        "embed_url": video.get("embed_link", "")
                     }
-                }
+                })
             else:
-                return {
-                    "status": "error",
-                    "message": f"Erro na API TikTok: {response.status_code}"
-                }
+                return self._batch_error(video_ids, f"Erro na API TikTok: {response.status_code}")
                 
         except Exception as e:
             logger.error(f"Erro ao coletar métricas do TikTok: {e}")
-            return {"status": "error", "message": str(e)}
+            return self._batch_error(video_ids, str(e))
     
     def get_instagram_metrics(self, media_id: str) -> Dict[str, Any]:
         """Obter métricas de post do Instagram"""
+        return self.get_instagram_metrics_batch([media_id])[media_id]
+    
+    def get_instagram_metrics_batch(self, media_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Obter métricas de até METRICS_BATCH_SIZES['instagram'] posts em uma requisição
+        
+        A Graph API aceita vários objetos em GET /?ids=a,b,c e responde um dicionário
+        por id. Um id inválido derruba a requisição inteira (400); nesse caso o lote é
+        refeito post a post para isolar o id problemático.
+        """
         try:
             if not self.instagram_token:
-                return {"status": "error", "message": "Token Instagram não configurado"}
+                return self._batch_error(media_ids, "Token Instagram não configurado")
             
-            logger.info(f"Coletando métricas do Instagram para post: {media_id}")
+            logger.info(f"Coletando métricas do Instagram para {len(media_ids)} posts")
             
-            url = f"{self.instagram_base}/{media_id}"
+            url = f"{self.instagram_base}/"
             params = {
-                "fields": "id,media_type,media_url,permalink,caption,timestamp,like_count,comments_count",
+                "ids": ",".join(media_ids),
+                "fields": METRICS_FIELDS["instagram"],
                 "access_token": self.instagram_token
             }
             
-            response = requests.get(url, params=params)
+            response, results = self._request(
+                "instagram", "media", self.instagram_token, media_ids, "get", url, params=params
+            )
+            if results is not None:
+                return results
             
             if response.status_code == 200:
-                data = response.json()
-                return {
+                return self._split_batch(media_ids, response.json(), lambda media_id, data: {
                     "status": "success",
                     "platform": "instagram",
                     "data": {
@@ -133,37 +221,52 @@ class SocialMetricsPOC(POCTemplate):
                         "media_url": data.get("media_url", ""),
                         "permalink": data.get("permalink", "")
                     }
-                }
+                })
+            elif response.status_code == 400 and len(media_ids) > 1:
+                results = {}
+                for media_id in media_ids:
+                    results.update(self.get_instagram_metrics_batch([media_id]))
+                return results
             else:
-                return {
-                    "status": "error",
-                    "message": f"Erro na API Instagram: {response.status_code}"
-                }
+                return self._batch_error(media_ids, f"Erro na API Instagram: {response.status_code}")
                 
         except Exception as e:
             logger.error(f"Erro ao coletar métricas do Instagram: {e}")
-            return {"status": "error", "message": str(e)}
+            return self._batch_error(media_ids, str(e))
     
     def get_linkedin_metrics(self, post_id: str) -> Dict[str, Any]:
         """Obter métricas de post do LinkedIn"""
+        return self.get_linkedin_metrics_batch([post_id])[post_id]
+    
+    def get_linkedin_metrics_batch(self, post_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Obter métricas de até METRICS_BATCH_SIZES['linkedin'] posts em uma requisição
+        
+        Usa o BATCH_GET do socialActions (ids repetidos na query), que responde os
+        resultados por URN em "results" e as falhas em "errors".
+        """
         try:
             if not self.linkedin_token:
-                return {"status": "error", "message": "Token LinkedIn não configurado"}
+                return self._batch_error(post_ids, "Token LinkedIn não configurado")
             
-            logger.info(f"Coletando métricas do LinkedIn para post: {post_id}")
+            logger.info(f"Coletando métricas do LinkedIn para {len(post_ids)} posts")
             
             # LinkedIn usa URN format
-            url = f"{self.linkedin_base}/socialActions/{post_id}"
+            url = f"{self.linkedin_base}/socialActions"
             headers = {
                 "Authorization": f"Bearer {self.linkedin_token}",
                 "Content-Type": "application/json"
             }
+            params = [("ids", post_id) for post_id in post_ids]
             
-            response = requests.get(url, headers=headers)
+            response, results = self._request(
+                "linkedin", "social_actions", self.linkedin_token, post_ids,
+                "get", url, headers=headers, params=params
+            )
+            if results is not None:
+                return results
             
             if response.status_code == 200:
-                data = response.json()
-                return {
+                return self._split_batch(post_ids, response.json().get("results", {}), lambda post_id, data: {
                     "status": "success",
                     "platform": "linkedin",
                     "data": {
@@ -176,67 +279,256 @@ class SocialMetricsPOC(POCTemplate):
                         "text": data.get("text", {}).get("text", ""),
                         "permalink": data.get("permalink", "")
                     }
-                }
+                })
             else:
-                return {
-                    "status": "error",
-                    "message": f"Erro na API LinkedIn: {response.status_code}"
-                }
+                return self._batch_error(post_ids, f"Erro na API LinkedIn: {response.status_code}")
                 
         except Exception as e:
             logger.error(f"Erro ao coletar métricas do LinkedIn: {e}")
-            return {"status": "error", "message": str(e)}
+            return self._batch_error(post_ids, str(e))
+    
+    def _request(self, platform: str, endpoint: str, token: str, post_ids: List[str],
+                 method: str, url: str, **kwargs):
+        """Fazer uma requisição de lote respeitando a cota da API
+        
+        Retorna (resposta, None) ou (None, resultados prontos): adiados quando não há
+        cota agora, a API respondeu 429 ou o circuito do endpoint está aberto, ou os
+        do cache quando a API confirma com 304 que o lote não mudou.
+        """
+        delay = self.quota.acquire(platform, endpoint, token, max_wait=self.max_quota_wait)
+        if delay:
+            return None, self._batch_deferred(post_ids, delay, f"Cota da API {platform} esgotada")
+        
+        # Requisição condicional quando já temos a ETag deste mesmo lote
+        fields = METRICS_FIELDS.get(platform, "")
+        etag = None
+        if self.cache is not None and method.lower() == "get":
+            etag = self.cache.etag(platform, post_ids, fields)
+            if etag:
+                kwargs["headers"] = {**(kwargs.get("headers") or {}), "If-None-Match": etag}
+        
+        try:
+            response = resilient_request(
+                method, url, platform, endpoint, session=self.http, registry=self.breakers, **kwargs
+            )
+        except CircuitOpenError as e:
+            return None, self._batch_deferred(post_ids, e.retry_after, str(e))
+        self.quota.record_response(platform, endpoint, response.headers, response.status_code, token)
+        
+        if response.status_code == 429:
+            delay = self.quota.delay(platform, endpoint, token)
+            return None, self._batch_deferred(post_ids, delay, f"Limite de requisições da API {platform}")
+        
+        if etag and response.status_code == 304:
+            cached = self.cache.revalidated(platform, post_ids, fields)
+            if cached is not None:
+                return None, cached
+            # Entradas descartadas entre o envio e a resposta: busca sem condição
+            kwargs["headers"].pop("If-None-Match")
+            return self._request(platform, endpoint, token, post_ids, method, url, **kwargs)
+        
+        if self.cache is not None and response.status_code == 200 and response.headers.get("ETag"):
+            self.cache.remember_etag(platform, post_ids, response.headers["ETag"], fields)
+        return response, None
+    
+    def _batch_deferred(self, post_ids: List[str], retry_after: float, message: str) -> Dict[str, Dict[str, Any]]:
+        """Marcar todos os posts de um lote como adiados até a cota voltar"""
+        return {
+            post_id: {"status": "deferred", "message": message, "retry_after": retry_after}
+            for post_id in post_ids
+        }
+    
+    def _split_batch(self, post_ids: List[str], found: Dict[str, Any], parse) -> Dict[str, Dict[str, Any]]:
+        """Separar a resposta de um lote em um resultado por post"""
+        results = {}
+        for post_id in post_ids:
+            data = found.get(post_id)
+            if data is None:
+                results[post_id] = {"status": "error", "message": f"Post não encontrado: {post_id}"}
+            else:
+                results[post_id] = parse(post_id, data)
+        return results
+    
+    def _batch_error(self, post_ids: List[str], message: str) -> Dict[str, Dict[str, Any]]:
+        """Repetir o mesmo erro para todos os posts de um lote"""
+        return {post_id: {"status": "error", "message": message} for post_id in post_ids}
+    
+    def get_metrics_batch(self, platform: str, post_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Obter métricas de um lote de posts da mesma plataforma, passando pelo cache
+        
+        Posts frescos no cache não são consultados; posts que outra thread já está
+        coletando esperam o resultado dela em vez de repetir a requisição.
+        """
+        if self.cache is None:
+            return self._fetch_metrics_batch(platform, post_ids)
+        
+        fields = METRICS_FIELDS.get(platform, "")
+        results, owned, waiting = self.cache.claim(platform, post_ids, fields)
+        if owned:
+            fetched = {}
+            try:
+                fetched = self._fetch_metrics_batch(platform, owned)
+                results.update(fetched)
+            finally:
+                self.cache.release(platform, fetched, owned, fields)
+        
+        missing = []
+        for post_id, flight in waiting.items():
+            result = self.cache.wait(flight)
+            if result is None:
+                missing.append(post_id)
+            else:
+                results[post_id] = result
+        if missing:
+            results.update(self._fetch_metrics_batch(platform, missing))
+        
+        return {post_id: results[post_id] for post_id in post_ids}
+    
+    def _fetch_metrics_batch(self, platform: str, post_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Consultar a API da plataforma para um lote de posts"""
+        if platform == "tiktok":
+            return self.get_tiktok_metrics_batch(post_ids)
+        elif platform == "instagram":
+            return self.get_instagram_metrics_batch(post_ids)
+        elif platform == "linkedin":
+            return self.get_linkedin_metrics_batch(post_ids)
+        return self._batch_error(post_ids, f"Plataforma não suportada: {platform}")
+    
+    def get_post_metrics(self, post: Dict[str, str]) -> Dict[str, Any]:
+        """Obter métricas de um post de qualquer plataforma suportada"""
+        post_id = post.get("post_id", "")
+        return self.get_metrics_batch(post.get("platform", "").lower(), [post_id])[post_id]
+    
+    def _plan_batches(self, posts: List[Dict[str, str]]) -> List[Tuple[str, List[str]]]:
+        """Agrupar os ids de post por plataforma em lotes do tamanho máximo de cada API"""
+        ids_by_platform: Dict[str, List[str]] = {}
+        for post in posts:
+            platform = post.get("platform", "").lower()
+            ids_by_platform.setdefault(platform, []).append(post.get("post_id", ""))
+        
+        batches = []
+        for platform, post_ids in ids_by_platform.items():
+            unique_ids = list(dict.fromkeys(post_ids))
+            size = METRICS_BATCH_SIZES.get(platform, len(unique_ids))
+            for offset in range(0, len(unique_ids), size):
+                batches.append((platform, unique_ids[offset:offset + size]))
+        return batches
+    
+    def _new_total_metrics(self) -> Dict[str, Any]:
+        """Criar o acumulador de métricas totais"""
+        return {
+            "total_likes": 0,
+            "total_comments": 0,
+            "total_shares": 0,
+            "total_views": 0,
+            "platforms": {}
+        }
+    
+    def _add_to_totals(self, total_metrics: Dict[str, Any], platform: str, metrics: Dict[str, Any]):
+        """Somar o resultado de um post às métricas totais (apenas coletas com sucesso)"""
+        if metrics["status"] != "success":
+            return
+        
+        data = metrics["data"]
+        
+        # Somar métricas totais
+        total_metrics["total_likes"] += data.get("likes", 0)
+        total_metrics["total_comments"] += data.get("comments", 0)
+        total_metrics["total_shares"] += data.get("shares", 0)
+        total_metrics["total_views"] += data.get("views", 0)
+        
+        # Métricas por plataforma
+        if platform not in total_metrics["platforms"]:
+            total_metrics["platforms"][platform] = {
+                "likes": 0, "comments": 0, "shares": 0, "views": 0, "posts": 0
+            }
+        
+        total_metrics["platforms"][platform]["likes"] += data.get("likes", 0)
+        total_metrics["platforms"][platform]["comments"] += data.get("comments", 0)
+        total_metrics["platforms"][platform]["shares"] += data.get("shares", 0)
+        total_metrics["platforms"][platform]["views"] += data.get("views", 0)
+        total_metrics["platforms"][platform]["posts"] += 1
+    
+    def iter_metrics(self, posts: List[Dict[str, str]]) -> Iterator[Dict[str, Any]]:
+        """Coletar métricas produzindo cada resultado assim que o lote dele termina
+        
+        Os posts são agrupados em lotes por plataforma (_plan_batches). Cada plataforma
+        tem seu próprio pool de threads (limite por plataforma) e toda requisição ocupa
+        uma vaga do semáforo global, então uma plataforma lenta não segura vagas das
+        outras enquanto espera.
+        
+        Cada item traz o índice do post na lista, o post, o resultado, o progresso e
+        as métricas totais acumuladas até ali (o mesmo dicionário, atualizado a cada
+        item; copie se precisar guardar um retrato). Nada além dos lotes em andamento
+        fica em memória.
+        """
+        posts = list(posts)
+        positions: Dict[Tuple[str, str], List[int]] = {}
+        for index, post in enumerate(posts):
+            key = (post.get("platform", "").lower(), post.get("post_id", ""))
+            positions.setdefault(key, []).append(index)
+        
+        total_metrics = self._new_total_metrics()
+        completed = 0
+        global_slots = threading.BoundedSemaphore(self.max_concurrency)
+        
+        def fetch(platform: str, post_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+            with global_slots:
+                try:
+                    return self.get_metrics_batch(platform, post_ids)
+                except Exception as e:
+                    logger.error(f"Erro ao coletar métricas de {len(post_ids)} posts ({platform}): {e}")
+                    return self._batch_error(post_ids, str(e))
+        
+        def item(index: int, platform: str, metrics: Dict[str, Any]) -> Dict[str, Any]:
+            self._add_to_totals(total_metrics, platform, metrics)
+            return {
+                "index": index,
+                "post": posts[index],
+                "result": metrics,
+                "completed": completed,
+                "total": len(posts),
+                "total_metrics": total_metrics
+            }
+        
+        executors = {}
+        try:
+            futures = {}
+            for platform, post_ids in self._plan_batches(posts):
+                if platform not in executors:
+                    executors[platform] = ThreadPoolExecutor(
+                        max_workers=max(1, min(self.platform_concurrency.get(platform, 1), self.max_concurrency)),
+                        thread_name_prefix=f"metrics-{platform or 'unknown'}"
+                    )
+                futures[executors[platform].submit(fetch, platform, post_ids)] = platform
+            
+            for future in as_completed(futures):
+                platform = futures[future]
+                for post_id, metrics in future.result().items():
+                    for index in positions.pop((platform, post_id), []):
+                        completed += 1
+                        yield item(index, platform, metrics)
+            
+            # Resposta de lote sem algum id pedido (não deveria acontecer)
+            for (platform, post_id), indexes in positions.items():
+                for index in indexes:
+                    completed += 1
+                    yield item(index, platform, {"status": "error", "message": f"Post sem resultado: {post_id}"})
+        finally:
+            # Consumidor parou antes do fim: lotes ainda na fila são cancelados
+            for executor in executors.values():
+                executor.shutdown(wait=True, cancel_futures=True)
     
     def collect_all_metrics(self, posts: List[Dict[str, str]]) -> Dict[str, Any]:
         """Coletar métricas de múltiplos posts"""
         try:
             logger.info(f"Coletando métricas de {len(posts)} posts...")
             
-            results = []
-            total_metrics = {
-                "total_likes": 0,
-                "total_comments": 0,
-                "total_shares": 0,
-                "total_views": 0,
-                "platforms": {}
-            }
-            
-            for post in posts:
-                platform = post.get("platform", "").lower()
-                post_id = post.get("post_id", "")
-                
-                if platform == "tiktok":
-                    metrics = self.get_tiktok_metrics(post_id)
-                elif platform == "instagram":
-                    metrics = self.get_instagram_metrics(post_id)
-                elif platform == "linkedin":
-                    metrics = self.get_linkedin_metrics(post_id)
-                else:
-                    metrics = {"status": "error", "message": f"Plataforma não suportada: {platform}"}
-                
-                if metrics["status"] == "success":
-                    data = metrics["data"]
-                    results.append(metrics)
-                    
-                    # Somar métricas totais
-                    total_metrics["total_likes"] += data.get("likes", 0)
-                    total_metrics["total_comments"] += data.get("comments", 0)
-                    total_metrics["total_shares"] += data.get("shares", 0)
-                    total_metrics["total_views"] += data.get("views", 0)
-                    
-                    # Métricas por plataforma
-                    if platform not in total_metrics["platforms"]:
-                        total_metrics["platforms"][platform] = {
-                            "likes": 0, "comments": 0, "shares": 0, "views": 0, "posts": 0
-                        }
-                    
-                    total_metrics["platforms"][platform]["likes"] += data.get("likes", 0)
-                    total_metrics["platforms"][platform]["comments"] += data.get("comments", 0)
-                    total_metrics["platforms"][platform]["shares"] += data.get("shares", 0)
-                    total_metrics["platforms"][platform]["views"] += data.get("views", 0)
-                    total_metrics["platforms"][platform]["posts"] += 1
-                else:
-                    results.append(metrics)
+            results = [None] * len(posts)
+            total_metrics = self._new_total_metrics()
+            for item in self.iter_metrics(posts):
+                results[item["index"]] = item["result"]
+                total_metrics = item["total_metrics"]
             
             return {
                 "status": "success",
@@ -286,7 +578,7 @@ class SocialMetricsPOC(POCTemplate):
         """Limpar recursos"""
         try:
             logger.info("Limpando recursos de métricas...")
-            # Aqui você poderia limpar arquivos temporários, etc.
+            self.http.close()
             logger.info("Limpeza de métricas concluída")
         except Exception as e:
             logger.error(f"Erro na limpeza: {e}")
@@ -0,0 +1 @@
+# Resiliência das chamadas às APIs externas
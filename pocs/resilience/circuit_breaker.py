@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker para APIs de Plataformas
+Descrição: Falha rápido em plataformas/endpoints degradados em vez de esperar timeouts
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Timeouts explícitos (conexão, leitura) em segundos
+DEFAULT_TIMEOUT = (3.05, 10)
+UPLOAD_TIMEOUT = (3.05, 120)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Chamada recusada porque o circuito do endpoint está aberto"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuito aberto para {name}; nova tentativa em {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Circuit breaker com janela deslizante de chamadas
+
+    Abre quando, nas chamadas dos últimos window_seconds (pelo menos min_calls), a taxa de
+    erros passa de error_rate_threshold ou a taxa de chamadas lentas (latência acima de
+    latency_threshold) passa de slow_call_rate_threshold. Aberto, recusa chamadas por
+    open_seconds; depois fica meio-aberto e libera até half_open_max_calls sondas: se
+    todas derem certo o circuito fecha, se alguma falhar ele abre de novo.
+
+    Cada mudança de estado inicia uma nova geração. allow() devolve a geração em que a
+    chamada foi liberada e record() descarta resultados de gerações anteriores: uma
+    chamada lenta liberada com o circuito fechado não conta como sonda ao terminar
+    depois de ele ficar meio-aberto.
+    """
+
+    def __init__(self, name: str, error_rate_threshold: float = 0.5, latency_threshold: float = 5.0,
+                 slow_call_rate_threshold: float = 0.8, min_calls: int = 5, window_seconds: float = 60.0,
+                 open_seconds: float = 30.0, half_open_max_calls: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.error_rate_threshold = error_rate_threshold
+        self.latency_threshold = latency_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._calls = deque()  # (instante, falhou, lenta)
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._generation = 1
+
+    @property
+    def state(self) -> str:
+        """Estado atual (aberto vira meio-aberto ao fim de open_seconds)"""
+        with self._lock:
+            return self._current_state(self.clock())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._generation += 1
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        return self._state
+
+    def retry_after(self) -> float:
+        """Segundos até o circuito aceitar uma nova sonda"""
+        with self._lock:
+            now = self.clock()
+            if self._current_state(now) != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.open_seconds - now)
+
+    def allow(self) -> Optional[int]:
+        """Reservar uma chamada; devolve a geração a informar em record() ou None se recusada"""
+        with self._lock:
+            state = self._current_state(self.clock())
+            if state == CLOSED:
+                return self._generation
+            if state == HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return self._generation
+            return None
+
+    def record(self, generation: int, success: bool, latency: float):
+        """Registrar o resultado de uma chamada liberada por allow() na geração informada"""
+        slow = latency >= self.latency_threshold
+        with self._lock:
+            now = self.clock()
+            state = self._current_state(now)
+
+            # O estado mudou desde que a chamada foi liberada: o resultado não diz
+            # nada sobre o estado atual (e não é o de uma sonda)
+            if generation != self._generation:
+                return
+
+            if state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if not success or slow:
+                    self._open(now)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_max_calls:
+                        logger.info(f"Circuito {self.name} fechado após sondagem")
+                        self._state = CLOSED
+                        self._generation += 1
+                        self._calls.clear()
+                return
+
+            self._calls.append((now, not success, slow))
+            while self._calls and self._calls[0][0] <= now - self.window_seconds:
+                self._calls.popleft()
+
+            if state == CLOSED and len(self._calls) >= self.min_calls:
+                total = len(self._calls)
+                error_rate = sum(1 for _, failed, _ in self._calls if failed) / total
+                slow_rate = sum(1 for _, _, is_slow in self._calls if is_slow) / total
+                if error_rate >= self.error_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                    self._open(now)
+
+    def _open(self, now: float):
+        """Abrir o circuito (com o lock adquirido)"""
+        if self._state != OPEN:
+            logger.warning(f"Circuito {self.name} aberto por {self.open_seconds:.0f}s")
+        self._state = OPEN
+        self._generation += 1
+        self._opened_at = now
+        self._calls.clear()
+
+
+class CircuitBreakerRegistry:
+    """Circuit breakers por (plataforma, endpoint), criados sob demanda
+
+    platform_options sobrepõe os parâmetros do CircuitBreaker por plataforma, p.ex.
+    {"tiktok": {"latency_threshold": 8.0}}.
+    """
+
+    def __init__(self, platform_options: Optional[Dict[str, Dict[str, Any]]] = None, **default_options):
+        self.platform_options = platform_options or {}
+        self.default_options = default_options
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, platform: str, endpoint: str) -> CircuitBreaker:
+        """Obter (ou criar) o breaker de um endpoint"""
+        key = (platform, endpoint)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                options = {**self.default_options, **self.platform_options.get(platform, {})}
+                breaker = self._breakers[key] = CircuitBreaker(f"{platform}/{endpoint}", **options)
+            return breaker
+
+    def states(self) -> Dict[str, str]:
+        """Estado de todos os breakers (para logs e dashboard)"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.state for breaker in breakers}
+
+
+# Registro compartilhado pelas POCs de métricas e de upload
+circuit_breakers = CircuitBreakerRegistry()
+
+
+def resilient_request(method: str, url: str, platform: str, endpoint: str, session=None,
+                      registry: CircuitBreakerRegistry = None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """Fazer uma requisição HTTP protegida pelo circuit breaker do endpoint
+
+    Timeouts, erros de conexão e respostas 5xx contam como falha; respostas lentas contam
+    para a taxa de chamadas lentas. 4xx (inclusive 429, tratado pela cota) não indicam
+    plataforma doente. Com o circuito aberto levanta CircuitOpenError sem tocar a rede.
+    """
+    breaker = (registry or circuit_breakers).get(platform, endpoint)
+    generation = breaker.allow()
+    if generation is None:
+        raise CircuitOpenError(breaker.name, breaker.retry_after())
+
+    client = session if session is not None else requests
+    start = time.monotonic()
+    try:
+        response = getattr(client, method.lower())(url, timeout=timeout, **kwargs)
+    except Exception:
+        breaker.record(generation, False, time.monotonic() - start)
+        raise
+
+    breaker.record(generation, response.status_code < 500, time.monotonic() - start)
+    return response
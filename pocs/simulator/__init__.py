@@ -0,0 +1 @@
+# Simulador local das APIs externas para testes de carga
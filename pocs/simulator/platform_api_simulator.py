@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Simulador Local das APIs das Plataformas
+Descrição: Servidor HTTP que imita Graph API, TikTok, LinkedIn e OpenAI para testes de carga offline
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import re
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# PNG 1x1 devolvido pela geração de imagens
+SIMULATED_IMAGE_B64 = (
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+# Prefixo de versão da Graph API (/v18.0/...)
+GRAPH_VERSION = re.compile(r"^/v\d+\.\d+(/.*)?$")
+
+# Variáveis de ambiente lidas pelas POCs para trocar a URL base das APIs
+BASE_URL_ENV = {
+    "TIKTOK_API_BASE_URL": "",
+    "INSTAGRAM_API_BASE_URL": "/v18.0",
+    "LINKEDIN_API_BASE_URL": "/v2",
+    "OPENAI_BASE_URL": "/v1",
+}
+
+
+def simulated_metrics(post_id: str, elapsed: float) -> Dict[str, int]:
+    """Métricas determinísticas por post, crescendo devagar com o tempo de execução"""
+    seed = int(hashlib.sha256(post_id.encode()).hexdigest()[:8], 16)
+    minutes = int(elapsed // 60)
+    views = seed % 50000 + minutes * (seed % 97)
+    return {
+        "likes": seed % 5000 + minutes * (seed % 7),
+        "comments": seed % 400 + minutes * (seed % 3),
+        "shares": seed % 150,
+        "views": views,
+    }
+
+
+class PlatformAPISimulator:
+    """Servidor local com os endpoints usados pelas POCs
+
+    - Graph API: GET /?ids=, GET /{id} (mídia, container, conta), POST /{conta}/media
+      e /{conta}/media_publish; respostas de métricas com ETag e 304 para If-None-Match
+    - TikTok: /v2/user/info/, /v2/post/publish/video/init/, PUT /upload/{id},
+      /v2/post/publish/status/fetch/ e /v2/video/query/
+    - LinkedIn: GET /v2/socialActions?ids=...
+    - OpenAI: POST /v1/images/generations (b64_json)
+
+    Falhas são injetadas por requisição: latency (+ jitter aleatório) em segundos,
+    error_rate de respostas 503 e rate_limit_rate de respostas 429 com Retry-After.
+    Ids de post contendo "invalid" respondem 400 na Graph API e "não encontrado" nas demais.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: int = 1,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._counter = 0
+        self._stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._thread = None
+
+        self.server = ThreadingHTTPServer((host, port), _SimulatorHandler)
+        self.server.daemon_threads = True
+        self.server.simulator = self
+
+    @property
+    def url(self) -> str:
+        """URL base do simulador"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Variáveis de ambiente que apontam as POCs para o simulador"""
+        return {name: f"{self.url}{path}" for name, path in BASE_URL_ENV.items()}
+
+    def start(self) -> "PlatformAPISimulator":
+        """Atender em uma thread em segundo plano"""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="api-simulator", daemon=True)
+        self._thread.start()
+        logger.info(f"Simulador de APIs em {self.url}")
+        return self
+
+    def serve_forever(self):
+        """Atender na thread atual até stop() (ou Ctrl+C)"""
+        self.server.serve_forever()
+
+    def stop(self):
+        """Parar o servidor e liberar a porta"""
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "PlatformAPISimulator":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """Requisições atendidas por endpoint e status ("endpoint status")"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _record(self, endpoint: str, status: int):
+        with self._stats_lock:
+            self._stats[f"{endpoint} {status}"] += 1
+
+    def _next_id(self, prefix: str) -> str:
+        with self._random_lock:
+            self._counter += 1
+            return f"{prefix}_{self._counter}"
+
+    def _inject(self) -> Tuple[Optional[int], float]:
+        """Sortear latência e falha injetada de uma requisição"""
+        with self._random_lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return 429, delay
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 503, delay
+        return None, delay
+
+    def elapsed(self) -> float:
+        """Segundos desde o início do simulador (base do crescimento das métricas)"""
+        return time.monotonic() - self._started_at
+
+    def route(self, method: str, path: str, query: Dict[str, list], body: Any) -> Tuple[str, int, Any]:
+        """Resolver uma requisição: (nome do endpoint, status, corpo JSON)"""
+        if method == "PUT" and path.startswith("/upload/"):
+            return "tiktok.upload", 200, {"data": {}, "error": {"code": "ok"}}
+
+        if path.startswith("/v2/") and not path.startswith("/v2/socialActions"):
+            return self._tiktok(method, path, query, body)
+
+        if path.rstrip("/") == "/v2/socialActions" and method == "GET":
+            ids = query.get("ids", [])
+            elapsed = self.elapsed()
+            results = {}
+            errors = {}
+            for post_id in ids:
+                if "invalid" in post_id:
+                    errors[post_id] = {"status": 404, "message": "Not found"}
+                    continue
+                metrics = simulated_metrics(post_id, elapsed)
+                results[post_id] = {
+                    "numLikes": metrics["likes"], "numComments": metrics["comments"],
+                    "numShares": metrics["shares"], "created": {"time": 1704067200000},
+                    "text": {"text": f"Post {post_id}"}, "permalink": f"https://linkedin.example/{post_id}",
+                }
+            return "linkedin.social_actions", 200, {"results": results, "errors": errors}
+
+        if path.rstrip("/") == "/v1/images/generations" and method == "POST":
+            prompt = (body or {}).get("prompt", "")
+            return "openai.images", 200, {
+                "created": int(time.time()),
+                "data": [{"b64_json": SIMULATED_IMAGE_B64, "revised_prompt": prompt}],
+            }
+
+        match = GRAPH_VERSION.match(path)
+        if match:
+            return self._graph(method, (match.group(1) or "/").strip("/"), query, body)
+
+        return "unknown", 404, {"error": {"message": f"Endpoint não simulado: {method} {path}"}}
+
+    def _tiktok(self, method: str, path: str, query: Dict[str, list], body: Any) -> Tuple[str, int, Any]:
+        """Endpoints da API do TikTok"""
+        ok = {"code": "ok", "message": ""}
+        if path == "/v2/user/info/" and method == "GET":
+            return "tiktok.user_info", 200, {"data": {"user": {
+                "open_id": "simulador", "display_name": "Simulador", "username": "simulador"
+            }}, "error": ok}
+
+        if path == "/v2/post/publish/video/init/" and method == "POST":
+            publish_id = self._next_id("v_pub")
+            return "tiktok.publish_init", 200, {"data": {
+                "publish_id": publish_id, "upload_url": f"{self.url}/upload/{publish_id}"
+            }, "error": ok}
+
+        if path == "/v2/post/publish/status/fetch/" and method == "POST":
+            publish_id = (query.get("publish_id") or [(body or {}).get("publish_id", "")])[0]
+            video_id = f"video_{publish_id.rsplit('_', 1)[-1]}"
+            return "tiktok.publish_status", 200, {"data": {
+                "status": "PUBLISH_COMPLETE", "video_id": video_id,
+                "share_url": f"https://tiktok.example/video/{video_id}"
+            }, "error": ok}
+
+        if path == "/v2/video/query/" and method == "POST":
+            video_ids = ((body or {}).get("filters") or {}).get("video_ids", [])
+            elapsed = self.elapsed()
+            videos = []
+            for video_id in video_ids:
+                if "invalid" in video_id:
+                    continue
+                metrics = simulated_metrics(video_id, elapsed)
+                videos.append({
+                    "id": video_id, "title": f"Vídeo {video_id}", "create_time": 1704067200,
+                    "embed_link": f"https://tiktok.example/embed/{video_id}",
+                    "like_count": metrics["likes"], "comment_count": metrics["comments"],
+                    "share_count": metrics["shares"], "view_count": metrics["views"],
+                })
+            return "tiktok.video_query", 200, {"data": {"videos": videos}, "error": ok}
+
+        return "unknown", 404, {"error": {"code": "not_found", "message": f"{method} {path}"}}
+
+    def _graph(self, method: str, node: str, query: Dict[str, list], body: Any) -> Tuple[str, int, Any]:
+        """Endpoints da Graph API (Instagram)"""
+        graph_error = {"error": {"message": "Invalid parameter", "type": "OAuthException", "code": 100}}
+
+        if method == "POST" and node.endswith("/media"):
+            return "instagram.media_container", 200, {"id": self._next_id("container")}
+
+        if method == "POST" and node.endswith("/media_publish"):
+            container_id = (body or {}).get("creation_id", "")
+            return "instagram.media_publish", 200, {"id": f"media_{container_id.rsplit('_', 1)[-1]}"}
+
+        if method != "GET":
+            return "unknown", 404, graph_error
+
+        elapsed = self.elapsed()
+        if not node:
+            ids = [i for i in (query.get("ids") or [""])[0].split(",") if i]
+            if not ids or any("invalid" in media_id for media_id in ids):
+                return "instagram.media", 400, graph_error
+            return "instagram.media", 200, {media_id: self._graph_media(media_id, elapsed) for media_id in ids}
+
+        if "invalid" in node:
+            return "instagram.media", 400, graph_error
+        if node.startswith("container_"):
+            return "instagram.container_status", 200, {
+                "id": node, "status_code": "FINISHED", "status": "Finished: Media successfully processed"
+            }
+        if node.startswith("media_"):
+            return "instagram.media", 200, self._graph_media(node, elapsed)
+        return "instagram.account", 200, {
+            "id": node, "account_type": "BUSINESS", "username": "simulador", "name": "Simulador",
+            "followers_count": 1000,
+        }
+
+    def _graph_media(self, media_id: str, elapsed: float) -> Dict[str, Any]:
+        """Objeto de mídia da Graph API com as métricas simuladas"""
+        metrics = simulated_metrics(media_id, elapsed)
+        return {
+            "id": media_id, "media_type": "VIDEO", "caption": f"Post {media_id}",
+            "media_url": f"https://instagram.example/media/{media_id}.mp4",
+            "permalink": f"https://instagram.example/p/{media_id}", "timestamp": "2024-01-01T00:00:00+0000",
+            "like_count": metrics["likes"], "comments_count": metrics["comments"],
+        }
+
+
+class _SimulatorHandler(BaseHTTPRequestHandler):
+    """Handler HTTP do simulador (keep-alive, para medir com pool de conexões)"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def do_PUT(self):
+        self._handle()
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _handle(self):
+        simulator: PlatformAPISimulator = self.server.simulator
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        body = self._parse_body(raw)
+
+        injected, delay = simulator._inject()
+        if delay:
+            time.sleep(delay)
+
+        authorized = self.headers.get("Authorization", "").startswith("Bearer ") or "access_token" in query or (
+            isinstance(body, dict) and "access_token" in body
+        ) or parts.path.startswith("/upload/")
+        if not authorized:
+            endpoint, status, payload = "unauthorized", 401, {"error": {"message": "Token ausente"}}
+        elif injected == 429:
+            endpoint, status, payload = "injected", 429, {"error": {"message": "Rate limit simulado"}}
+        elif injected == 503:
+            endpoint, status, payload = "injected", 503, {"error": {"message": "Falha simulada"}}
+        else:
+            endpoint, status, payload = simulator.route(self.command, parts.path, query, body)
+
+        content = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json"}
+        if status == 429:
+            headers["Retry-After"] = str(simulator.retry_after)
+        elif status == 200 and self.command == "GET" and endpoint in ("instagram.media", "linkedin.social_actions"):
+            # Respostas de leitura com ETag, como a Graph API
+            etag = f'"{hashlib.sha1(content).hexdigest()}"'
+            headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                status, content = 304, b""
+
+        simulator._record(endpoint, status)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        if content:
+            self.wfile.write(content)
+
+    def _parse_body(self, raw: bytes) -> Any:
+        """Ler corpo JSON ou formulário (multipart de upload é descartado)"""
+        if not raw:
+            return None
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("application/json"):
+            try:
+                return json.loads(raw)
+            except ValueError:
+                return None
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            return {key: values[0] for key, values in parse_qs(raw.decode()).items()}
+        return None
@@ -7,11 +7,11 @@ Data: 2024
 """
 
 import os
-import requests
 import json
 import logging
 from typing import Any, Dict
 from pocs.template_poc import POCTemplate
+from pocs.resilience.circuit_breaker import UPLOAD_TIMEOUT, circuit_breakers, resilient_request
 
 # Configurar logging
 logging.basicConfig(
@@ -30,7 +30,10 @@ class TikTokUploadPOC(POCTemplate):
         self.name = "TikTok Upload POC"
         self.access_token = None
         self.open_id = None
-        self.base_url = "https://open.tiktokapis.com"
+        self.base_url = os.getenv("TIKTOK_API_BASE_URL", "https://open.tiktokapis.com")
+        
+        # Circuit breakers compartilhados com as demais POCs das plataformas
+        self.breakers = circuit_breakers
         
         # Configurações do vídeo de teste
         self.video_path = None
@@ -80,7 +83,9 @@ class TikTokUploadPOC(POCTemplate):
                 "fields": "open_id,union_id,avatar_url,display_name,username"
             }
             
-            response = requests.get(url, headers=headers, params=params)
+            response = resilient_request(
+                "get", url, "tiktok", "user_info", registry=self.breakers, headers=headers, params=params
+            )
             
             if response.status_code == 200:
                 return response.json()
@@ -122,7 +127,9 @@ class TikTokUploadPOC(POCTemplate):
                 }
             }
             
-            response = requests.post(init_url, headers=headers, json=init_data)
+            response = resilient_request(
+                "post", init_url, "tiktok", "publish_init", registry=self.breakers, headers=headers, json=init_data
+            )
             
             if response.status_code != 200:
                 logger.error(f"Erro ao inicializar upload: {response.status_code} - {response.text}")
@@ -137,7 +144,10 @@ class TikTokUploadPOC(POCTemplate):
             # Passo 2: Upload do arquivo
             with open(self.video_path, 'rb') as video_file:
                 files = {'video': video_file}
-                upload_response = requests.put(upload_url, files=files)
+                upload_response = resilient_request(
+                    "put", upload_url, "tiktok", "upload", registry=self.breakers,
+                    timeout=UPLOAD_TIMEOUT, files=files
+                )
                 
                 if upload_response.status_code != 200:
                     logger.error(f"Erro no upload do arquivo: {upload_response.status_code}")
@@ -149,7 +159,10 @@ class TikTokUploadPOC(POCTemplate):
             confirm_url = f"{self.base_url}/v2/post/publish/status/fetch/"
             confirm_params = {"publish_id": publish_id}
             
-            confirm_response = requests.post(confirm_url, headers=headers, params=confirm_params)
+            confirm_response = resilient_request(
+                "post", confirm_url, "tiktok", "publish_status", registry=self.breakers,
+                headers=headers, params=confirm_params
+            )
             
             if confirm_response.status_code == 200:
                 confirm_result = confirm_response.json()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Script para arquivar métricas antigas
+Descrição: Move snapshots de métricas antigos do SQLite para arquivos Parquet
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Adicionar o diretório pai ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager
+from database.archive import MetricsArchiver
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Arquivar métricas antigas em Parquet")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"),
+                        help="URL do banco (padrão: DATABASE_URL ou SQLite local)")
+    parser.add_argument("--older-than-days", type=int, default=90,
+                        help="Arquivar snapshots com mais de N dias (padrão: 90)")
+    parser.add_argument("--archive-dir", default="archive/metrics",
+                        help="Diretório dos arquivos Parquet (padrão: archive/metrics)")
+    parser.add_argument("--batch-size", type=int, default=10000,
+                        help="Snapshots por lote (padrão: 10000)")
+
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.database_url)
+    archiver = MetricsArchiver(db, args.archive_dir)
+
+    print(f"📦 Arquivando métricas com mais de {args.older_than_days} dias...")
+    start = time.perf_counter()
+    result = archiver.archive(args.older_than_days, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {result['archived']} snapshots arquivados em {len(set(result['files']))} arquivos ({elapsed:.2f}s)")
+    if result['archived'] and db.engine.dialect.name == 'sqlite':
+        print("💡 Execute VACUUM no SQLite para devolver o espaço liberado ao disco")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Script para recalcular os rollups de métricas
+Descrição: Reconstrói os agregados horários e diários a partir do histórico de snapshots
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Adicionar o diretório pai ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Backfill dos rollups de métricas")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"),
+                        help="URL do banco (padrão: DATABASE_URL ou SQLite local)")
+    parser.add_argument("--publication-id", type=int, action="append", dest="publication_ids",
+                        help="Recalcular apenas esta publicação (pode repetir)")
+    parser.add_argument("--chunk-size", type=int, default=5000,
+                        help="Tamanho dos blocos de leitura e escrita (padrão: 5000)")
+
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.database_url)
+
+    print("🔄 Recalculando rollups de métricas...")
+    start = time.perf_counter()
+    written = db.rebuild_metrics_rollups(args.publication_ids, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {written} rollups gravados em {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark da agregação de métricas
+Descrição: Compara a agregação em laços de dicionários com a agregação colunar (NumPy/pandas)
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+# Adicionar o diretório pai ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select
+
+from database.models import DatabaseManager, GeneratedContent, Metrics, Publication
+from database.analytics import aggregate_metrics, load_metrics_frame
+
+PLATFORMS = ["tiktok", "instagram", "linkedin"]
+STYLES = ["vivid", "natural", None]
+PERCENTILES = (0.5, 0.9, 0.99)
+GROUP_BY = ["platform", "day", "style"]
+
+
+def populate(db: DatabaseManager, snapshots: int, publications: int, seed: int = 42):
+    """Popular banco temporário com publicações e snapshots sintéticos"""
+    rng = random.Random(seed)
+    base_time = datetime(2024, 1, 1)
+
+    with db.engine.begin() as connection:
+        connection.execute(insert(GeneratedContent), [
+            {"id": f"content_{i}", "prompt": f"Prompt {i}", "style": STYLES[i % 3], "created_at": base_time}
+            for i in range(publications)
+        ])
+        connection.execute(insert(Publication), [
+            {"id": i + 1, "content_id": f"content_{i}", "platform": PLATFORMS[i % 3], "published_at": base_time}
+            for i in range(publications)
+        ])
+
+        rows = []
+        for i in range(snapshots):
+            views = rng.randint(0, 50_000)
+            rows.append({
+                "publication_id": i % publications + 1,
+                "collected_at": base_time + timedelta(minutes=30 * (i // publications)),
+                "likes": rng.randint(0, views // 10 + 1),
+                "comments": rng.randint(0, 500),
+                "shares": rng.randint(0, 200),
+                "views": views,
+            })
+            if len(rows) == 50_000:
+                connection.execute(insert(Metrics), rows)
+                rows = []
+        if rows:
+            connection.execute(insert(Metrics), rows)
+
+
+def fetch_rows(db: DatabaseManager) -> list:
+    """Ler os snapshots como tuplas, como o código atual faz antes dos laços"""
+    session = db.get_session()
+    try:
+        return session.execute(select(
+            Metrics.publication_id, Publication.platform, GeneratedContent.style, Metrics.collected_at,
+            Metrics.likes, Metrics.comments, Metrics.shares, Metrics.views
+        ).join(Publication, Publication.id == Metrics.publication_id).outerjoin(
+            GeneratedContent, GeneratedContent.id == Publication.content_id
+        )).all()
+    finally:
+        session.close()
+
+
+def _percentile(values: list, q: float) -> float:
+    """Percentil com interpolação linear (mesmo método padrão do pandas)"""
+    if not values:
+        return float("nan")
+    position = (len(values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def aggregate_with_loops(rows: list) -> dict:
+    """Agregação atual: dicionários aninhados atualizados linha a linha"""
+    # Último snapshot de cada publicação por dia
+    latest = {}
+    for row in rows:
+        key = (row[0], row[3].date())
+        current = latest.get(key)
+        if current is None or row[3] >= current[3]:
+            latest[key] = row
+
+    groups = {}
+    for publication_id, platform, style, collected_at, likes, comments, shares, views in latest.values():
+        key = (platform, collected_at.date(), style or "")
+        group = groups.setdefault(key, {
+            "posts": 0, "likes": 0, "comments": 0, "shares": 0, "views": 0, "rates": []
+        })
+        group["posts"] += 1
+        group["likes"] += likes or 0
+        group["comments"] += comments or 0
+        group["shares"] += shares or 0
+        group["views"] += views or 0
+        if views:
+            group["rates"].append(((likes or 0) + (comments or 0) + (shares or 0)) / views)
+
+    for group in groups.values():
+        engagement = group["likes"] + group["comments"] + group["shares"]
+        group["engagement_rate"] = engagement / group["views"] if group["views"] else float("nan")
+        rates = sorted(group.pop("rates"))
+        for q in PERCENTILES:
+            group[f"engagement_rate_p{q * 100:g}"] = _percentile(rates, q)
+    return groups
+
+
+def aggregate_vectorized(frame):
+    """Agregação colunar com NumPy/pandas"""
+    return aggregate_metrics(frame, by=GROUP_BY, percentiles=PERCENTILES)
+
+
+def measure(label: str, func, repeat: int):
+    """Medir o melhor tempo de algumas execuções"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<28} {best:>8.3f}s")
+    return result, best
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark da agregação de métricas")
+    parser.add_argument("--snapshots", type=int, default=500_000, help="Quantidade de snapshots (padrão: 500000)")
+    parser.add_argument("--publications", type=int, default=5_000,
+                        help="Quantidade de publicações (padrão: 5000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por abordagem (padrão: 3)")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseManager(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+
+        print(f"🔄 Populando {args.snapshots} snapshots de {args.publications} publicações...")
+        populate(db, args.snapshots, args.publications)
+
+        print("📊 Banco → agregação por plataforma, dia e estilo:")
+        loop_result, loop_time = measure(
+            "tuplas + laços de dicionários", lambda: aggregate_with_loops(fetch_rows(db)), args.repeat
+        )
+        frame_result, frame_time = measure(
+            "colunas + NumPy/pandas", lambda: aggregate_vectorized(load_metrics_frame(db)), args.repeat
+        )
+
+        print("📊 Só a agregação (dados já em memória):")
+        rows = fetch_rows(db)
+        frame = load_metrics_frame(db)
+        _, loop_only = measure("laços de dicionários", lambda: aggregate_with_loops(rows), args.repeat)
+        _, frame_only = measure("NumPy/pandas", lambda: aggregate_vectorized(frame), args.repeat)
+
+        db.engine.dispose()
+
+    # Conferir que as duas abordagens chegam aos mesmos totais
+    assert len(loop_result) == len(frame_result)
+    assert sum(g["likes"] for g in loop_result.values()) == int(frame_result["likes"].sum())
+
+    print(f"✅ {len(frame_result)} grupos; NumPy/pandas {loop_time / frame_time:.1f}x mais rápido de ponta a ponta, "
+          f"{loop_only / frame_only:.1f}x só na agregação")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark de listagens do banco
+Descrição: Compara objetos ORM com tuplas leves (DTOs) em tempo de hidratação e memória
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+# Adicionar o diretório pai ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager, GeneratedContent, Publication
+
+
+def populate(db: DatabaseManager, rows: int):
+    """Popular banco temporário com conteúdos e publicações"""
+    base_time = datetime(2024, 1, 1)
+    platforms = ["tiktok", "instagram", "linkedin"]
+
+    with db.engine.begin() as connection:
+        connection.execute(insert(GeneratedContent), [
+            {
+                "id": f"content_{i}",
+                "prompt": f"Prompt de exemplo número {i} para o benchmark",
+                "status": "approved",
+                "created_at": base_time + timedelta(seconds=i)
+            }
+            for i in range(rows)
+        ])
+        connection.execute(insert(Publication), [
+            {
+                "content_id": f"content_{i}",
+                "platform": platforms[i % len(platforms)],
+                "platform_post_id": f"post_{i}",
+                "hashtags": "#ai #arte",
+                "published_at": base_time + timedelta(seconds=i)
+            }
+            for i in range(rows)
+        ])
+
+
+def measure(label: str, func):
+    """Medir tempo e pico de memória de uma listagem"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"  {label:<32} {len(result):>8} linhas  {elapsed:>7.3f}s  pico {peak / 1024 / 1024:>7.1f} MiB")
+    return result
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark ORM vs DTOs")
+    parser.add_argument("--rows", type=int, default=100_000, help="Quantidade de linhas (padrão: 100000)")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseManager(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+
+        print(f"🔄 Populando {args.rows} publicações...")
+        populate(db, args.rows)
+
+        print("📊 Resultados:")
+        measure("get_content (ORM)", lambda: db.get_content())
+        measure("get_content_rows (DTO)", lambda: db.get_content_rows())
+        measure("get_publications (ORM)", lambda: db.get_publications())
+        measure("get_publication_rows (DTO)", lambda: db.get_publication_rows())
+
+        db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Script para compactar o raw_data das métricas
+Descrição: Move o JSON bruto legado da tabela metrics para payloads comprimidos e deduplicados
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Adicionar o diretório pai ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Compactar raw_data legado das métricas")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"),
+                        help="URL do banco (padrão: DATABASE_URL ou SQLite local)")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Linhas migradas por transação (padrão: 1000)")
+
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.database_url)
+
+    print("🔄 Compactando raw_data das métricas...")
+    start = time.perf_counter()
+    moved = db.compact_raw_data(batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {moved} snapshots migrados em {elapsed:.2f}s")
+    if moved and db.engine.dialect.name == 'sqlite':
+        print("💡 Execute VACUUM no SQLite para devolver o espaço liberado ao disco")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Script para exportar dados
+Descrição: Exporta conteúdos, publicações e métricas em CSV ou Parquet, em streaming
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import os
+import sys
+import argparse
+
+# Adicionar o diretório pai ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager
+from database.export import EXPORT_FORMATS, EXPORT_METRICS_MODES, export_data
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Exportar conteúdos, publicações e métricas")
+    parser.add_argument("output", help="Arquivo de saída (.csv ou .parquet)")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"),
+                        help="URL do banco (padrão: DATABASE_URL ou SQLite local)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, dest="fmt",
+                        help="Formato de saída (padrão: pela extensão do arquivo)")
+    parser.add_argument("--metrics", choices=EXPORT_METRICS_MODES, default="latest",
+                        help="latest: último snapshot por publicação; all: todos os snapshots")
+    parser.add_argument("--platform", help="Exportar apenas esta plataforma")
+    parser.add_argument("--chunk-size", type=int, default=10000,
+                        help="Linhas por bloco lido do banco e por row group (padrão: 10000)")
+
+    args = parser.parse_args()
+    fmt = args.fmt or ("parquet" if args.output.endswith(".parquet") else "csv")
+
+    db = DatabaseManager(args.database_url)
+
+    print(f"📤 Exportando para {args.output} ({fmt}, métricas: {args.metrics})...")
+    result = export_data(
+        db, args.output, fmt=fmt, metrics=args.metrics, platform=args.platform, chunk_size=args.chunk_size
+    )
+
+    print(f"✅ {result['rows']} linhas em {result['elapsed']:.2f}s ({result['rows_per_second']:,.0f} linhas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Script para importar métricas históricas
+Descrição: Carrega em massa métricas exportadas pelas plataformas (CSV ou JSONL)
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import os
+import sys
+import argparse
+
+# Adicionar o diretório pai ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager
+from database.metrics_import import IMPORT_FORMATS, MetricsImporter
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Importar métricas históricas em massa")
+    parser.add_argument("path", help="Arquivo CSV ou JSONL com platform_post_id, collected_at e métricas")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"),
+                        help="URL do banco (padrão: DATABASE_URL ou SQLite local)")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, dest="fmt",
+                        help="Formato do arquivo (padrão: pela extensão)")
+    parser.add_argument("--platform", help="Plataforma das linhas que não informam a coluna platform")
+    parser.add_argument("--chunk-size", type=int, default=100000,
+                        help="Linhas por transação (padrão: 100000)")
+    parser.add_argument("--skip-rollups", action="store_true",
+                        help="Não recalcular os rollups ao final (rode backfill_metrics_rollups.py depois)")
+
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.database_url)
+    importer = MetricsImporter(db, chunk_size=args.chunk_size)
+
+    print(f"📥 Importando {args.path}...")
+    result = importer.import_file(
+        args.path, fmt=args.fmt, platform=args.platform, rebuild_rollups=not args.skip_rollups
+    )
+
+    print(f"✅ {result['imported']} snapshots de {result['publications']} publicações "
+          f"em {result['elapsed']:.2f}s ({result['rows_per_second']:,.0f} linhas/s na carga)")
+    if result['unmatched']:
+        print(f"⚠️ {result['unmatched']} linhas sem publicação correspondente, ex.: "
+              f"{', '.join(result['unmatched_sample'][:5])}")
+
+
+if __name__ == "__main__":
+    main()
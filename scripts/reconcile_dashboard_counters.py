@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Script para reconciliar os contadores do dashboard
+Descrição: Recalcula do zero os contadores materializados a partir das tabelas
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Adicionar o diretório pai ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Reconciliar contadores do dashboard")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"),
+                        help="URL do banco (padrão: DATABASE_URL ou SQLite local)")
+
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.database_url)
+    before = db.get_dashboard_stats()
+
+    print("🔄 Recalculando contadores do dashboard...")
+    start = time.perf_counter()
+    after = db.reconcile_dashboard_counters()
+    elapsed = time.perf_counter() - start
+
+    for field, value in after.items():
+        drift = value - before.get(field, 0)
+        suffix = f"  (corrigido em {drift:+d})" if drift else ""
+        print(f"  {field:<20} {value:>12}{suffix}")
+
+    print(f"✅ Contadores reconciliados em {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Script para reindexar hashtags
+Descrição: Reconstrói as tabelas normalizadas de hashtags a partir de Publication.hashtags
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Adicionar o diretório pai ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Reindexar hashtags das publicações")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"),
+                        help="URL do banco (padrão: DATABASE_URL ou SQLite local)")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="Publicações por bloco de leitura (padrão: 1000)")
+    parser.add_argument("--top", type=int, default=10,
+                        help="Exibir as N hashtags com mais likes ao final (padrão: 10)")
+
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.database_url)
+
+    print("🔄 Reindexando hashtags...")
+    start = time.perf_counter()
+    indexed = db.rebuild_hashtag_index(chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {indexed} publicações indexadas em {elapsed:.2f}s")
+
+    for row in db.get_hashtag_performance(limit=args.top):
+        print(f"  #{row.tag:<30} {row.publications:>6} publicações  {row.likes:>10} likes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script para iniciar o simulador local das APIs
+Descrição: Sobe um servidor que imita Graph API, TikTok, LinkedIn e OpenAI com latência e falhas configuráveis
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import os
+import sys
+import argparse
+
+# Adicionar o diretório pai ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pocs.simulator.platform_api_simulator import PlatformAPISimulator
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Simulador local das APIs das plataformas")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço do servidor (padrão: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8900, help="Porta do servidor (padrão: 8900)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência fixa em segundos (padrão: 0.05)")
+    parser.add_argument("--jitter", type=float, default=0.05,
+                        help="Latência extra aleatória de até N segundos (padrão: 0.05)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 503 (padrão: 0)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fração de respostas 429 (padrão: 0)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After das respostas 429 (padrão: 1)")
+    parser.add_argument("--seed", type=int, help="Semente das falhas sorteadas (reprodutível)")
+
+    args = parser.parse_args()
+
+    simulator = PlatformAPISimulator(
+        args.host, args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after, seed=args.seed
+    )
+
+    print(f"🧪 Simulador de APIs em {simulator.url}")
+    print("🔧 Exporte estas variáveis antes de rodar as POCs:")
+    for name, value in simulator.env().items():
+        print(f"   export {name}={value}")
+    print("Pressione Ctrl+C para parar o servidor")
+
+    try:
+        simulator.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Simulador encerrado pelo usuário")
+    finally:
+        simulator.server.server_close()
+
+    stats = simulator.stats()
+    if stats:
+        print("📊 Requisições atendidas:")
+        for endpoint, count in sorted(stats.items()):
+            print(f"   {endpoint:<36} {count}")
+
+
+if __name__ == "__main__":
+    main()
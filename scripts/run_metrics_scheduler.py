@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Script para executar o agendador de métricas
+Descrição: Daemon que coleta métricas continuamente com intervalo adaptativo por post
+Autor: Gerador de Conteúdo
+Data: 2024
+"""
+
+import os
+import sys
+import signal
+import argparse
+import threading
+
+# Adicionar o diretório pai ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager
+from pocs.metrics.social_metrics_poc import SocialMetricsPOC
+from pocs.metrics.metrics_scheduler import DEFAULT_MAX_INTERVAL, DEFAULT_MIN_INTERVAL, MetricsScheduler
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Agendador adaptativo de coleta de métricas")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"),
+                        help="URL do banco (padrão: DATABASE_URL ou SQLite local)")
+    parser.add_argument("--min-interval", type=float, default=DEFAULT_MIN_INTERVAL,
+                        help="Intervalo mínimo entre coletas de um post, em segundos (padrão: 300)")
+    parser.add_argument("--max-interval", type=float, default=DEFAULT_MAX_INTERVAL,
+                        help="Intervalo máximo entre coletas de um post, em segundos (padrão: 86400)")
+    parser.add_argument("--once", action="store_true",
+                        help="Executar uma única rodada com os posts vencidos e sair")
+
+    args = parser.parse_args()
+
+    collector = SocialMetricsPOC()
+    if not collector.setup():
+        print("❌ Nenhum token de rede social configurado")
+        sys.exit(1)
+
+    db = DatabaseManager(args.database_url)
+    scheduler = MetricsScheduler(db, collector, min_interval=args.min_interval, max_interval=args.max_interval)
+
+    try:
+        if args.once:
+            result = scheduler.run_once()
+            print(f"✅ {result['polled']} posts coletados, {result['written']} com mudança, "
+                  f"{result['failed']} falhas, {result['deferred']} adiados por cota")
+            return
+
+        stop_event = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop_event.set())
+
+        print(f"🔄 Agendador iniciado com {scheduler.load_publications()} publicações (Ctrl+C para parar)")
+        scheduler.run(stop_event)
+    finally:
+        collector.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Testes para o gerenciador assíncrono de banco de dados
+"""
+
+import pytest
+import sys
+import os
+import asyncio
+from datetime import datetime, timedelta
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("aiosqlite")
+
+from database.async_manager import AsyncDatabaseManager
+
+
+class TestAsyncDatabaseManager:
+    """Testes para o AsyncDatabaseManager"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, tmp_path):
+        """Criar banco isolado para cada teste"""
+        self.url = f"sqlite:///{tmp_path / 'test.db'}"
+        self.base_time = datetime(2024, 1, 1, 12, 0, 0)
+
+    def test_crud_and_metrics(self):
+        """Testar escrita e leitura pelo gerenciador assíncrono"""
+        async def scenario():
+            db = AsyncDatabaseManager(self.url)
+            try:
+                await db.create_content({"id": "c1", "prompt": "robô pintor", "created_at": self.base_time})
+                publication = await db.create_publication({
+                    "content_id": "c1", "platform": "tiktok", "hashtags": "#ai #arte"
+                })
+
+                # Escritas concorrentes no mesmo event loop
+                await asyncio.gather(*(
+                    db.ingest_metrics({
+                        "publication_id": publication.id,
+                        "likes": likes,
+                        "collected_at": self.base_time + timedelta(minutes=i)
+                    })
+                    for i, likes in enumerate([1, 1])
+                ))
+                await db.ingest_metrics({
+                    "publication_id": publication.id, "likes": 5,
+                    "collected_at": self.base_time + timedelta(minutes=5)
+                })
+
+                latest = await db.get_latest_metrics_bulk()
+                page = await db.get_content_page(limit=10)
+                streamed = [c.id async for c in db.iter_content(chunk_size=1)]
+                approved = await db.update_content_status_bulk(["c1"], "approved")
+                found = await db.search_content("robo")
+                stats = await db.get_dashboard_stats()
+                hashtags = await db.get_hashtag_performance()
+                return latest, page, streamed, approved, found, stats, hashtags
+            finally:
+                await db.dispose()
+
+        latest, page, streamed, approved, found, stats, hashtags = asyncio.run(scenario())
+
+        assert latest[1].likes == 5
+        assert [c.id for c in page["items"]] == ["c1"]
+        assert streamed == ["c1"]
+        assert approved == ["c1"]
+        assert [c.id for c in found["items"]] == ["c1"]
+        assert stats["approved_content"] == 1
+        assert stats["total_likes"] >= 6
+        assert [(h.tag, h.likes) for h in hashtags] == [("ai", 5), ("arte", 5)]
+
+    def test_api_config(self):
+        """Testar configuração de API pelo gerenciador assíncrono"""
+        async def scenario():
+            db = AsyncDatabaseManager(self.url)
+            try:
+                await db.save_api_config("instagram", access_token="abc")
+                return (await db.get_api_config("instagram")).access_token
+            finally:
+                await db.dispose()
+
+        assert asyncio.run(scenario()) == "abc"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
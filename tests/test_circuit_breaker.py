@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Testes para o circuit breaker das APIs de plataformas
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import MagicMock
+
+import requests
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pocs.instagram_poc import InstagramUploadPOC
+from pocs.resilience.circuit_breaker import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, resilient_request
+)
+
+
+class FakeClock:
+    """Relógio controlado pelo teste"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Testes para o CircuitBreaker"""
+
+    def setup_method(self):
+        """Configurar antes de cada teste"""
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            "instagram/media", error_rate_threshold=0.5, latency_threshold=2.0, min_calls=4,
+            open_seconds=30, half_open_max_calls=1, clock=self.clock
+        )
+
+    def test_opens_on_error_rate_and_probes(self):
+        """Testar abertura por taxa de erro, sondagem meio-aberta e fechamento"""
+        for success in (True, False, True, False):
+            generation = self.breaker.allow()
+            assert generation
+            self.breaker.record(generation, success, 0.1)
+
+        assert self.breaker.state == OPEN
+        assert not self.breaker.allow()
+        assert self.breaker.retry_after() == pytest.approx(30)
+
+        self.clock.now = 31
+        assert self.breaker.state == HALF_OPEN
+        probe = self.breaker.allow()
+        assert probe
+        assert self.breaker.allow() is None  # só uma sonda por vez
+        self.breaker.record(probe, False, 0.1)
+        assert self.breaker.state == OPEN
+
+        self.clock.now = 62
+        probe = self.breaker.allow()
+        self.breaker.record(probe, True, 0.1)
+        assert self.breaker.state == CLOSED
+
+    def test_call_from_closed_state_is_not_a_probe(self):
+        """Testar que uma chamada liberada com o circuito fechado não fecha o meio-aberto"""
+        slow_call = self.breaker.allow()
+        for _ in range(4):
+            self.breaker.record(self.breaker.allow(), False, 0.1)
+        assert self.breaker.state == OPEN
+
+        # A chamada lenta termina com sucesso depois que o circuito ficou meio-aberto
+        self.clock.now = 31
+        assert self.breaker.state == HALF_OPEN
+        self.breaker.record(slow_call, True, 0.1)
+        assert self.breaker.state == HALF_OPEN
+
+        probe = self.breaker.allow()
+        assert probe
+        self.breaker.record(probe, True, 0.1)
+        assert self.breaker.state == CLOSED
+
+    def test_opens_on_latency(self):
+        """Testar abertura por chamadas lentas mesmo sem erros"""
+        for _ in range(4):
+            self.breaker.record(self.breaker.allow(), True, 3.0)
+        assert self.breaker.state == OPEN
+
+    def test_old_calls_leave_the_window(self):
+        """Testar que falhas antigas saem da janela deslizante"""
+        for _ in range(3):
+            self.breaker.record(self.breaker.allow(), False, 0.1)
+        self.clock.now = 120
+        self.breaker.record(self.breaker.allow(), True, 0.1)
+        assert self.breaker.state == CLOSED
+
+
+class TestResilientRequest:
+    """Testes para resilient_request"""
+
+    def test_timeouts_open_circuit_without_touching_network(self):
+        """Testar que timeouts abrem o circuito e as chamadas seguintes falham rápido"""
+        registry = CircuitBreakerRegistry(min_calls=2)
+        session = MagicMock()
+        session.get.side_effect = requests.Timeout("lento")
+
+        for _ in range(2):
+            with pytest.raises(requests.Timeout):
+                resilient_request("get", "https://x", "tiktok", "video_query", session=session, registry=registry)
+
+        with pytest.raises(CircuitOpenError):
+            resilient_request("get", "https://x", "tiktok", "video_query", session=session, registry=registry)
+
+        assert session.get.call_count == 2
+        assert session.get.call_args.kwargs["timeout"] == (3.05, 10)
+        assert registry.states() == {"tiktok/video_query": OPEN}
+
+    def test_client_errors_do_not_open_circuit(self):
+        """Testar que 4xx não contam como falha da plataforma"""
+        registry = CircuitBreakerRegistry(min_calls=2, platform_options={"linkedin": {"open_seconds": 5}})
+        session = MagicMock()
+        session.post.return_value = MagicMock(status_code=429)
+
+        for _ in range(5):
+            resilient_request("post", "https://x", "linkedin", "social_actions", session=session, registry=registry)
+
+        breaker = registry.get("linkedin", "social_actions")
+        assert breaker.state == CLOSED
+        assert breaker.open_seconds == 5
+
+    def test_open_circuit_aborts_instagram_polling(self, monkeypatch):
+        """Testar que o circuito aberto interrompe a espera do container sem dormir"""
+        sleeps = []
+        monkeypatch.setattr("pocs.instagram_poc.time.sleep", sleeps.append)
+
+        poc = InstagramUploadPOC()
+        poc.breakers = CircuitBreakerRegistry(min_calls=1)
+        poc.create_media_container = lambda: "container_1"
+        breaker = poc.breakers.get("instagram", "container_status")
+        breaker.record(breaker.allow(), False, 0.1)
+
+        result = poc.upload_video()
+
+        assert result["status"] == "error"
+        assert "Circuito aberto" in result["message"]
+        assert sleeps == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
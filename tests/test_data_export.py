@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Testes para a exportação em streaming
+"""
+
+import csv
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager
+from database.export import export_data
+
+
+class TestDataExport:
+    """Testes para export_data"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, tmp_path):
+        """Criar banco isolado com publicações e métricas"""
+        self.tmp_path = tmp_path
+        self.db = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+        base_time = datetime(2024, 1, 1, 12, 0, 0)
+
+        self.db.create_content({"id": "c1", "prompt": "robô, pintor", "created_at": base_time})
+        for platform in ("tiktok", "instagram", "linkedin"):
+            self.db.create_publication({"content_id": "c1", "platform": platform, "published_at": base_time})
+
+        # Publicação 3 (linkedin) fica sem métricas
+        for publication_id in (1, 2):
+            for i in range(3):
+                self.db.create_metrics({
+                    "publication_id": publication_id,
+                    "likes": publication_id * 10 + i,
+                    "collected_at": base_time + timedelta(hours=i)
+                })
+
+    def test_export_csv_latest(self):
+        """Testar exportação CSV com o último snapshot por publicação"""
+        output = str(self.tmp_path / "export.csv")
+        result = export_data(self.db, output, chunk_size=2)
+
+        with open(output, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+
+        assert result["rows"] == 3
+        assert result["rows_per_second"] > 0
+        assert [(r["platform"], r["likes"]) for r in rows] == [("tiktok", "12"), ("instagram", "22"), ("linkedin", "")]
+        assert rows[0]["prompt"] == "robô, pintor"
+
+    def test_export_parquet_all_snapshots(self):
+        """Testar exportação Parquet com todos os snapshots em row groups"""
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        output = str(self.tmp_path / "export.parquet")
+        result = export_data(self.db, output, fmt="parquet", metrics="all", chunk_size=4)
+
+        parquet_file = pq.ParquetFile(output)
+        table = parquet_file.read()
+
+        assert result["rows"] == 7
+        assert parquet_file.num_row_groups == 2
+        assert table.column("likes").to_pylist() == [10, 11, 12, 20, 21, 22, None]
+
+        instagram = export_data(self.db, output, fmt="parquet", metrics="all", platform="instagram")
+        assert instagram["rows"] == 3
+
+    def test_invalid_format(self):
+        """Testar formato inválido"""
+        with pytest.raises(ValueError):
+            export_data(self.db, str(self.tmp_path / "export.xlsx"), fmt="xlsx")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
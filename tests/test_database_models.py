@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Testes para o gerenciador de banco de dados
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from database.models import DashboardCounters, DatabaseManager, GeneratedContent, Metrics, RawPayload, parse_hashtags
+
+
+class TestDatabaseManager:
+    """Testes para o DatabaseManager"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, tmp_path):
+        """Criar banco isolado para cada teste"""
+        self.db = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+        self.base_time = datetime(2024, 1, 1, 12, 0, 0)
+
+    def _create_contents(self, count: int, status: str = 'pending_approval'):
+        """Criar conteúdos com datas crescentes"""
+        for i in range(count):
+            self.db.create_content({
+                "id": f"content_{i:03d}",
+                "prompt": f"prompt {i}",
+                "status": status,
+                "created_at": self.base_time + timedelta(minutes=i)
+            })
+
+    def test_get_content_page_keyset(self):
+        """Testar paginação keyset de conteúdo"""
+        self._create_contents(45)
+
+        seen = []
+        cursor = None
+        while True:
+            page = self.db.get_content_page(status='pending_approval', limit=20, cursor=cursor)
+            seen.extend(c.id for c in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == [f"content_{i:03d}" for i in range(45)]
+
+    def test_get_publications_page_descending(self):
+        """Testar paginação de publicações da mais recente para a mais antiga"""
+        self._create_contents(1)
+        for i in range(5):
+            self.db.create_publication({
+                "content_id": "content_000",
+                "platform": "tiktok",
+                "published_at": self.base_time + timedelta(hours=i)
+            })
+
+        first = self.db.get_publications_page(limit=3)
+        second = self.db.get_publications_page(limit=3, cursor=first["next_cursor"])
+
+        assert [p.id for p in first["items"]] == [5, 4, 3]
+        assert [p.id for p in second["items"]] == [2, 1]
+        assert second["next_cursor"] is None
+
+    def test_publications_page_with_null_timestamp(self):
+        """Testar paginação keyset passando por publicações sem published_at"""
+        self._create_contents(1)
+        for published_at in (self.base_time, None, self.base_time + timedelta(hours=1), None, self.base_time):
+            publication = self.db.create_publication({
+                "content_id": "content_000", "platform": "tiktok", "published_at": published_at
+            })
+            if published_at is None:
+                # O default do ORM preencheria a data; gravar o nulo direto na tabela
+                session = self.db.get_session()
+                try:
+                    session.execute(text("UPDATE publications SET published_at = NULL WHERE id = :id"),
+                                    {"id": publication.id})
+                    session.commit()
+                finally:
+                    session.close()
+
+        for descending, expected in ((True, [3, 5, 1, 4, 2]), (False, [2, 4, 1, 5, 3])):
+            seen = []
+            cursor = None
+            while True:
+                page = self.db.get_publications_page(limit=2, cursor=cursor, descending=descending)
+                seen.extend(p.id for p in page["items"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            assert seen == expected
+
+    def test_iter_content_streams_all_rows(self):
+        """Testar iteração em blocos sobre o conteúdo"""
+        self._create_contents(25)
+
+        ids = [c.id for c in self.db.iter_content(chunk_size=7)]
+
+        assert len(ids) == 25
+
+    def test_get_latest_metrics_bulk(self):
+        """Testar busca do snapshot mais recente de várias publicações"""
+        self._create_contents(1)
+        for platform in ("tiktok", "instagram", "linkedin"):
+            self.db.create_publication({"content_id": "content_000", "platform": platform})
+
+        for publication_id in (1, 2, 3):
+            for i in range(3):
+                self.db.create_metrics({
+                    "publication_id": publication_id,
+                    "likes": publication_id * 10 + i,
+                    "collected_at": self.base_time + timedelta(hours=i)
+                })
+
+        latest = self.db.get_latest_metrics_bulk()
+        assert {pid: m.likes for pid, m in latest.items()} == {1: 12, 2: 22, 3: 32}
+
+        filtered = self.db.get_latest_metrics_bulk([2, 3], platform="linkedin")
+        assert list(filtered) == [3]
+        assert self.db.get_latest_metrics_bulk([]) == {}
+
+    def test_metrics_rollups_incremental_matches_backfill(self):
+        """Testar que os rollups incrementais batem com o backfill"""
+        self._create_contents(1)
+        self.db.create_publication({"content_id": "content_000", "platform": "tiktok"})
+
+        for i, likes in enumerate([10, 15, 15, 40, 42]):
+            self.db.create_metrics({
+                "publication_id": 1,
+                "likes": likes,
+                "views": likes * 10,
+                "collected_at": self.base_time + timedelta(minutes=30 * i)
+            })
+
+        def snapshot():
+            return [
+                (r.granularity, r.bucket_start, r.likes_max, r.likes_delta, r.views_delta, r.snapshot_count)
+                for granularity in ("hour", "day")
+                for r in self.db.get_metrics_rollups(granularity)
+            ]
+
+        incremental = snapshot()
+        assert incremental[:3] == [
+            ("hour", self.base_time, 15, 15, 150, 2),
+            ("hour", self.base_time + timedelta(hours=1), 40, 25, 250, 2),
+            ("hour", self.base_time + timedelta(hours=2), 42, 2, 20, 1),
+        ]
+        assert incremental[3][2:] == (42, 42, 420, 5)
+
+        assert self.db.rebuild_metrics_rollups() == 4
+        assert snapshot() == incremental
+
+    def test_raw_data_compressed_and_deduplicated(self):
+        """Testar armazenamento comprimido e deduplicado do raw_data"""
+        self._create_contents(1)
+        self.db.create_publication({"content_id": "content_000", "platform": "instagram"})
+
+        payload = {"id": "123", "like_count": 7, "caption": "legenda " * 50}
+        first = self.db.create_metrics({"publication_id": 1, "likes": 7, "raw_data": payload})
+        second = self.db.create_metrics({"publication_id": 1, "likes": 7, "raw_data": dict(payload)})
+
+        assert first.raw_payload_hash == second.raw_payload_hash
+        assert self.db.get_metrics_raw_data(second.id) == payload
+
+        session = self.db.get_session()
+        try:
+            stored = session.query(RawPayload).all()
+            assert len(stored) == 1
+            assert len(stored[0].data) < stored[0].size
+        finally:
+            session.close()
+
+    def test_compact_legacy_raw_data(self):
+        """Testar migração do raw_data legado para payloads comprimidos"""
+        self._create_contents(1)
+        self.db.create_publication({"content_id": "content_000", "platform": "tiktok"})
+
+        session = self.db.get_session()
+        session.add(Metrics(publication_id=1, likes=1, raw_data={"like_count": 1}))
+        session.commit()
+        session.close()
+
+        assert self.db.compact_raw_data(batch_size=10) == 1
+        assert self.db.compact_raw_data(batch_size=10) == 0
+        assert self.db.get_metrics_raw_data(1) == {"like_count": 1}
+
+    def test_ingest_metrics_writes_only_changes(self):
+        """Testar ingestão que grava snapshot apenas quando os valores mudam"""
+        self._create_contents(1)
+        self.db.create_publication({"content_id": "content_000", "platform": "tiktok"})
+
+        polls = [5, 5, 5, 8, 8]
+        results = [
+            self.db.ingest_metrics({
+                "publication_id": 1,
+                "likes": likes,
+                "collected_at": self.base_time + timedelta(minutes=i)
+            })
+            for i, likes in enumerate(polls)
+        ]
+
+        assert [len(r["written"]) for r in results] == [1, 0, 0, 1, 0]
+        assert results[2]["unchanged"] == 1
+
+        session = self.db.get_session()
+        try:
+            rows = session.query(Metrics).order_by(Metrics.id).all()
+            assert [(m.likes, m.collected_at, m.last_checked_at) for m in rows] == [
+                (5, self.base_time, self.base_time + timedelta(minutes=2)),
+                (8, self.base_time + timedelta(minutes=3), self.base_time + timedelta(minutes=4)),
+            ]
+        finally:
+            session.close()
+
+        # Um novo gerenciador (cache frio) compara com o último snapshot do banco
+        fresh = DatabaseManager(str(self.db.engine.url))
+        assert fresh.ingest_metrics({"publication_id": 1, "likes": 8})["unchanged"] == 1
+
+    def test_ingest_metrics_with_stale_cache(self):
+        """Testar que um cache desatualizado por outro processo não descarta mudanças"""
+        self._create_contents(1)
+        self.db.create_publication({"content_id": "content_000", "platform": "tiktok"})
+        self.db.ingest_metrics({"publication_id": 1, "likes": 5, "collected_at": self.base_time})
+
+        # Outro processo grava um snapshot novo; o cache deste continua em likes=5
+        other = DatabaseManager(str(self.db.engine.url))
+        other.ingest_metrics({"publication_id": 1, "likes": 8, "collected_at": self.base_time + timedelta(minutes=1)})
+
+        result = self.db.ingest_metrics({
+            "publication_id": 1, "likes": 5, "collected_at": self.base_time + timedelta(minutes=2)
+        })
+        assert len(result["written"]) == 1
+        assert result["unchanged"] == 0
+
+        session = self.db.get_session()
+        try:
+            rows = session.query(Metrics).order_by(Metrics.id).all()
+            assert [(m.likes, m.last_checked_at) for m in rows] == [
+                (5, self.base_time),
+                (8, self.base_time + timedelta(minutes=1)),
+                (5, self.base_time + timedelta(minutes=2)),
+            ]
+        finally:
+            session.close()
+
+        # O cache volta a apontar para o snapshot mais recente
+        result = self.db.ingest_metrics({
+            "publication_id": 1, "likes": 5, "collected_at": self.base_time + timedelta(minutes=3)
+        })
+        assert result["unchanged"] == 1
+        assert self.db.get_latest_metrics(1).last_checked_at == self.base_time + timedelta(minutes=3)
+
+    def test_api_config_cache(self):
+        """Testar cache das configurações de API e invalidação entre processos"""
+        self.db.save_api_config("tiktok", access_token="token_1")
+        assert self.db.get_api_config("tiktok").access_token == "token_1"
+
+        # Outro processo (outro gerenciador) rotaciona o token
+        worker = DatabaseManager(str(self.db.engine.url), api_config_version_interval=None)
+        assert worker.get_api_config("tiktok").access_token == "token_1"
+        self.db.save_api_config("tiktok", access_token="token_2")
+
+        # Sem checagem de versão, o worker mantém o valor até o TTL expirar
+        assert worker.get_api_config("tiktok").access_token == "token_1"
+        assert self.db.get_api_config("tiktok").access_token == "token_2"
+
+        worker.api_config_version_interval = 0
+        assert worker.get_api_config("tiktok").access_token == "token_2"
+
+    def test_row_dtos(self):
+        """Testar listagens leves com métricas mais recentes e carregamento antecipado"""
+        self._create_contents(2)
+        self.db.create_publication({"content_id": "content_000", "platform": "tiktok"})
+        self.db.create_publication({"content_id": "content_001", "platform": "instagram"})
+        self.db.create_metrics({"publication_id": 1, "likes": 3, "collected_at": self.base_time})
+        self.db.create_metrics({
+            "publication_id": 1, "likes": 9, "collected_at": self.base_time + timedelta(hours=1)
+        })
+
+        content_rows = self.db.get_content_rows(status='pending_approval', limit=1)
+        assert [row.id for row in content_rows] == ["content_000"]
+        assert not hasattr(content_rows[0], '__dict__')
+
+        rows = self.db.get_publication_rows(with_latest_metrics=True)
+        assert [(row.platform, row.likes) for row in rows] == [("tiktok", 9), ("instagram", None)]
+
+        publications = self.db.get_publications(platform="tiktok", load_content=True)
+        assert publications[0].content.prompt == "prompt 0"
+
+    def test_search_content_fts(self):
+        """Testar busca full-text de prompts mantida por triggers"""
+        prompts = [
+            ("robo", "Robô pintando arte digital", "A robot painting digital art"),
+            ("gato", "Gato astronauta", "A cat astronaut floating in space"),
+            ("cidade", "Cidade futurista", "Futuristic city with flying robots"),
+        ]
+        for content_id, prompt, revised in prompts:
+            self.db.create_content({"id": content_id, "prompt": prompt, "revised_prompt": revised})
+
+        assert self.db.fts_enabled
+        assert {c.id for c in self.db.search_content("robot")["items"]} == {"robo"}
+        assert [c.id for c in self.db.search_content("robo")["items"]] == ["robo"]
+        assert self.db.search_content('"unbalanced')["items"] == []
+
+        self.db.update_content_status("gato", "approved", revised_prompt="A cat robot in space")
+        first = self.db.search_content("robot", limit=1)
+        second = self.db.search_content("robot", limit=1, cursor=first["next_cursor"])
+        assert first["next_cursor"] is not None
+        assert {first["items"][0].id, second["items"][0].id} <= {"robo", "gato", "cidade"}
+
+        # Triggers apagam pela tabela de ids: nenhuma linha FTS órfã ou duplicada
+        session = self.db.get_session()
+        try:
+            session.query(GeneratedContent).filter(GeneratedContent.id == "cidade").delete()
+            session.commit()
+            fts_ids = session.execute(text("SELECT content_id FROM generated_content_fts")).scalars().all()
+            mapped = session.execute(text("SELECT content_id FROM generated_content_fts_ids")).scalars().all()
+        finally:
+            session.close()
+        assert sorted(fts_ids) == sorted(mapped) == ["gato", "robo"]
+        assert {c.id for c in self.db.search_content("futuristic")["items"]} == set()
+
+    def test_update_content_status_bulk(self):
+        """Testar transições de status em lote validadas no SQL"""
+        self._create_contents(4)
+        self.db.update_content_status("content_003", "published")
+
+        approved_at = self.base_time + timedelta(days=1)
+        updated = self.db.update_content_status_bulk(
+            ["content_000", "content_001", "content_003", "inexistente"],
+            "approved", approved_at=approved_at, chunk_size=2
+        )
+
+        assert sorted(updated) == ["content_000", "content_001"]
+        statuses = {c.id: (c.status, c.approved_at) for c in self.db.get_content()}
+        assert statuses["content_000"] == ("approved", approved_at)
+        assert statuses["content_002"] == ("pending_approval", None)
+        assert statuses["content_003"] == ("published", None)
+
+        rejected = self.db.update_content_status_bulk(["content_000", "content_002"], "rejected")
+        assert sorted(rejected) == ["content_000", "content_002"]
+        with pytest.raises(ValueError):
+            self.db.update_content_status_bulk(["content_000"], "desconhecido")
+
+    def test_parse_hashtags(self):
+        """Testar normalização de hashtags"""
+        assert parse_hashtags("#AI #arte #ai texto #Robô") == ["ai", "arte", "robô"]
+        assert parse_hashtags("ai, arte digital") == ["ai", "arte", "digital"]
+        assert parse_hashtags(None) == []
+
+    def test_hashtag_index_and_performance(self):
+        """Testar índice normalizado de hashtags e ranking por métricas"""
+        self._create_contents(1)
+        posts = [("tiktok", "#ai #arte"), ("instagram", "#AI"), ("linkedin", "#negocios")]
+        for platform, hashtags in posts:
+            self.db.create_publication({
+                "content_id": "content_000", "platform": platform, "hashtags": hashtags
+            })
+        for publication_id, likes in ((1, 10), (1, 30), (2, 5), (3, 100)):
+            self.db.create_metrics({"publication_id": publication_id, "likes": likes})
+
+        assert [p.platform for p in self.db.get_publications_by_hashtag("#ai")] == ["instagram", "tiktok"]
+        assert [p.id for p in self.db.get_publications_by_hashtag("AI", platform="tiktok")] == [1]
+
+        ranking = self.db.get_hashtag_performance()
+        assert [(r.tag, r.publications, r.likes) for r in ranking] == [
+            ("negocios", 1, 100), ("ai", 2, 35), ("arte", 1, 30)
+        ]
+        assert ranking[1].avg_likes == 17.5
+        assert [r.tag for r in self.db.get_hashtag_performance(platform="instagram")] == ["ai"]
+
+        assert self.db.rebuild_hashtag_index(chunk_size=2) == 3
+        assert [r.tag for r in self.db.get_hashtag_performance(order_by="publications")][0] == "ai"
+
+    def test_dashboard_counters(self):
+        """Testar contadores materializados do dashboard"""
+        self._create_contents(4)
+        self.db.update_content_status("content_000", "approved")
+        self.db.update_content_status_bulk(["content_000", "content_001", "content_002"], "rejected")
+        publication = self.db.create_publication({"content_id": "content_000", "platform": "tiktok"})
+        self.db.create_metrics({"publication_id": publication.id, "likes": 10, "views": 100})
+        self.db.ingest_metrics_batch([
+            {"publication_id": publication.id, "likes": 12, "views": 150},
+            {"publication_id": publication.id, "likes": 12, "views": 150},
+        ])
+
+        stats = self.db.get_dashboard_stats()
+        assert stats["total_content"] == 4
+        assert stats["pending_content"] == 1
+        assert stats["rejected_content"] == 3
+        assert stats["approved_content"] == 0
+        assert stats["total_publications"] == 1
+        assert (stats["total_likes"], stats["total_views"]) == (22, 250)
+
+        with self.db.get_session() as session:
+            assert stats == self.db._count_dashboard_stats(session)
+            session.query(DashboardCounters).update({"total_likes": 0, "pending_content": 9})
+            session.commit()
+
+        assert self.db.reconcile_dashboard_counters() == stats
+        assert self.db.get_dashboard_stats() == stats
+
+    def test_invalid_cursor(self):
+        """Testar cursor inválido"""
+        with pytest.raises(ValueError):
+            self.db.get_content_page(cursor="invalido")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Testes para as agregações colunares de métricas
+"""
+
+import math
+import numpy as np
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager
+from database.analytics import aggregate_metrics, engagement_rates, load_metrics_frame, metrics_frame
+
+
+class TestMetricsAnalytics:
+    """Testes para metrics_frame, load_metrics_frame e aggregate_metrics"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, tmp_path):
+        """Criar banco isolado com dois estilos, duas plataformas e snapshots em dois dias"""
+        self.db = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+        self.base_time = datetime(2024, 1, 1, 10, 0, 0)
+
+        self.db.create_content({"id": "c1", "prompt": "robô", "style": "vivid"})
+        self.db.create_content({"id": "c2", "prompt": "paisagem", "style": "natural"})
+        self.db.create_publication({"content_id": "c1", "platform": "tiktok"})
+        self.db.create_publication({"content_id": "c2", "platform": "tiktok"})
+        self.db.create_publication({"content_id": "c2", "platform": "instagram"})
+
+        snapshots = [
+            (1, 0, 10, 100), (1, 1, 20, 200), (1, 25, 40, 400),
+            (2, 0, 5, 0), (2, 26, 9, 100),
+            (3, 2, 30, 1000),
+        ]
+        for publication_id, hours, likes, views in snapshots:
+            self.db.create_metrics({
+                "publication_id": publication_id, "likes": likes, "comments": 0, "views": views,
+                "collected_at": self.base_time + timedelta(hours=hours)
+            })
+
+    def test_metrics_frame_from_columns(self):
+        """Testar conversão de colunas cruas com nulos e texto ISO"""
+        frame = metrics_frame({
+            "publication_id": [1, 2],
+            "platform": ("tiktok", "instagram"),
+            "collected_at": np.array(["2024-01-01 10:00:00.000000", "2024-01-02 00:30:00"], dtype=object),
+            "likes": [1, None], "comments": [0, 0], "shares": [None, 2], "views": [10, 0],
+        })
+
+        assert frame["likes"].tolist() == [1, 0]
+        assert frame["shares"].dtype == np.int64
+        assert frame["style"].tolist() == ["", ""]
+        assert frame["day"].dt.day.tolist() == [1, 2]
+        assert engagement_rates(frame)[0] == pytest.approx(0.1)
+        assert math.isnan(engagement_rates(frame)[1])
+
+        with pytest.raises(ValueError):
+            metrics_frame({"publication_id": [1]})
+
+    def test_aggregate_by_platform_uses_latest_snapshots(self):
+        """Testar somas por plataforma sem contar snapshots antigos do mesmo post"""
+        summary = aggregate_metrics(load_metrics_frame(self.db)).set_index("platform")
+
+        assert summary.loc["tiktok", "posts"] == 2
+        assert summary.loc["tiktok", "likes"] == 40 + 9
+        assert summary.loc["tiktok", "views"] == 400 + 100
+        assert summary.loc["tiktok", "engagement_rate"] == pytest.approx(49 / 500)
+        assert summary.loc["tiktok", "engagement_rate_p50"] == pytest.approx((0.1 + 0.09) / 2)
+        assert summary.loc["instagram", "likes"] == 30
+
+    def test_aggregate_by_day_and_style(self):
+        """Testar agrupamento por dia e estilo com o último snapshot de cada dia"""
+        summary = aggregate_metrics(load_metrics_frame(self.db), by=["day", "style"], percentiles=(0.5,))
+        rows = {(row["day"].day, row["style"]): row for row in summary.to_dict("records")}
+
+        assert rows[(1, "vivid")]["likes"] == 20
+        assert rows[(1, "natural")]["likes"] == 5 + 30
+        # Post 2 não tinha views no dia 1: fica fora dos percentis, mas entra nas somas
+        assert rows[(1, "natural")]["engagement_rate_p50"] == pytest.approx(0.03)
+        assert rows[(2, "vivid")]["likes"] == 40
+        assert "engagement_rate_p90" not in summary
+
+    def test_load_metrics_frame_filters(self):
+        """Testar filtros de plataforma, período e último snapshot"""
+        assert len(load_metrics_frame(self.db)) == 6
+        assert len(load_metrics_frame(self.db, latest_only=True)) == 3
+        assert set(load_metrics_frame(self.db, platform="instagram")["publication_id"]) == {3}
+        assert len(load_metrics_frame(self.db, start=self.base_time + timedelta(hours=24))) == 2
+
+        empty = aggregate_metrics(load_metrics_frame(self.db, platform="linkedin"), by=[])
+        assert empty.empty
+
+        with pytest.raises(ValueError):
+            aggregate_metrics(load_metrics_frame(self.db), by=["hashtag"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Testes para o arquivamento de métricas em Parquet
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("pyarrow")
+
+from database.models import DatabaseManager, Metrics
+from database.archive import MetricsArchiver
+from database.metrics_import import MetricsImporter
+
+
+class TestMetricsArchiver:
+    """Testes para o MetricsArchiver"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, tmp_path):
+        """Criar banco e diretório de arquivo isolados"""
+        self.db = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+        self.archiver = MetricsArchiver(self.db, str(tmp_path / "archive"))
+        self.now = datetime(2024, 6, 1)
+
+        self.db.create_content({"id": "c1", "prompt": "prompt"})
+        for platform in ("tiktok", "instagram"):
+            self.db.create_publication({"content_id": "c1", "platform": platform, "platform_post_id": f"{platform}_1"})
+
+        # Um snapshot por semana desde janeiro para cada publicação
+        for publication_id in (1, 2):
+            for week in range(20):
+                self.db.create_metrics({
+                    "publication_id": publication_id,
+                    "likes": week,
+                    "collected_at": datetime(2024, 1, 1) + timedelta(weeks=week)
+                })
+
+    def test_archive_moves_old_rows(self):
+        """Testar que snapshots antigos saem do banco e o último snapshot permanece"""
+        before = self.archiver.query_metrics()
+
+        result = self.archiver.archive(older_than_days=30, batch_size=7, now=self.now)
+
+        assert result["archived"] > 0
+        assert all(path.endswith(".parquet") for path in result["files"])
+        assert "platform=tiktok" in result["files"][0]
+
+        session = self.db.get_session()
+        try:
+            live = session.query(Metrics).count()
+            # Contadores do dashboard acompanham as linhas removidas
+            assert self.db.get_dashboard_stats() == self.db._count_dashboard_stats(session)
+        finally:
+            session.close()
+        assert live == 40 - result["archived"]
+        assert {pid: m.likes for pid, m in self.db.get_latest_metrics_bulk().items()} == {1: 19, 2: 19}
+
+        # A consulta histórica une arquivo e banco sem perder linhas
+        after = self.archiver.query_metrics()
+        assert [(r["publication_id"], r["likes"]) for r in after] == [
+            (r["publication_id"], r["likes"]) for r in before
+        ]
+
+        filtered = self.archiver.query_metrics(
+            start=datetime(2024, 2, 1), end=datetime(2024, 2, 29), platform="instagram"
+        )
+        assert {r["platform"] for r in filtered} == {"instagram"}
+        assert [r["likes"] for r in filtered] == [5, 6, 7, 8]
+
+    def test_old_latest_snapshot_kept(self):
+        """Testar que o último snapshot fica no banco mesmo quando é anterior ao corte"""
+        self.db.create_publication({"content_id": "c1", "platform": "linkedin"})
+        self.db.create_metrics({"publication_id": 3, "likes": 7, "collected_at": datetime(2024, 1, 2)})
+
+        self.archiver.archive(older_than_days=30, batch_size=7, now=self.now)
+
+        assert self.db.get_latest_metrics_bulk()[3].likes == 7
+
+    def test_query_empty_archive_dir(self):
+        """Testar filtros sobre um diretório de arquivo ainda sem arquivos Parquet"""
+        os.makedirs(self.archiver.archive_dir)
+
+        filtered = self.archiver.query_metrics(start=datetime(2024, 5, 1), publication_ids=[1])
+        assert [r["likes"] for r in filtered] == [18, 19]
+
+
+    def test_import_keeps_archived_rollups(self):
+        """Testar que importar snapshots não apaga rollups de janelas já arquivadas"""
+        self.archiver.archive(older_than_days=30, batch_size=7, now=self.now)
+
+        def day_rollups():
+            rollups = self.db.get_metrics_rollups("day", publication_ids=[1])
+            return [(r.bucket_start, r.likes_max, r.likes_delta) for r in rollups]
+
+        before = day_rollups()
+        assert len(before) == 20
+
+        MetricsImporter(self.db).import_records([
+            {"platform": "tiktok", "platform_post_id": "tiktok_1", "collected_at": "2024-05-14T10:00:00", "likes": 25}
+        ])
+
+        assert day_rollups() == before + [(datetime(2024, 5, 14), 25, 6)]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
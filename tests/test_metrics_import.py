@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Testes para a importação em massa de métricas históricas
+"""
+
+import json
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager
+from database.metrics_import import MetricsImporter
+
+
+class TestMetricsImporter:
+    """Testes para o MetricsImporter"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, tmp_path):
+        """Criar banco isolado com publicações conhecidas"""
+        self.tmp_path = tmp_path
+        self.db = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+        self.importer = MetricsImporter(self.db, chunk_size=2)
+
+        self.db.create_content({"id": "c1", "prompt": "prompt"})
+        self.db.create_publication({"content_id": "c1", "platform": "tiktok", "platform_post_id": "tt_1"})
+        self.db.create_publication({"content_id": "c1", "platform": "instagram", "platform_post_id": "ig_1"})
+
+    def test_import_csv(self):
+        """Testar importação CSV em blocos com linhas sem publicação"""
+        path = self.tmp_path / "metrics.csv"
+        path.write_text(
+            "platform,platform_post_id,collected_at,likes,comments,shares,views\n"
+            "tiktok,tt_1,2024-01-01T10:00:00Z,5,1,0,50\n"
+            "tiktok,tt_1,2024-01-02T10:00:00Z,9,2,1,90\n"
+            "tiktok,desconhecido,2024-01-02T10:00:00Z,1,0,0,1\n"
+            "instagram,ig_1,2024-01-01T10:30:00+00:00,3,,,\n",
+            encoding="utf-8"
+        )
+
+        result = self.importer.import_file(str(path))
+
+        assert result["imported"] == 3
+        assert result["unmatched"] == 1
+        assert result["unmatched_sample"] == ["desconhecido"]
+        assert result["publications"] == 2
+
+        latest = self.db.get_latest_metrics(1)
+        assert (latest.likes, latest.views) == (9, 90)
+        assert latest.collected_at == datetime(2024, 1, 2, 10, 0, 0)
+
+        rollups = self.db.get_metrics_rollups("day", publication_ids=[1])
+        assert [(r.bucket_start.day, r.likes_delta) for r in rollups] == [(1, 5), (2, 4)]
+        assert self.db.get_dashboard_stats()["total_likes"] == 17
+
+    def test_import_jsonl_with_default_platform(self):
+        """Testar importação JSONL usando a plataforma informada na chamada"""
+        path = self.tmp_path / "metrics.jsonl"
+        path.write_text("\n".join(json.dumps(r) for r in [
+            {"platform_post_id": "ig_1", "collected_at": "2024-03-01T08:00:00", "likes": 7},
+            {"platform_post_id": "tt_1", "collected_at": "2024-03-01T08:00:00", "likes": 1},
+        ]), encoding="utf-8")
+
+        result = self.importer.import_file(str(path), platform="instagram")
+
+        assert (result["imported"], result["unmatched"]) == (1, 1)
+        assert self.db.get_latest_metrics(2).likes == 7
+
+    def test_missing_timestamp(self):
+        """Testar leitura sem collected_at"""
+        with pytest.raises(ValueError):
+            self.importer.import_records([{"platform": "tiktok", "platform_post_id": "tt_1", "likes": 1}])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
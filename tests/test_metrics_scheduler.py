@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Testes para o agendador adaptativo de métricas
+"""
+
+import pytest
+import sys
+import os
+import threading
+from datetime import datetime, timezone
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import DatabaseManager
+from pocs.metrics.metrics_scheduler import (
+    MetricsScheduler, collect_publication_metrics, next_poll_interval
+)
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+
+
+class FakeCollector:
+    """Coletor falso com engajamento controlado por post"""
+
+    def __init__(self):
+        self.likes = {}
+        self.calls = []
+
+    def iter_metrics(self, posts):
+        self.calls.append([p["post_id"] for p in posts])
+        for completed, (index, post) in enumerate(reversed(list(enumerate(posts))), 1):
+            yield {"index": index, "post": post, "result": self.result(post),
+                   "completed": completed, "total": len(posts)}
+
+    def result(self, post):
+        return {"status": "success", "platform": post["platform"], "data": {"likes": self.likes.get(post["post_id"], 0)}}
+
+
+class TestMetricsScheduler:
+    """Testes para o MetricsScheduler"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, tmp_path):
+        """Criar banco isolado com duas publicações"""
+        self.db = DatabaseManager(f"sqlite:///{tmp_path / 'test.db'}")
+        published_at = datetime(2024, 1, 1, 12, 0, 0)
+        self.now = published_at.replace(tzinfo=timezone.utc).timestamp()
+
+        self.db.create_content({"id": "c1", "prompt": "prompt"})
+        for post_id in ("quente", "frio"):
+            self.db.create_publication({
+                "content_id": "c1", "platform": "tiktok", "platform_post_id": post_id,
+                "published_at": published_at
+            })
+
+        self.collector = FakeCollector()
+        self.scheduler = MetricsScheduler(self.db, self.collector, write_batch_size=1, clock=lambda: self.now)
+
+    def test_next_poll_interval(self):
+        """Testar intervalo mínimo para posts novos e decaimento com a velocidade"""
+        assert next_poll_interval(30 * MINUTE, 0, 300) == 300
+        assert next_poll_interval(5 * HOUR, None, 3600) == 300
+        assert next_poll_interval(5 * HOUR, 120, 300) == 300          # 10 interações em 5 min
+        assert next_poll_interval(5 * HOUR, 10, 300) == 600           # cresce no máximo 2x
+        assert next_poll_interval(5 * HOUR, 10, 3600) == 3600
+        assert next_poll_interval(5 * HOUR, 0, 80000) == 24 * HOUR
+
+    def test_scheduler_polls_hot_posts_more_often(self):
+        """Testar que posts parados espaçam as coletas e posts engajando não"""
+        polls = {"quente": 0, "frio": 0}
+        for step in range(12 * 6):
+            self.collector.likes["quente"] = step * 50
+            self.scheduler.run_once()
+            for batch in self.collector.calls:
+                for post_id in batch:
+                    polls[post_id] += 1
+            self.collector.calls.clear()
+            self.now += 10 * MINUTE
+
+        assert len(self.scheduler) == 2
+        assert polls["quente"] > 3 * polls["frio"]
+        assert self.db.get_latest_metrics(1).likes > 0
+        # O post parado só gravou um snapshot (as demais leituras eram iguais)
+        assert self.db.get_latest_metrics(2).likes == 0
+
+    def test_deferred_posts_wait_for_quota(self):
+        """Testar que posts adiados por cota voltam após retry_after sem contar como falha"""
+        self.collector.result = lambda post: {"status": "deferred", "message": "Cota esgotada", "retry_after": 900}
+
+        result = self.scheduler.run_once()
+
+        assert (result["deferred"], result["failed"], result["written"]) == (2, 0, 0)
+        assert self.scheduler.next_due() == self.now + 900
+
+    def test_scheduler_resumes_from_latest_snapshot(self):
+        """Testar que a fila retoma do último snapshot gravado"""
+        self.scheduler.run_once()
+
+        restarted = MetricsScheduler(self.db, self.collector, clock=lambda: self.now)
+        assert restarted.load_publications() == 2
+        assert restarted.run_once()["polled"] == 0
+        assert restarted.next_due() == self.now + 5 * MINUTE
+
+    def test_collect_publication_metrics_persists_readings(self):
+        """Testar coleta sob demanda gravando no banco com os ids reais das publicações"""
+        self.collector.likes = {"quente": 7, "frio": 2}
+        progress = []
+
+        result = collect_publication_metrics(self.db, self.collector, write_batch_size=1,
+                                             progress=lambda done, total: progress.append((done, total)))
+
+        assert self.collector.calls == [["quente", "frio"]]
+        assert (result["polled"], result["written"], result["failed"]) == (2, 2, 0)
+        assert progress[-1] == (2, 2)
+        rows = {row.platform_post_id: row for row in self.db.get_publication_rows(with_latest_metrics=True)}
+        assert (rows["quente"].likes, rows["frio"].likes) == (7, 2)
+
+        # Uma segunda coleta sem mudanças não grava snapshots novos
+        assert collect_publication_metrics(self.db, self.collector)["unchanged"] == 2
+
+    def test_run_survives_failed_first_round(self):
+        """Testar que o daemon continua após falhar na primeira busca de publicações"""
+        def broken_session():
+            raise RuntimeError("database is locked")
+
+        self.db.get_session = broken_session
+        waits = []
+
+        class StopAfterWait(threading.Event):
+            def wait(self, timeout=None):
+                waits.append(timeout)
+                self.set()
+                return True
+
+        self.scheduler.run(StopAfterWait())
+        assert waits == [self.scheduler.idle_wait]
+
+
+    def test_failed_ingest_keeps_posts_scheduled(self):
+        """Testar que uma falha de gravação no meio da rodada não tira posts da fila"""
+        ingest = self.db.ingest_metrics_batch
+        calls = []
+
+        def flaky_ingest(readings):
+            calls.append(readings)
+            if len(calls) == 1:
+                raise RuntimeError("database is locked")
+            return ingest(readings)
+
+        self.db.ingest_metrics_batch = flaky_ingest
+        with pytest.raises(RuntimeError):
+            self.scheduler.run_once()
+        # Só o primeiro post foi coletado antes da falha
+        assert self.collector.calls == [["quente", "frio"]]
+
+        self.now += self.scheduler.min_interval
+        result = self.scheduler.run_once()
+        assert result["polled"] == 2
+        assert self.collector.calls[-1] == ["quente", "frio"]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Testes para o simulador local das APIs das plataformas
+"""
+
+import base64
+import pytest
+import sys
+import os
+
+# Adicionar o diretório pai ao path para importar as POCs
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pocs.ai_generation.openai_image_poc import OpenAIImagePOC
+from pocs.instagram_poc import InstagramUploadPOC
+from pocs.metrics.quota_manager import QuotaManager
+from pocs.metrics.response_cache import MetricsResponseCache
+from pocs.metrics.social_metrics_poc import SocialMetricsPOC
+from pocs.resilience.circuit_breaker import CircuitBreakerRegistry
+from pocs.simulator.platform_api_simulator import PlatformAPISimulator
+from pocs.tiktok_poc import TikTokUploadPOC
+
+
+class TestPlatformAPISimulator:
+    """Testes das POCs apontadas para o simulador"""
+
+    @pytest.fixture(autouse=True)
+    def simulator(self, monkeypatch):
+        """Subir um simulador por teste e apontar as POCs para ele"""
+        with PlatformAPISimulator(seed=1) as simulator:
+            for name, value in simulator.env().items():
+                monkeypatch.setenv(name, value)
+            self.simulator = simulator
+            yield
+
+    def _metrics_poc(self, cache=None):
+        """Coletor com cota, breakers e cache próprios, para não afetar os demais testes"""
+        poc = SocialMetricsPOC(quota=QuotaManager(), breakers=CircuitBreakerRegistry(), cache=cache)
+        poc.tiktok_token = poc.instagram_token = poc.linkedin_token = "simulador"
+        return poc
+
+    def test_metrics_collection(self):
+        """Testar coleta em lote das três plataformas e ids inválidos"""
+        poc = self._metrics_poc()
+        posts = [{"platform": platform, "post_id": f"{platform}_{i}"}
+                 for platform in ("tiktok", "instagram", "linkedin") for i in range(30)]
+        posts.append({"platform": "instagram", "post_id": "invalid_1"})
+        posts.append({"platform": "tiktok", "post_id": "invalid_2"})
+
+        result = poc.collect_all_metrics(posts)
+        poc.cleanup()
+
+        statuses = [metrics["status"] for metrics in result["data"]["individual_metrics"]]
+        assert statuses == ["success"] * 90 + ["error", "error"]
+        assert result["data"]["total_metrics"]["platforms"]["linkedin"]["posts"] == 30
+
+        stats = self.simulator.stats()
+        assert stats["tiktok.video_query 200"] == 2
+        assert stats["linkedin.social_actions 200"] == 2
+        # O lote do Instagram com o id inválido cai para consultas post a post
+        assert stats["instagram.media 400"] == 2
+
+    def test_etag_revalidation(self):
+        """Testar 304 do simulador para um lote de métricas já em cache"""
+        cache = MetricsResponseCache(ttls={"instagram": 0})
+        poc = self._metrics_poc(cache)
+
+        first = poc.get_metrics_batch("instagram", ["m1", "m2"])
+        second = poc.get_metrics_batch("instagram", ["m1", "m2"])
+        poc.cleanup()
+
+        assert second == first
+        assert self.simulator.stats()["instagram.media 304"] == 1
+
+    def test_injected_failures(self):
+        """Testar 429 adiando o lote e 503 virando erro"""
+        self.simulator.rate_limit_rate = 1.0
+        poc = self._metrics_poc()
+        result = poc.get_linkedin_metrics("p1")
+        assert result["status"] == "deferred"
+
+        self.simulator.rate_limit_rate = 0.0
+        self.simulator.error_rate = 1.0
+        assert poc.get_tiktok_metrics("v1")["message"] == "Erro na API TikTok: 503"
+        poc.cleanup()
+
+    def test_upload_flows(self, tmp_path):
+        """Testar publicação no Instagram e no TikTok e geração de imagem"""
+        instagram = InstagramUploadPOC()
+        instagram.access_token = "simulador"
+        instagram.instagram_account_id = "conta"
+        instagram.video_url = "https://exemplo.com/video.mp4"
+        result = instagram.upload_video()
+        assert result["status"] == "success"
+        assert result["data"]["media_id"].startswith("media_")
+
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"\x00" * 1024)
+        tiktok = TikTokUploadPOC()
+        tiktok.access_token = "simulador"
+        tiktok.video_path = str(video)
+        result = tiktok.upload_video()
+        assert result["status"] == "success"
+        assert result["data"]["video_id"].startswith("video_")
+
+        openai = OpenAIImagePOC()
+        openai.api_key = "simulador"
+        result = openai.generate_image("um robô pintando")
+        assert result["status"] == "success"
+        assert result["data"]["image_bytes"].startswith(base64.b64decode("iVBORw0KGgo="))
+        assert result["data"]["revised_prompt"] == "um robô pintando"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
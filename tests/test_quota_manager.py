@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Testes para o gerenciador de cotas de API
+"""
+
+import json
+import pytest
+import sys
+import os
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pocs.metrics.quota_manager import QuotaManager
+
+
+class FakeClock:
+    """Relógio controlado pelo teste"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestQuotaManager:
+    """Testes para o QuotaManager"""
+
+    def setup_method(self):
+        """Configurar antes de cada teste"""
+        self.clock = FakeClock()
+        self.quota = QuotaManager(
+            endpoint_limits={("tiktok", "video_query"): (3, 60)}, clock=self.clock, sleep=self.clock.sleep
+        )
+
+    def test_app_usage_paces_and_blocks(self):
+        """Testar espaçamento acima do limiar e bloqueio em 100% do X-App-Usage"""
+        usage = {"call_count": 10, "total_cputime": 5, "total_time": 5}
+        self.quota.record_response("instagram", "media", {"X-App-Usage": json.dumps(usage)}, 200, "tk")
+        assert self.quota.acquire("instagram", "media", "tk") == 0
+        assert self.quota.acquire("instagram", "media", "tk") == 0
+
+        usage["call_count"] = 87.5
+        self.quota.record_response("instagram", "media", {"x-app-usage": json.dumps(usage)}, 200, "tk")
+        assert self.quota.delay("instagram", "media", "tk") == pytest.approx(5.0)
+        assert self.quota.acquire("instagram", "media", "tk", max_wait=10) == 0
+        assert self.clock.now == pytest.approx(1005.0)
+
+        usage["call_count"] = 100
+        self.quota.record_response("instagram", "media", {"X-App-Usage": json.dumps(usage)}, 200, "tk")
+        assert self.quota.acquire("instagram", "media", "tk", max_wait=5) == pytest.approx(60.0)
+        # Outro token não é afetado
+        assert self.quota.delay("instagram", "media", "outro") == 0
+
+    def test_business_use_case_regain_time(self):
+        """Testar o tempo de recuperação do X-Business-Use-Case-Usage"""
+        header = json.dumps({"123": [{
+            "type": "instagram", "call_count": 100, "total_cputime": 20, "total_time": 20,
+            "estimated_time_to_regain_access": 15
+        }]})
+        self.quota.record_response("instagram", "media", {"X-Business-Use-Case-Usage": header}, 200)
+
+        assert self.quota.delay("instagram", "media") == pytest.approx(900.0)
+        assert "instagram/-/business:123:instagram" in self.quota.snapshot()["usage"]
+
+    def test_endpoint_window_and_429(self):
+        """Testar janela fixa do endpoint e bloqueio por 429"""
+        for _ in range(3):
+            assert self.quota.acquire("tiktok", "video_query", "tk") == 0
+        assert self.quota.acquire("tiktok", "video_query", "tk") == pytest.approx(60.0)
+        self.clock.now += 60
+        assert self.quota.acquire("tiktok", "video_query", "tk") == 0
+
+        self.quota.record_response("tiktok", "video_list", {"Retry-After": "30"}, 429, "tk")
+        assert self.quota.delay("tiktok", "video_list", "tk") == pytest.approx(30.0)
+        assert self.quota.delay("tiktok", "video_query", "tk") == 0
+
+        self.quota.record_response("linkedin", "social_actions",
+                                   {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "12"}, 200)
+        assert self.quota.delay("linkedin", "social_actions") == pytest.approx(12.0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Testes para a POC de coleta de métricas
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+from collections import Counter
+from unittest.mock import MagicMock
+
+# Adicionar o diretório pai ao path para importar as POCs
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pocs.metrics.quota_manager import QuotaManager, quota_manager
+from pocs.metrics.social_metrics_poc import SocialMetricsPOC
+from pocs.metrics.response_cache import MetricsResponseCache
+from pocs.resilience.circuit_breaker import CircuitBreakerRegistry
+
+
+def fake_response(status_code, payload=None, headers=None):
+    """Criar resposta HTTP falsa"""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = payload or {}
+    return response
+
+
+class TestSocialMetricsPOC:
+    """Testes para a coleta concorrente e em lotes de métricas"""
+
+    def setup_method(self):
+        """Configurar antes de cada teste"""
+        self.now = 1000.0
+        self.cache = MetricsResponseCache(clock=lambda: self.now)
+        self.poc = SocialMetricsPOC(
+            max_concurrency=6, platform_concurrency={"tiktok": 2, "instagram": 5},
+            quota=QuotaManager(), breakers=CircuitBreakerRegistry(min_calls=2), cache=self.cache
+        )
+        self.poc.tiktok_token = self.poc.instagram_token = self.poc.linkedin_token = "token"
+        self.active = Counter()
+        self.peak = Counter()
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def teardown_method(self):
+        """Limpar após cada teste"""
+        self.poc.cleanup()
+
+    def _fake_batch_fetcher(self, platform):
+        """Criar coletor em lote falso que registra lotes e concorrência observada"""
+        def fetch(post_ids):
+            with self.lock:
+                self.batches.append((platform, len(post_ids)))
+                self.active[platform] += 1
+                self.active["total"] += 1
+                for key in (platform, "total"):
+                    self.peak[key] = max(self.peak[key], self.active[key])
+            time.sleep(0.02)
+            with self.lock:
+                self.active[platform] -= 1
+                self.active["total"] -= 1
+
+            results = {}
+            for post_id in post_ids:
+                if post_id.endswith("erro"):
+                    results[post_id] = {"status": "error", "message": "falha simulada"}
+                    continue
+                number = int(post_id.split("_")[1])
+                results[post_id] = {"status": "success", "platform": platform, "data": {
+                    "post_id": post_id, "likes": number, "comments": 1, "shares": 0, "views": 10
+                }}
+            return results
+        return fetch
+
+    def test_collect_all_metrics_concurrently(self):
+        """Testar lotes, limites de concorrência, ordem e totais agregados"""
+        for platform in ("tiktok", "instagram", "linkedin"):
+            setattr(self.poc, f"get_{platform}_metrics_batch", self._fake_batch_fetcher(platform))
+
+        platforms = ["tiktok", "instagram", "linkedin"]
+        posts = [{"platform": platforms[i % 3], "post_id": f"post_{i}"} for i in range(150)]
+        posts.append({"platform": "instagram", "post_id": "post_erro"})
+        posts.append({"platform": "myspace", "post_id": "post_0"})
+        posts.append({"platform": "tiktok", "post_id": "post_0"})
+
+        result = self.poc.collect_all_metrics(posts)
+
+        assert result["status"] == "success"
+        individual = result["data"]["individual_metrics"]
+        assert [m["data"]["post_id"] for m in individual[:150]] == [p["post_id"] for p in posts[:150]]
+        assert individual[150]["status"] == "error"
+        assert "myspace" in individual[151]["message"]
+        assert individual[152] == individual[0]
+
+        totals = result["data"]["total_metrics"]
+        assert totals["total_likes"] == sum(range(150))
+        assert totals["total_views"] == 1510
+        assert totals["platforms"]["tiktok"]["posts"] == 51
+        assert "myspace" not in totals["platforms"]
+
+        # Posts repetidos são buscados uma vez; cada API no seu tamanho máximo de lote
+        assert sorted(self.batches) == sorted([
+            ("tiktok", 20), ("tiktok", 20), ("tiktok", 10),
+            ("instagram", 50), ("instagram", 1),
+            ("linkedin", 20), ("linkedin", 20), ("linkedin", 10),
+        ])
+        assert self.peak["tiktok"] <= 2
+        assert self.peak["total"] <= 6
+
+    def test_iter_metrics_yields_progressively(self):
+        """Testar que iter_metrics entrega cada resultado com os totais acumulados"""
+        for platform in ("tiktok", "instagram"):
+            setattr(self.poc, f"get_{platform}_metrics_batch", self._fake_batch_fetcher(platform))
+
+        posts = [{"platform": "tiktok", "post_id": f"post_{i}"} for i in range(45)]
+        posts.append({"platform": "instagram", "post_id": "post_100"})
+
+        iterator = self.poc.iter_metrics(posts)
+        first = next(iterator)
+        assert first["completed"] == 1
+        assert first["total"] == 46
+        assert first["total_metrics"]["total_likes"] == first["result"]["data"]["likes"]
+
+        items = [first] + list(iterator)
+        assert sorted(item["index"] for item in items) == list(range(46))
+        assert items[-1]["completed"] == 46
+        assert items[-1]["total_metrics"]["total_likes"] == sum(range(45)) + 100
+
+    def test_iter_metrics_stops_early(self):
+        """Testar que parar de consumir cancela os lotes que ainda não começaram"""
+        self.poc.platform_concurrency["tiktok"] = 1
+        self.poc.get_tiktok_metrics_batch = self._fake_batch_fetcher("tiktok")
+
+        posts = [{"platform": "tiktok", "post_id": f"post_{i}"} for i in range(200)]
+        for item in self.poc.iter_metrics(posts):
+            break
+
+        assert len(self.batches) < 10
+
+    def test_tiktok_batch_sends_video_ids(self):
+        """Testar que a consulta do TikTok envia os ids e separa a resposta por vídeo"""
+        self.poc.http = MagicMock()
+        self.poc.http.post.return_value = fake_response(200, {"data": {"videos": [
+            {"id": "v1", "like_count": 3, "view_count": 30},
+            {"id": "v2", "like_count": 4, "view_count": 40},
+        ]}})
+
+        results = self.poc.get_tiktok_metrics_batch(["v1", "v2", "v3"])
+
+        assert self.poc.http.post.call_args.kwargs["json"] == {"filters": {"video_ids": ["v1", "v2", "v3"]}}
+        assert results["v1"]["data"]["likes"] == 3
+        assert results["v2"]["data"]["views"] == 40
+        assert results["v3"]["status"] == "error"
+        assert self.poc.get_tiktok_metrics("v1")["data"]["video_id"] == "v1"
+
+    def test_instagram_batch_falls_back_on_invalid_id(self):
+        """Testar que um id inválido no lote do Instagram não derruba os demais"""
+        def get(url, params, **kwargs):
+            ids = params["ids"].split(",")
+            if "ruim" in ids:
+                return fake_response(400)
+            return fake_response(200, {media_id: {"id": media_id, "like_count": 7} for media_id in ids})
+
+        self.poc.http = MagicMock()
+        self.poc.http.get.side_effect = get
+
+        results = self.poc.get_instagram_metrics_batch(["m1", "ruim", "m2"])
+
+        assert results["m1"]["data"]["likes"] == 7
+        assert results["m2"]["status"] == "success"
+        assert results["ruim"]["message"] == "Erro na API Instagram: 400"
+        assert self.poc.http.get.call_count == 4
+
+    def test_rate_limited_batch_is_deferred(self):
+        """Testar que 429 e cota esgotada adiam o lote em vez de falhar"""
+        self.poc.http = MagicMock()
+        self.poc.http.get.return_value = fake_response(429, headers={"Retry-After": "120"})
+
+        results = self.poc.get_linkedin_metrics_batch(["p1", "p2"])
+        assert {r["status"] for r in results.values()} == {"deferred"}
+        assert 110 < results["p1"]["retry_after"] <= 120
+
+        # Enquanto bloqueado, nenhuma requisição nova sai
+        result = self.poc.collect_all_metrics([{"platform": "linkedin", "post_id": "p3"}])
+        assert result["data"]["individual_metrics"][0]["status"] == "deferred"
+        assert result["data"]["total_metrics"]["total_likes"] == 0
+        assert self.poc.http.get.call_count == 1
+
+    def test_open_circuit_fails_fast(self):
+        """Testar que um endpoint com erros 5xx para de receber requisições"""
+        self.poc.http = MagicMock()
+        self.poc.http.get.return_value = fake_response(503)
+
+        for post_id in ("m1", "m2"):
+            assert self.poc.get_instagram_metrics(post_id)["message"] == "Erro na API Instagram: 503"
+
+        result = self.poc.get_instagram_metrics("m3")
+        assert result["status"] == "deferred"
+        assert "Circuito aberto" in result["message"]
+        assert self.poc.http.get.call_count == 2
+        # Outras plataformas seguem normalmente
+        assert self.poc.breakers.get("tiktok", "video_query").allow()
+
+    def test_cached_metrics_skip_api_within_ttl(self):
+        """Testar que atualizações dentro do TTL não chegam à API e erros não ficam em cache"""
+        self.poc.get_tiktok_metrics_batch = self._fake_batch_fetcher("tiktok")
+        posts = [{"platform": "tiktok", "post_id": f"post_{i}"} for i in range(5)]
+        posts.append({"platform": "tiktok", "post_id": "post_erro"})
+
+        first = self.poc.collect_all_metrics(posts)
+        second = self.poc.collect_all_metrics(posts)
+
+        assert second["data"]["individual_metrics"] == first["data"]["individual_metrics"]
+        assert self.batches == [("tiktok", 6), ("tiktok", 1)]
+
+        self.now += self.cache.ttl("tiktok") + 1
+        self.poc.collect_all_metrics(posts)
+        assert self.batches[-1] == ("tiktok", 6)
+
+    def test_simultaneous_refreshes_share_one_request(self):
+        """Testar que coletas simultâneas do mesmo post viram uma única requisição"""
+        self.poc.get_instagram_metrics_batch = self._fake_batch_fetcher("instagram")
+        posts = [{"platform": "instagram", "post_id": f"post_{i}"} for i in range(10)]
+        start = threading.Barrier(4)
+        results = []
+
+        def refresh():
+            start.wait()
+            results.append(self.poc.collect_all_metrics(posts)["data"]["total_metrics"]["total_likes"])
+
+        threads = [threading.Thread(target=refresh) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [sum(range(10))] * 4
+        assert sum(size for _, size in self.batches) == 10
+
+    def test_instagram_revalidates_with_etag(self):
+        """Testar If-None-Match após o TTL e reaproveitamento do cache com 304"""
+        sent_headers = []
+
+        def get(url, params, headers=None, **kwargs):
+            sent_headers.append(headers or {})
+            if (headers or {}).get("If-None-Match") == '"v1"':
+                return fake_response(304)
+            ids = params["ids"].split(",")
+            return fake_response(200, {media_id: {"id": media_id, "like_count": 7} for media_id in ids},
+                                 headers={"ETag": '"v1"'})
+
+        self.poc.http = MagicMock()
+        self.poc.http.get.side_effect = get
+
+        assert self.poc.get_metrics_batch("instagram", ["m1", "m2"])["m1"]["data"]["likes"] == 7
+        self.now += self.cache.ttl("instagram") + 1
+        results = self.poc.get_metrics_batch("instagram", ["m1", "m2"])
+
+        assert sent_headers == [{}, {"If-None-Match": '"v1"'}]
+        assert results["m2"]["data"]["likes"] == 7
+        # O 304 renovou o TTL: a próxima atualização nem chega à API
+        self.poc.get_metrics_batch("instagram", ["m1", "m2"])
+        assert self.poc.http.get.call_count == 2
+
+
+    def test_default_quota_is_shared(self):
+        """Testar que coletores recriados compartilham o orçamento de cota do processo"""
+        first, second = SocialMetricsPOC(cache=None), SocialMetricsPOC(cache=None)
+        try:
+            assert first.quota is second.quota is quota_manager
+            assert self.poc.quota is not quota_manager
+        finally:
+            first.cleanup()
+            second.cleanup()
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -11,8 +11,9 @@ import os
 import sys
 import json
 import logging
+import threading
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -22,8 +23,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from pocs.ai_generation.openai_image_poc import OpenAIImagePOC
 from pocs.storage.aws_s3_poc import AWSS3POC
 from pocs.metrics.social_metrics_poc import SocialMetricsPOC
+from pocs.metrics.metrics_scheduler import collect_publication_metrics
 from pocs.tiktok_poc import TikTokUploadPOC
 from pocs.instagram_poc import InstagramUploadPOC
+from database.models import DatabaseManager
+from database.analytics import aggregate_metrics, load_metrics_frame
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -74,8 +78,74 @@ if 'generated_content' not in st.session_state:
     st.session_state.generated_content = []
 if 'published_posts' not in st.session_state:
     st.session_state.published_posts = []
-if 'metrics_data' not in st.session_state:
-    st.session_state.metrics_data = []
+
+# Segundos que as métricas lidas do banco ficam em cache (compartilhado entre sessões)
+METRICS_CACHE_TTL = 60
+
+
+@st.cache_resource
+def get_db_manager() -> DatabaseManager:
+    """Gerenciador do banco compartilhado por todas as sessões"""
+    return DatabaseManager(os.getenv("DATABASE_URL"))
+
+
+@st.cache_resource
+def get_metrics_poc() -> Optional[SocialMetricsPOC]:
+    """Coletor de métricas compartilhado por todas as sessões (uma sessão HTTP por processo)"""
+    metrics_poc = SocialMetricsPOC()
+    if not metrics_poc.setup():
+        metrics_poc.cleanup()
+        return None
+    return metrics_poc
+
+
+@st.cache_resource
+def get_collection_lock() -> threading.Lock:
+    """Trava global para que só uma coleta de métricas rode por vez"""
+    return threading.Lock()
+
+
+@st.cache_data(ttl=METRICS_CACHE_TTL)
+def load_publication_metrics() -> List[Dict[str, Any]]:
+    """Publicações com as métricas mais recentes gravadas no banco"""
+    rows = get_db_manager().get_publication_rows(with_latest_metrics=True)
+    return [row._asdict() for row in rows]
+
+
+@st.cache_data(ttl=METRICS_CACHE_TTL)
+def load_platform_summary():
+    """Últimas métricas agregadas por plataforma (somas, taxa de engajamento e percentis)"""
+    return aggregate_metrics(load_metrics_frame(get_db_manager(), latest_only=True), by=["platform"])
+
+
+def refresh_cached_metrics():
+    """Descartar as leituras em cache após gravar no banco"""
+    load_publication_metrics.clear()
+    load_platform_summary.clear()
+
+
+def persist(action: str, func, *args, **kwargs):
+    """Executar uma gravação no banco sem interromper a interface em caso de falha"""
+    try:
+        return func(*args, **kwargs)
+    except Exception as e:
+        logger.error(f"Erro ao {action}: {e}")
+        st.warning(f"Não foi possível {action} no banco: {e}")
+        return None
+
+
+def platform_post_id(result: Dict[str, Any]) -> Optional[str]:
+    """Extrair o id do post retornado pela publicação na plataforma
+    
+    O publish_id do TikTok identifica só o envio e não é aceito na consulta de vídeos:
+    enquanto o status não trouxer o video_id, a publicação fica sem id e fora da coleta.
+    """
+    data = result.get("data") or {}
+    for key in ("media_id", "video_id", "id"):
+        value = data.get(key) or result.get(key)
+        if value:
+            return str(value)
+    return None
 
 def initialize_pocs():
     """Inicializar POCs"""
@@ -93,10 +163,9 @@ def initialize_pocs():
             s3_poc = None
         
         # Social Metrics POC
-        metrics_poc = SocialMetricsPOC()
-        if not metrics_poc.setup():
+        metrics_poc = get_metrics_poc()
+        if not metrics_poc:
             st.warning("Métricas não configuradas")
-            metrics_poc = None
         
         # Social Media POCs
         tiktok_poc = TikTokUploadPOC()
@@ -139,6 +208,10 @@ def generate_content(openai_poc, prompt: str, size: str, quality: str, style: st
                     }
                     
                     st.session_state.generated_content.append(content_data)
+                    persist("salvar o conteúdo", get_db_manager().create_content, {
+                        key: value for key, value in content_data.items() if key != "created_at"
+                    })
+                    refresh_cached_metrics()
                     return content_data
                 else:
                     st.error("Erro ao salvar imagem")
@@ -256,7 +329,9 @@ def show_dashboard():
         )
     
     with col4:
-        total_views = sum([post.get("views", 0) for post in st.session_state.published_posts])
+        # Soma do snapshot mais recente de cada publicação: os contadores do banco somam
+        # todos os snapshots gravados e contariam as visualizações de novo a cada coleta
+        total_views = sum(row["views"] or 0 for row in load_publication_metrics())
         st.metric(
             label="Total de Visualizações",
             value=total_views,
@@ -460,24 +535,32 @@ def show_content_approval(tiktok_poc, instagram_poc, s3_poc):
                         content["custom_description"] = custom_description
                         content["hashtags"] = hashtags
                         content["approved_at"] = datetime.now().isoformat()
+                        db = get_db_manager()
+                        persist("aprovar o conteúdo", db.update_content_status, content["id"], "approved",
+                                approved_at=datetime.utcnow())
                         
                         # Publicar nas plataformas selecionadas
                         published_platforms = []
+                        selected = [
+                            ("tiktok", publish_tiktok),
+                            ("instagram", publish_instagram),
+                            ("linkedin", publish_linkedin),
+                        ]
                         
-                        if publish_tiktok:
-                            result = publish_to_social_media("tiktok", content, tiktok_poc, instagram_poc)
-                            if result["status"] == "success":
-                                published_platforms.append("tiktok")
-                        
-                        if publish_instagram:
-                            result = publish_to_social_media("instagram", content, tiktok_poc, instagram_poc)
-                            if result["status"] == "success":
-                                published_platforms.append("instagram")
-                        
-                        if publish_linkedin:
-                            result = publish_to_social_media("linkedin", content, tiktok_poc, instagram_poc)
+                        for platform, selected_platform in selected:
+                            if not selected_platform:
+                                continue
+                            result = publish_to_social_media(platform, content, tiktok_poc, instagram_poc)
                             if result["status"] == "success":
-                                published_platforms.append("linkedin")
+                                published_platforms.append(platform)
+                                # O id do post é o que a coleta de métricas consulta depois
+                                persist("registrar a publicação", db.create_publication, {
+                                    "content_id": content["id"],
+                                    "platform": platform,
+                                    "platform_post_id": platform_post_id(result),
+                                    "custom_description": custom_description,
+                                    "hashtags": hashtags,
+                                })
                         
                         # Adicionar aos posts publicados
                         if published_platforms:
@@ -489,106 +572,124 @@ def show_content_approval(tiktok_poc, instagram_poc, s3_poc):
                                 "hashtags": hashtags
                             }
                             st.session_state.published_posts.append(post_data)
+                            persist("marcar o conteúdo como publicado", db.update_content_status,
+                                    content["id"], "published")
                             
                             st.success(f"Conteúdo publicado em: {', '.join(published_platforms)}")
                         else:
                             st.warning("Conteúdo aprovado, mas não foi possível publicar em nenhuma plataforma.")
                         
+                        refresh_cached_metrics()
                         st.rerun()
                     
                     if reject:
                         content["status"] = "rejected"
                         content["rejected_at"] = datetime.now().isoformat()
+                        persist("rejeitar o conteúdo", get_db_manager().update_content_status,
+                                content["id"], "rejected", rejected_at=datetime.utcnow())
+                        refresh_cached_metrics()
                         st.warning("Conteúdo rejeitado.")
                         st.rerun()
 
+def collect_metrics(metrics_poc):
+    """Coletar métricas das publicações do banco e gravá-las em lotes"""
+    lock = get_collection_lock()
+    if not lock.acquire(blocking=False):
+        st.info("Uma coleta já está em andamento; os números aparecem aqui quando ela terminar.")
+        return None
+    
+    try:
+        progress_bar = st.progress(0.0, text="Coletando métricas...")
+        result = collect_publication_metrics(
+            get_db_manager(), metrics_poc,
+            progress=lambda done, total: progress_bar.progress(done / total, text=f"Coletando métricas... {done}/{total}")
+        )
+        progress_bar.empty()
+        refresh_cached_metrics()
+        return result
+    finally:
+        lock.release()
+
 def show_metrics_dashboard(metrics_poc):
     """Mostrar dashboard de métricas"""
     st.header("📊 Dashboard de Métricas")
     
+    # Coletar métricas
     if not metrics_poc:
         st.warning("Métricas não configuradas. Configure os tokens de acesso nas configurações.")
-        return
-    
-    # Coletar métricas
-    if st.button("🔄 Atualizar Métricas"):
-        with st.spinner("Coletando métricas..."):
-            # Preparar posts para coleta de métricas
-            posts_to_analyze = []
-            for post in st.session_state.published_posts:
-                for platform in post["platforms"]:
-                    posts_to_analyze.append({
-                        "platform": platform,
-                        "post_id": f"example_{platform}_id"  # Você substituiria pelos IDs reais
-                    })
-            
-            if posts_to_analyze:
-                result = metrics_poc.collect_all_metrics(posts_to_analyze)
-                
-                if result["status"] == "success":
-                    st.session_state.metrics_data = result["data"]["individual_metrics"]
-                    st.success("Métricas atualizadas com sucesso!")
-                else:
-                    st.error(f"Erro ao coletar métricas: {result['message']}")
-            else:
+    elif st.button("🔄 Atualizar Métricas"):
+        try:
+            result = collect_metrics(metrics_poc)
+        except Exception as e:
+            st.error(f"Erro ao coletar métricas: {e}")
+            result = None
+        
+        if result is not None:
+            if not result["polled"]:
                 st.info("Nenhum post publicado para analisar.")
+            else:
+                st.success(
+                    f"Métricas atualizadas: {result['polled']} posts, {result['written']} com mudança, "
+                    f"{result['failed']} falhas, {result['deferred']} adiados"
+                )
     
-    # Mostrar métricas
-    if st.session_state.metrics_data:
+    # Mostrar métricas gravadas no banco
+    collected = [row for row in load_publication_metrics() if row["metrics_collected_at"]]
+    
+    if collected:
         st.subheader("📈 Métricas por Post")
         
-        for metrics in st.session_state.metrics_data:
-            if metrics["status"] == "success":
-                data = metrics["data"]
-                platform = metrics["platform"].upper()
-                
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric(f"{platform} - Likes", data.get("likes", 0))
-                
-                with col2:
-                    st.metric(f"{platform} - Comentários", data.get("comments", 0))
-                
-                with col3:
-                    st.metric(f"{platform} - Compartilhamentos", data.get("shares", 0))
-                
-                with col4:
-                    st.metric(f"{platform} - Visualizações", data.get("views", 0))
+        for row in collected:
+            platform = row["platform"].upper()
+            st.caption(f"{platform} · {row['platform_post_id']} · coletado em {row['metrics_collected_at']:%d/%m/%Y %H:%M}")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric(f"{platform} - Likes", row["likes"] or 0)
+            
+            with col2:
+                st.metric(f"{platform} - Comentários", row["comments"] or 0)
+            
+            with col3:
+                st.metric(f"{platform} - Compartilhamentos", row["shares"] or 0)
+            
+            with col4:
+                st.metric(f"{platform} - Visualizações", row["views"] or 0)
         
         # Gráfico de performance
         st.subheader("📊 Performance por Plataforma")
         
-        platforms = []
-        likes = []
-        comments = []
-        shares = []
-        views = []
+        summary = load_platform_summary()
+        platforms = [platform.upper() for platform in summary["platform"]]
         
-        for metrics in st.session_state.metrics_data:
-            if metrics["status"] == "success":
-                data = metrics["data"]
-                platforms.append(metrics["platform"].upper())
-                likes.append(data.get("likes", 0))
-                comments.append(data.get("comments", 0))
-                shares.append(data.get("shares", 0))
-                views.append(data.get("views", 0))
+        fig = go.Figure()
+        fig.add_trace(go.Bar(name="Likes", x=platforms, y=summary["likes"]))
+        fig.add_trace(go.Bar(name="Comentários", x=platforms, y=summary["comments"]))
+        fig.add_trace(go.Bar(name="Compartilhamentos", x=platforms, y=summary["shares"]))
+        fig.add_trace(go.Bar(name="Visualizações", x=platforms, y=summary["views"]))
         
-        if platforms:
-            fig = go.Figure()
-            fig.add_trace(go.Bar(name="Likes", x=platforms, y=likes))
-            fig.add_trace(go.Bar(name="Comentários", x=platforms, y=comments))
-            fig.add_trace(go.Bar(name="Compartilhamentos", x=platforms, y=shares))
-            fig.add_trace(go.Bar(name="Visualizações", x=platforms, y=views))
-            
-            fig.update_layout(
-                title="Métricas por Plataforma",
-                xaxis_title="Plataforma",
-                yaxis_title="Quantidade",
-                barmode="group"
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        fig.update_layout(
+            title="Métricas por Plataforma",
+            xaxis_title="Plataforma",
+            yaxis_title="Quantidade",
+            barmode="group"
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Taxa de engajamento: (likes + comentários + compartilhamentos) / visualizações
+        st.subheader("🎯 Engajamento por Plataforma")
+        st.dataframe(
+            summary[["platform", "posts", "engagement_rate", "engagement_rate_p50", "engagement_rate_p90"]].rename(
+                columns={
+                    "platform": "Plataforma", "posts": "Posts", "engagement_rate": "Taxa geral",
+                    "engagement_rate_p50": "Mediana por post", "engagement_rate_p90": "P90 por post"
+                }
+            ),
+            hide_index=True,
+            use_container_width=True
+        )
     else:
         st.info("Nenhuma métrica disponível. Publique conteúdo e clique em 'Atualizar Métricas'.")
 
@@ -633,7 +734,6 @@ def show_settings():
     if st.button("🗑️ Limpar Dados da Sessão"):
         st.session_state.generated_content = []
         st.session_state.published_posts = []
-        st.session_state.metrics_data = []
         st.success("Dados da sessão limpos!")
     
     st.subheader("ℹ️ Informações do Sistema")
@@ -645,7 +745,9 @@ def show_settings():
         st.metric("Posts Publicados", len(st.session_state.published_posts))
     
     with col2:
-        st.metric("Métricas Coletadas", len(st.session_state.metrics_data))
+        st.metric("Métricas Coletadas", sum(
+            1 for row in load_publication_metrics() if row["metrics_collected_at"]
+        ))
         st.metric("Versão", "1.0.0")
 
     st.markdown("---")